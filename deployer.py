@@ -10,7 +10,28 @@ from pathlib import Path
 # Agregar el directorio actual al path para imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.cli import main
+
+def _fast_dispatch(argv: list) -> bool:
+    """
+    Atiende sin cargar Click ni Rich las invocaciones triviales
+
+    Args:
+        argv: Argumentos de línea de comandos (sin el programa)
+
+    Returns:
+        True si la invocación fue atendida
+    """
+    if argv == ['--version']:
+        from src import __version__
+        # Mismo formato que click.version_option
+        print(f"LDM, version {__version__}")
+        return True
+    return False
+
 
 if __name__ == '__main__':
+    if _fast_dispatch(sys.argv[1:]):
+        sys.exit(0)
+
+    from src.cli import main
     main()
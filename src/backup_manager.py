@@ -4,17 +4,77 @@ Maneja creación, listado y restauración de backups
 """
 
 import os
-import json
+import re
+import sys
+import gzip
+import zlib
+import mmap
+import heapq
+import hashlib
+import functools
+import shlex
+import stat
 import shutil
+import fnmatch
+import tempfile
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Iterable, Callable
 from datetime import datetime
 
 from .logger import logger
-from .utils import get_base_path, load_json_file, save_json_file
+from .utils import get_base_path, load_json_file, save_json_file, fast_rmtree
 from .models import BackupMetadata
 
+try:
+    import msgpack
+except ImportError:  # msgpack es opcional; se usa solo el JSON
+    msgpack = None
+
+
+# Patrones excluidos al respaldar cada parte del proyecto
+BACKEND_IGNORE_PATTERNS = (
+    'node_modules', 'vendor', '.git', 'storage/logs/*',
+    'bootstrap/cache/*', '.env', 'target', '.mvn'
+)
+FRONTEND_IGNORE_PATTERNS = ('node_modules', 'dist', '.git', '.env')
+
+# Metadata del backup: JSON legible y sidecar msgpack opcional para lecturas rápidas
+METADATA_FILE_NAME = "backup-metadata.json"
+METADATA_MSGPACK_NAME = "backup-metadata.msgpack"
+
+# Archivos de configuración del proyecto incluidos en cada backup
+CONFIG_FILES = frozenset({
+    "docker-compose.yml",
+    "nginx.conf",
+    "Dockerfile.php",
+    "Dockerfile.java",
+    ".project-config.json",
+    ".credentials.json",
+})
+
+# Archivo comprimido con backend/frontend dentro de cada backup
+FILES_ARCHIVE_NAME = "files.tar.zst"
+
+# Directorio (dentro de backups/) del almacén de objetos deduplicados
+OBJECTS_DIR_NAME = ".objects"
+
+# Tamaño de bloque/pipe para volcar dumps de base de datos (1 MiB)
+DUMP_CHUNK_SIZE = 1 << 20
+
+# Línea de resumen de `rsync --stats` con el total de bytes transferidos
+_RSYNC_TOTAL_SIZE_RE = re.compile(r'Total file size: ([\d,.]+) bytes')
+
+# A partir de este tamaño los archivos se hashean vía mmap (64 MiB)
+HASH_MMAP_THRESHOLD = 64 << 20
+
+# ioctl FICLONE de Linux: reflink copy-on-write en btrfs/XFS
+_FICLONE = 0x40049409
+
+# Soporte de reflinks detectado por dispositivo (st_dev -> bool)
+_reflink_support: Dict[int, bool] = {}
+
 
 class BackupManager:
     """Manager para backups de proyectos"""
@@ -31,6 +91,9 @@ class BackupManager:
         else:
             self.backups_dir = Path(backups_dir)
 
+        # Almacén de contenido compartido entre backups (hardlinks por sha256)
+        self.objects_dir = self.backups_dir / OBJECTS_DIR_NAME
+
         # Crear directorio si no existe
         self.backups_dir.mkdir(parents=True, exist_ok=True)
 
@@ -53,6 +116,10 @@ class BackupManager:
         Returns:
             Tupla (success, backup_id)
         """
+        # El dump de la base de datos corre en paralelo con la copia de archivos
+        db_executor = ThreadPoolExecutor(max_workers=1)
+        db_future = None
+
         try:
             # Generar ID del backup
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -66,70 +133,25 @@ class BackupManager:
 
             logger.header(f"Creating Backup: {backup_id}")
 
-            # 1. Copiar archivos del proyecto
-            logger.step("Backing up project files")
-
-            # Backend
-            backend_src = project_path / "backend"
-            if backend_src.exists():
-                backend_dst = backup_path / "backend"
-                shutil.copytree(
-                    backend_src,
-                    backend_dst,
-                    ignore=shutil.ignore_patterns(
-                        'node_modules', 'vendor', '.git', 'storage/logs/*',
-                        'bootstrap/cache/*', '.env', 'target', '.mvn'
-                    )
-                )
-                logger.success("Backend files backed up")
-
-            # Frontend
-            frontend_src = project_path / "frontend"
-            if frontend_src.exists():
-                frontend_dst = backup_path / "frontend"
-                shutil.copytree(
-                    frontend_src,
-                    frontend_dst,
-                    ignore=shutil.ignore_patterns(
-                        'node_modules', 'dist', '.git', '.env'
-                    )
+            if include_db:
+                db_future = db_executor.submit(
+                    self._backup_database,
+                    project_config,
+                    backup_path
                 )
-                logger.success("Frontend files backed up")
-
-            # 2. Copiar archivos de configuración
-            logger.step("Backing up configuration files")
 
-            config_files = [
-                "docker-compose.yml",
-                "nginx.conf",
-                "Dockerfile.php",
-                "Dockerfile.java",
-                ".project-config.json",
-                ".credentials.json"
-            ]
-
-            for config_file in config_files:
-                src_file = project_path / config_file
-                if src_file.exists():
-                    shutil.copy2(src_file, backup_path / config_file)
-
-            # Copiar .env del backend
-            backend_env = project_path / "backend" / ".env"
-            if backend_env.exists():
-                shutil.copy2(backend_env, backup_path / "backend.env")
-
-            logger.success("Configuration files backed up")
+            # 1-2. Copiar archivos del proyecto y de configuración
+            files_size, files_archive, archive_roots = self._archive_files(project_path, backup_path)
 
             # 3. Backup de base de datos
             db_backup_file = None
-            if include_db:
+            db_size = 0
+            if db_future is not None:
                 logger.step("Backing up database")
-                db_success, db_file = self._backup_database(
-                    project_config,
-                    backup_path
-                )
+                db_success, db_file = db_future.result()
                 if db_success:
                     db_backup_file = db_file
+                    db_size = os.path.getsize(backup_path / db_file)
                     logger.success(f"Database backed up: {db_file}")
                 else:
                     logger.warning("Database backup failed (continuing...)")
@@ -141,15 +163,21 @@ class BackupManager:
                 project_config=project_config,
                 project_path=project_path,
                 db_backup_file=db_backup_file,
-                custom_name=name
+                custom_name=name,
+                files_archive=files_archive,
+                archive_roots=archive_roots
             )
 
-            metadata_file = backup_path / "backup-metadata.json"
-            save_json_file(metadata_file, metadata)
+            # El tamaño se guarda en la metadata para que list_backups no recorra el árbol
+            total_size = files_size + db_size
+            metadata['files_size_bytes'] = files_size
+            metadata['database_size_bytes'] = db_size
+            metadata['size_bytes'] = total_size
+
+            self._save_metadata(backup_path, metadata)
             logger.success("Metadata saved")
 
-            # 5. Calcular tamaño
-            total_size = self._get_directory_size(backup_path)
+            # 5. Mostrar tamaño
             size_mb = total_size / (1024 * 1024)
 
             logger.success(f"Backup created successfully: {backup_id}")
@@ -162,12 +190,94 @@ class BackupManager:
             logger.error(f"Error creating backup: {str(e)}")
             logger.log_exception(e)
 
-            # Limpiar backup incompleto
+            # Esperar al dump antes de limpiar el backup incompleto
+            db_executor.shutdown(wait=True)
             if backup_path.exists():
                 shutil.rmtree(backup_path)
+                self.prune_objects()
 
             return False, None
 
+        finally:
+            db_executor.shutdown(wait=False)
+
+    def _archive_files(self, project_path: Path, backup_path: Path) -> Tuple[int, Optional[str], List[str]]:
+        """
+        Copia los archivos del proyecto y de configuración al backup
+
+        Corre en el hilo principal mientras el dump de la base de datos
+        avanza en el executor de create_backup.
+
+        Args:
+            project_path: Path del proyecto activo
+            backup_path: Directorio del backup
+
+        Returns:
+            Tupla (bytes escritos, nombre del archivo tar o None, raíces archivadas)
+        """
+        # 1. Copiar archivos del proyecto
+        logger.step("Backing up project files")
+
+        roots = [
+            (label, folder, patterns)
+            for label, folder, patterns in (
+                ("Backend", "backend", BACKEND_IGNORE_PATTERNS),
+                ("Frontend", "frontend", FRONTEND_IGNORE_PATTERNS),
+            )
+            if (project_path / folder).exists()
+        ]
+        archive_roots = [folder for _, folder, _ in roots]
+        files_archive = None
+
+        # Los bytes escritos se acumulan durante la copia, sin recorrer el backup después
+        if roots and _archive_tools_available():
+            # Un único stream tar | zstd en lugar de copiar archivo por archivo
+            files_archive = FILES_ARCHIVE_NAME
+            files_size = _create_files_archive(
+                project_path,
+                [(folder, patterns) for _, folder, patterns in roots],
+                backup_path / files_archive
+            )
+            for label, _, _ in roots:
+                logger.success(f"{label} files backed up")
+        else:
+            # Sin tar/zstd: árbol de directorios con archivos deduplicados
+            # contra el almacén de objetos, backend y frontend en paralelo
+            files_size = 0
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = {
+                    label: executor.submit(
+                        _walk_copy,
+                        project_path / folder,
+                        backup_path / folder,
+                        *_split_ignore_patterns(patterns),
+                        copy_function=self._link_from_store
+                    )
+                    for label, folder, patterns in roots
+                }
+                for label, future in futures.items():
+                    files_size += future.result()
+                    logger.success(f"{label} files backed up")
+
+        # 2. Copiar archivos de configuración
+        logger.step("Backing up configuration files")
+
+        # Un único scandir en lugar de un exists() por archivo
+        for config_file, src_file in _find_files(project_path, CONFIG_FILES).items():
+            _sendfile_copy(src_file, backup_path / config_file)
+            files_size += os.path.getsize(backup_path / config_file)
+
+        # Copiar .env del backend
+        backend_env = project_path / "backend" / ".env"
+        if backend_env.exists():
+            _sendfile_copy(backend_env, backup_path / "backend.env")
+            files_size += os.path.getsize(backup_path / "backend.env")
+
+        logger.success("Configuration files backed up")
+
+        return files_size, files_archive, archive_roots
+
     def _backup_database(
         self,
         project_config: Dict,
@@ -183,6 +293,8 @@ class BackupManager:
         Returns:
             Tupla (success, backup_filename)
         """
+        from .docker_manager import _docker_bin
+
         try:
             stack = project_config.get('stack')
             db_config = project_config.get('database', {})
@@ -196,28 +308,22 @@ class BackupManager:
                 db_user = 'root'
                 db_password = db_config.get('root_password', 'root')
 
-                backup_file = backup_path / "database_backup.sql"
+                backup_file = backup_path / "database_backup.sql.gz"
 
                 cmd = [
-                    'docker', 'exec', container_name,
+                    _docker_bin(), 'exec', container_name,
                     'mysqldump',
                     '-u', db_user,
                     f'-p{db_password}',
                     db_name
                 ]
 
-                with open(backup_file, 'w') as f:
-                    result = subprocess.run(
-                        cmd,
-                        stdout=f,
-                        stderr=subprocess.PIPE,
-                        text=True
-                    )
+                success, error = self._dump_to_gzip(cmd, backup_file)
 
-                if result.returncode == 0:
-                    return True, "database_backup.sql"
+                if success:
+                    return True, backup_file.name
                 else:
-                    logger.log_debug(f"mysqldump error: {result.stderr}")
+                    logger.log_debug(f"mysqldump error: {error}")
                     return False, None
 
             elif stack == 'springboot-vue':
@@ -226,27 +332,21 @@ class BackupManager:
                 db_name = db_config.get('database', 'springboot_db')
                 db_user = db_config.get('username', 'postgres')
 
-                backup_file = backup_path / "database_backup.sql"
+                backup_file = backup_path / "database_backup.sql.gz"
 
                 cmd = [
-                    'docker', 'exec', container_name,
+                    _docker_bin(), 'exec', container_name,
                     'pg_dump',
                     '-U', db_user,
                     db_name
                 ]
 
-                with open(backup_file, 'w') as f:
-                    result = subprocess.run(
-                        cmd,
-                        stdout=f,
-                        stderr=subprocess.PIPE,
-                        text=True
-                    )
+                success, error = self._dump_to_gzip(cmd, backup_file)
 
-                if result.returncode == 0:
-                    return True, "database_backup.sql"
+                if success:
+                    return True, backup_file.name
                 else:
-                    logger.log_debug(f"pg_dump error: {result.stderr}")
+                    logger.log_debug(f"pg_dump error: {error}")
                     return False, None
 
             return False, None
@@ -255,13 +355,59 @@ class BackupManager:
             logger.log_debug(f"Database backup error: {str(e)}")
             return False, None
 
+    def _dump_to_gzip(self, cmd: List[str], backup_file: Path) -> Tuple[bool, str]:
+        """
+        Ejecuta un comando de dump y comprime su salida en streaming
+
+        Usa pigz si está instalado para comprimir en varios cores; si no,
+        comprime en proceso con gzip.
+
+        Args:
+            cmd: Comando de dump (mysqldump/pg_dump vía docker exec)
+            backup_file: Archivo .gz de destino
+
+        Returns:
+            Tupla (success, stderr del dump)
+        """
+        pigz = shutil.which('pigz')
+
+        # Pipe de 1 MiB en lugar de los 64 KiB por defecto (pipesize aplica en Linux)
+        popen_kwargs = {
+            'stdout': subprocess.PIPE,
+            'stderr': subprocess.PIPE,
+            'bufsize': DUMP_CHUNK_SIZE,
+            'pipesize': DUMP_CHUNK_SIZE,
+        }
+
+        if pigz:
+            with open(backup_file, 'wb') as f:
+                dump = subprocess.Popen(cmd, **popen_kwargs)
+                compressor = subprocess.Popen([pigz, '-1'], stdin=dump.stdout, stdout=f)
+                # Solo pigz debe mantener abierto el extremo de lectura
+                dump.stdout.close()
+                _, stderr = dump.communicate()
+                compressor.wait()
+
+            success = dump.returncode == 0 and compressor.returncode == 0
+        else:
+            with gzip.open(backup_file, 'wb', compresslevel=1) as gz:
+                dump = subprocess.Popen(cmd, **popen_kwargs)
+                shutil.copyfileobj(dump.stdout, gz, length=DUMP_CHUNK_SIZE)
+                _, stderr = dump.communicate()
+
+            success = dump.returncode == 0
+
+        return success, stderr.decode('utf-8', errors='replace')
+
     def _create_metadata(
         self,
         backup_id: str,
         project_config: Dict,
         project_path: Path,
         db_backup_file: Optional[str],
-        custom_name: Optional[str]
+        custom_name: Optional[str],
+        files_archive: Optional[str] = None,
+        archive_roots: Optional[List[str]] = None
     ) -> Dict:
         """
         Crea metadata del backup
@@ -272,28 +418,15 @@ class BackupManager:
             project_path: Path del proyecto
             db_backup_file: Nombre del archivo de DB backup
             custom_name: Nombre personalizado
+            files_archive: Nombre del archivo .tar.zst (None si es árbol de directorios)
+            archive_roots: Directorios incluidos en el archivo
 
         Returns:
             Dict con metadata
         """
-        # Obtener commits actuales
-        backend_commit = None
-        frontend_commit = None
-
-        try:
-            from .git_manager import GitManager
-
-            backend_path = project_path / "backend"
-            if backend_path.exists():
-                git_manager = GitManager(backend_path)
-                backend_commit = git_manager.get_current_commit_short()
-
-            frontend_path = project_path / "frontend"
-            if frontend_path.exists():
-                git_manager = GitManager(frontend_path)
-                frontend_commit = git_manager.get_current_commit_short()
-        except Exception:
-            pass
+        # Obtener commits actuales leyendo .git directamente (sin subprocess)
+        backend_commit = _read_git_head(project_path / "backend")
+        frontend_commit = _read_git_head(project_path / "frontend")
 
         metadata = {
             "backup_id": backup_id,
@@ -310,6 +443,8 @@ class BackupManager:
             },
             "database_backup": db_backup_file is not None,
             "database_backup_file": db_backup_file,
+            "files_archive": files_archive,
+            "archive_roots": archive_roots or [],
             "files_included": [
                 "backend/",
                 "frontend/",
@@ -321,7 +456,46 @@ class BackupManager:
 
         return metadata
 
-    def _get_directory_size(self, path: Path) -> int:
+    def _save_metadata(self, backup_path: Path, metadata: Dict):
+        """
+        Guarda la metadata del backup en JSON y, si msgpack está disponible,
+        también en un sidecar binario más rápido de leer
+
+        Args:
+            backup_path: Path del backup
+            metadata: Metadata a guardar
+        """
+        save_json_file(backup_path / METADATA_FILE_NAME, metadata)
+
+        if msgpack is not None:
+            (backup_path / METADATA_MSGPACK_NAME).write_bytes(
+                msgpack.packb(metadata, use_bin_type=True)
+            )
+
+    def _load_metadata(self, backup_path: Path) -> Optional[Dict]:
+        """
+        Carga la metadata del backup, prefiriendo el sidecar msgpack
+
+        Args:
+            backup_path: Path del backup
+
+        Returns:
+            Dict con metadata o None si no existe
+        """
+        if msgpack is not None:
+            try:
+                return msgpack.unpackb(
+                    (backup_path / METADATA_MSGPACK_NAME).read_bytes(),
+                    raw=False
+                )
+            except (OSError, ValueError, msgpack.UnpackException):
+                # Sin sidecar (backup antiguo) o ilegible: usar el JSON
+                pass
+
+        return load_json_file(backup_path / METADATA_FILE_NAME)
+
+    @staticmethod
+    def _get_directory_size(path: Path) -> int:
         """
         Calcula tamaño total de un directorio
 
@@ -332,14 +506,24 @@ class BackupManager:
             Tamaño en bytes
         """
         total = 0
-        try:
-            for entry in os.scandir(path):
-                if entry.is_file(follow_symlinks=False):
-                    total += entry.stat().st_size
-                elif entry.is_dir(follow_symlinks=False):
-                    total += self._get_directory_size(Path(entry.path))
-        except Exception:
-            pass
+        stack = [str(path)]
+
+        # Recorrido iterativo: DirEntry ya trae el tipo y stat cacheados de scandir
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            try:
+                                total += entry.stat(follow_symlinks=False).st_size
+                            except OSError:
+                                pass
+            except OSError:
+                pass
+
         return total
 
     def list_backups(self) -> List[Dict]:
@@ -355,17 +539,28 @@ class BackupManager:
             if not self.backups_dir.exists():
                 return backups
 
-            for backup_dir in sorted(self.backups_dir.iterdir(), reverse=True):
-                if not backup_dir.is_dir():
-                    continue
+            # scandir trae el tipo de entrada sin un stat adicional por directorio
+            with os.scandir(self.backups_dir) as it:
+                entries = [
+                    e for e in it
+                    if e.is_dir(follow_symlinks=False) and not e.name.startswith('.')
+                ]
+            entries.sort(key=lambda e: e.name, reverse=True)
 
-                metadata_file = backup_dir / "backup-metadata.json"
+            for entry in entries:
+                backup_dir = Path(entry.path)
 
-                if metadata_file.exists():
-                    metadata = load_json_file(metadata_file)
+                # None si el backup no tiene metadata
+                metadata = self._load_metadata(backup_dir)
+
+                if metadata is not None:
+                    # Usar tamaño cacheado; backups antiguos se calculan una vez
+                    size_bytes = metadata.get('size_bytes')
+                    if size_bytes is None:
+                        size_bytes = self._get_directory_size(backup_dir)
+                        metadata['size_bytes'] = size_bytes
+                        self._save_metadata(backup_dir, metadata)
 
-                    # Calcular tamaño
-                    size_bytes = self._get_directory_size(backup_dir)
                     size_mb = size_bytes / (1024 * 1024)
 
                     metadata['size_mb'] = round(size_mb, 2)
@@ -375,7 +570,7 @@ class BackupManager:
                 else:
                     # Backup sin metadata (legacy o corrupto)
                     backups.append({
-                        "backup_id": backup_dir.name,
+                        "backup_id": entry.name,
                         "timestamp": None,
                         "project": {},
                         "size_mb": round(self._get_directory_size(backup_dir) / (1024 * 1024), 2),
@@ -404,12 +599,11 @@ class BackupManager:
         if not backup_path.exists():
             return None
 
-        metadata_file = backup_path / "backup-metadata.json"
+        metadata = self._load_metadata(backup_path)
 
-        if not metadata_file.exists():
+        if metadata is None:
             return None
 
-        metadata = load_json_file(metadata_file)
         metadata['path'] = str(backup_path)
 
         return metadata
@@ -438,58 +632,65 @@ class BackupManager:
                 logger.error(f"Backup not found: {backup_id}")
                 return False
 
-            metadata_file = backup_path / "backup-metadata.json"
-            if not metadata_file.exists():
+            metadata = self._load_metadata(backup_path)
+            if metadata is None:
                 logger.error("Backup metadata not found (corrupted backup)")
                 return False
 
-            metadata = load_json_file(metadata_file)
-
             logger.header(f"Restoring Backup: {backup_id}")
 
             # 1. Restaurar archivos del proyecto
             logger.step("Restoring project files")
 
-            # Backend
-            backend_src = backup_path / "backend"
-            if backend_src.exists():
-                backend_dst = target_path / "backend"
-                if backend_dst.exists():
-                    shutil.rmtree(backend_dst)
-                shutil.copytree(backend_src, backend_dst)
-                logger.success("Backend files restored")
-
-            # Frontend
-            frontend_src = backup_path / "frontend"
-            if frontend_src.exists():
-                frontend_dst = target_path / "frontend"
-                if frontend_dst.exists():
-                    shutil.rmtree(frontend_dst)
-                shutil.copytree(frontend_src, frontend_dst)
-                logger.success("Frontend files restored")
+            files_archive = metadata.get('files_archive')
+
+            if files_archive:
+                # Backup en formato tar.zst
+                archive_roots = metadata.get('archive_roots', ['backend', 'frontend'])
+                for folder in archive_roots:
+                    dst = target_path / folder
+                    if dst.exists():
+                        shutil.rmtree(dst)
+
+                _extract_files_archive(backup_path / files_archive, target_path)
+
+                for folder in archive_roots:
+                    logger.success(f"{folder.capitalize()} files restored")
+            else:
+                # Backup como árbol de directorios: backend y frontend en paralelo
+                copy_jobs = []
+
+                for label, folder in (("Backend", "backend"), ("Frontend", "frontend")):
+                    src = backup_path / folder
+                    if src.exists():
+                        dst = target_path / folder
+                        if dst.exists():
+                            shutil.rmtree(dst)
+                        copy_jobs.append((label, src, dst))
+
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    futures = {
+                        label: executor.submit(_fast_copytree, src, dst)
+                        for label, src, dst in copy_jobs
+                    }
+                    for label, future in futures.items():
+                        future.result()
+                        logger.success(f"{label} files restored")
 
             # 2. Restaurar configuración
             logger.step("Restoring configuration files")
 
-            config_files = [
-                "docker-compose.yml",
-                "nginx.conf",
-                "Dockerfile.php",
-                "Dockerfile.java",
-                ".project-config.json",
-                ".credentials.json"
-            ]
+            # Un único scandir en lugar de un exists() por archivo
+            found = _find_files(backup_path, (*CONFIG_FILES, "backend.env"))
+            backend_env_src = found.pop("backend.env", None)
 
-            for config_file in config_files:
-                src_file = backup_path / config_file
-                if src_file.exists():
-                    shutil.copy2(src_file, target_path / config_file)
+            for config_file, src_file in found.items():
+                _sendfile_copy(src_file, target_path / config_file)
 
             # Restaurar .env
-            backend_env_src = backup_path / "backend.env"
-            if backend_env_src.exists():
+            if backend_env_src is not None:
                 backend_env_dst = target_path / "backend" / ".env"
-                shutil.copy2(backend_env_src, backend_env_dst)
+                _sendfile_copy(backend_env_src, backend_env_dst)
 
             logger.success("Configuration files restored")
 
@@ -540,7 +741,7 @@ class BackupManager:
 
         Args:
             project_info: Info del proyecto
-            db_backup_file: Path al archivo SQL
+            db_backup_file: Path al archivo SQL (.sql o .sql.gz)
             project_path: Path del proyecto
 
         Returns:
@@ -565,24 +766,7 @@ class BackupManager:
                 db_user = 'root'
                 db_password = db_config.get('root_password', 'root')
 
-                # Copiar archivo SQL al contenedor
-                subprocess.run(
-                    ['docker', 'cp', str(db_backup_file), f"{container_name}:/tmp/restore.sql"],
-                    check=True
-                )
-
-                # Restaurar
-                cmd = [
-                    'docker', 'exec', container_name,
-                    'mysql',
-                    '-u', db_user,
-                    f'-p{db_password}',
-                    db_name,
-                    '-e', 'source /tmp/restore.sql'
-                ]
-
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                return result.returncode == 0
+                client = ['mysql', '-u', db_user, f'-p{db_password}', db_name]
 
             elif stack == 'springboot-vue':
                 # PostgreSQL restore
@@ -590,36 +774,71 @@ class BackupManager:
                 db_name = db_config.get('database', 'springboot_db')
                 db_user = db_config.get('username', 'postgres')
 
-                # Copiar archivo SQL al contenedor
-                subprocess.run(
-                    ['docker', 'cp', str(db_backup_file), f"{container_name}:/tmp/restore.sql"],
-                    check=True
-                )
-
-                # Restaurar
-                cmd = [
-                    'docker', 'exec', container_name,
-                    'psql',
-                    '-U', db_user,
-                    '-d', db_name,
-                    '-f', '/tmp/restore.sql'
-                ]
+                client = ['psql', '-U', db_user, '-d', db_name]
 
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                return result.returncode == 0
+            else:
+                return False
 
-            return False
+            return self._pipe_sql_into_container(container_name, client, db_backup_file)
 
         except Exception as e:
             logger.log_debug(f"Database restore error: {str(e)}")
             return False
 
-    def delete_backup(self, backup_id: str) -> bool:
+    def _pipe_sql_into_container(
+        self,
+        container_name: str,
+        client: List[str],
+        db_backup_file: Path
+    ) -> bool:
+        """
+        Ejecuta un cliente SQL en el contenedor alimentándolo por stdin
+
+        Los dumps .gz viajan comprimidos y se descomprimen dentro del contenedor.
+        Antes se verifican completos en el host: en `gunzip -c | mysql` solo
+        cuenta el código del cliente, que aplicaría un dump truncado y
+        terminaría con éxito.
+
+        Args:
+            container_name: Nombre del contenedor de base de datos
+            client: Comando del cliente (mysql/psql) con sus argumentos
+            db_backup_file: Path al archivo SQL (.sql o .sql.gz)
+
+        Returns:
+            True si exitoso
+        """
+        from .docker_manager import _docker_bin
+
+        if db_backup_file.suffix == '.gz':
+            if not _gzip_is_intact(db_backup_file):
+                logger.log_error(f"Database dump is truncated or corrupt: {db_backup_file}")
+                return False
+
+            cmd = [
+                _docker_bin(), 'exec', '-i', container_name,
+                'sh', '-c', f"gunzip -c | {shlex.join(client)}"
+            ]
+        else:
+            cmd = [_docker_bin(), 'exec', '-i', container_name, *client]
+
+        with open(db_backup_file, 'rb') as f:
+            result = subprocess.run(cmd, stdin=f, capture_output=True)
+
+        if result.returncode != 0:
+            logger.log_debug(
+                f"SQL restore error: {result.stderr.decode('utf-8', errors='replace')}"
+            )
+            return False
+
+        return True
+
+    def delete_backup(self, backup_id: str, prune: bool = True) -> bool:
         """
         Elimina un backup
 
         Args:
             backup_id: ID del backup
+            prune: Si eliminar del almacén los objetos que quedan sin referencias
 
         Returns:
             True si exitoso
@@ -631,7 +850,10 @@ class BackupManager:
                 logger.error(f"Backup not found: {backup_id}")
                 return False
 
-            shutil.rmtree(backup_path)
+            fast_rmtree(backup_path)
+            if prune:
+                self.prune_objects()
+
             logger.success(f"Backup deleted: {backup_id}")
             return True
 
@@ -640,6 +862,92 @@ class BackupManager:
             logger.log_exception(e)
             return False
 
+    def _store_file(self, src) -> Path:
+        """
+        Guarda un archivo en el almacén de objetos direccionado por contenido
+
+        La clave incluye los permisos para que los hardlinks conserven el modo.
+
+        Args:
+            src: Archivo a guardar
+
+        Returns:
+            Path del objeto en el almacén
+        """
+        key = _hash_file(src)
+        mode = stat.S_IMODE(os.stat(src).st_mode)
+        obj = self.objects_dir / key[:2] / f"{key[2:]}_{mode:o}"
+
+        if not obj.exists():
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            # Copia temporal + rename: otro thread puede estar guardando el mismo objeto
+            fd, tmp_path = tempfile.mkstemp(dir=obj.parent)
+            os.close(fd)
+            try:
+                _sendfile_copy(src, tmp_path)
+                os.replace(tmp_path, obj)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+
+        return obj
+
+    def _link_from_store(self, src, dst):
+        """
+        Copia un archivo al backup como hardlink a su objeto en el almacén
+
+        Si el filesystem no permite el hardlink (o se alcanzó el límite de
+        enlaces del objeto), copia el archivo.
+
+        Args:
+            src: Archivo origen
+            dst: Archivo destino dentro del backup
+
+        Returns:
+            Path de destino
+        """
+        obj = self._store_file(src)
+        try:
+            os.link(obj, dst)
+        except OSError:
+            _sendfile_copy(obj, dst)
+        return dst
+
+    def prune_objects(self) -> int:
+        """
+        Elimina objetos del almacén que ya no están enlazados desde ningún backup
+
+        Returns:
+            Cantidad de objetos eliminados
+        """
+        removed = 0
+
+        if not self.objects_dir.exists():
+            return removed
+
+        with os.scandir(self.objects_dir) as prefixes:
+            for prefix in prefixes:
+                if not prefix.is_dir(follow_symlinks=False):
+                    continue
+                with os.scandir(prefix.path) as entries:
+                    for entry in entries:
+                        try:
+                            # os.lstat: DirEntry.stat() no rellena st_nlink en Windows
+                            if os.lstat(entry.path).st_nlink <= 1:
+                                os.unlink(entry.path)
+                                removed += 1
+                        except OSError:
+                            pass
+
+                # Eliminar el prefijo si quedó vacío
+                try:
+                    os.rmdir(prefix.path)
+                except OSError:
+                    pass
+
+        return removed
+
     def cleanup_old_backups(self, keep_count: int = 10) -> int:
         """
         Elimina backups antiguos, manteniendo solo los más recientes
@@ -656,16 +964,22 @@ class BackupManager:
             if len(backups) <= keep_count:
                 return 0
 
-            # Ordenar por timestamp (más reciente primero)
-            backups.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+            # Seleccionar solo los más antiguos, sin ordenar la lista completa
+            to_delete = heapq.nsmallest(
+                len(backups) - keep_count,
+                backups,
+                key=lambda x: x.get('timestamp') or ''
+            )
 
-            # Eliminar los más antiguos
-            deleted_count = 0
-            for backup in backups[keep_count:]:
-                if self.delete_backup(backup['backup_id']):
-                    deleted_count += 1
+            # Eliminar los más antiguos en paralelo
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(
+                    lambda backup: self.delete_backup(backup['backup_id'], prune=False),
+                    to_delete
+                ))
 
-            return deleted_count
+            self.prune_objects()
+            return sum(results)
 
         except Exception as e:
             logger.error(f"Error cleaning up backups: {str(e)}")
@@ -674,6 +988,536 @@ class BackupManager:
 
 # Helper functions
 
+def _fast_copytree(
+    src: Path,
+    dst: Path,
+    excludes: Iterable[str] = ()
+) -> int:
+    """
+    Copia un árbol de directorios con la herramienta nativa del sistema
+
+    Usa robocopy en Windows y rsync en Linux/macOS. Si rsync no está
+    instalado, recurre a la copia con threads de Python.
+
+    Los hardlinks no se preservan: en un backup como árbol de directorios
+    los archivos idénticos apuntan al mismo objeto del almacén, y el
+    proyecto restaurado debe tener un inode independiente por archivo.
+
+    Args:
+        src: Directorio origen
+        dst: Directorio destino
+        excludes: Patrones a excluir (misma semántica que shutil.ignore_patterns)
+
+    Returns:
+        Bytes copiados
+
+    Raises:
+        RuntimeError: Si la herramienta nativa falla
+    """
+    excludes = tuple(excludes)
+
+    # En un filesystem copy-on-write la copia es solo de metadata
+    if _supports_reflink(src, Path(dst).parent):
+        return _walk_copy(src, dst, *_split_ignore_patterns(excludes), copy_function=_fast_copy)
+
+    if sys.platform == 'win32':
+        # robocopy solo entiende nombres; los patrones con ruta se omiten
+        names = [e for e in excludes if '/' not in e]
+        cmd = [
+            'robocopy', str(src), str(dst),
+            '/E', '/MT:16', '/NFL', '/NDL', '/NJH', '/NJS', '/NP'
+        ]
+        if names:
+            cmd += ['/XD', *names, '/XF', *names]
+
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+
+        # robocopy devuelve códigos < 8 cuando la copia fue exitosa
+        if result.returncode > 7:
+            raise RuntimeError(f"robocopy failed ({result.returncode}): {result.stdout.strip()}")
+
+        # El resumen de robocopy depende del idioma del sistema; se mide el destino
+        return BackupManager._get_directory_size(dst)
+
+    if shutil.which('rsync'):
+        cmd = ['rsync', '-a', '--stats', *[f'--exclude={e}' for e in excludes]]
+        cmd += [f"{src}{os.sep}", f"{dst}{os.sep}"]
+
+        if logger.is_debug_enabled():
+            logger.log_debug("Running: %s", shlex.join(cmd))
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+
+        if result.returncode != 0:
+            raise RuntimeError(f"rsync failed ({result.returncode}): {result.stderr.strip()}")
+
+        match = _RSYNC_TOTAL_SIZE_RE.search(result.stdout)
+        if match:
+            return int(re.sub(r'[^\d]', '', match.group(1)))
+        return BackupManager._get_directory_size(dst)
+
+    return _walk_copy(src, dst, *_split_ignore_patterns(excludes))
+
+
+@functools.lru_cache(maxsize=None)
+def _log_hash_acceleration() -> None:
+    """Registra (una vez) si la CPU expone instrucciones SHA para OpenSSL"""
+    sha_ni = None
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/cpuinfo', 'r') as f:
+                sha_ni = any(
+                    line.startswith('flags') and ' sha_ni' in line for line in f
+                )
+        except OSError:
+            pass
+
+    # Con OpenSSL, hashlib.sha256 devuelve un objeto HASH de _hashlib; sin él,
+    # el del módulo builtin _sha256
+    openssl = type(hashlib.sha256()).__module__ == '_hashlib'
+    logger.log_debug(
+        f"Dedup hashing: sha256 via {'OpenSSL' if openssl else 'builtin'}, "
+        f"file_digest={hasattr(hashlib, 'file_digest')}, sha_ni={sha_ni}"
+    )
+
+
+def _hash_file(path) -> str:
+    """
+    Calcula el sha256 de un archivo
+
+    Usa hashlib.file_digest (Python 3.11+); los archivos grandes se mapean en
+    memoria y se pasan completos a hashlib, sin bucle de lectura en Python.
+
+    Args:
+        path: Archivo a hashear
+
+    Returns:
+        Hash sha256 en hexadecimal
+    """
+    _log_hash_acceleration()
+
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+
+        if size > HASH_MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return hashlib.sha256(mapped).hexdigest()
+
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(DUMP_CHUNK_SIZE), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+def _gzip_is_intact(path: Path) -> bool:
+    """
+    Verifica un .gz completo (equivalente a `gzip -t`) descomprimiendo por bloques
+
+    Returns:
+        True si el archivo se descomprime sin errores hasta el final
+    """
+    try:
+        with gzip.open(path, 'rb') as f:
+            while f.read(DUMP_CHUNK_SIZE):
+                pass
+        return True
+    except (OSError, EOFError, zlib.error):
+        return False
+
+
+@functools.lru_cache(maxsize=1)
+def _tar_is_gnu() -> bool:
+    """Verifica si `tar` es GNU tar (bsdtar usa el código 1 para errores reales)"""
+    try:
+        result = subprocess.run(['tar', '--version'], capture_output=True, text=True, check=False)
+    except OSError:
+        return False
+    return 'GNU tar' in result.stdout
+
+
+def _archive_tools_available() -> bool:
+    """
+    Verifica si tar y zstd están disponibles para crear/leer archivos .tar.zst
+
+    Returns:
+        True si ambos comandos existen
+    """
+    return shutil.which('tar') is not None and shutil.which('zstd') is not None
+
+
+def _create_files_archive(
+    project_path: Path,
+    roots: List[Tuple[str, Iterable[str]]],
+    archive_path: Path
+) -> int:
+    """
+    Empaqueta directorios del proyecto en un .tar.zst con un pipeline tar | zstd
+
+    Cada patrón se excluye bajo su directorio raíz a cualquier profundidad
+    (ej: 'vendor' -> 'backend/vendor' y 'backend/*/vendor').
+
+    Con GNU tar el código 1 ("file changed as we read it", habitual en un
+    proyecto en uso) no es fatal: el archivo generado es utilizable.
+
+    Args:
+        project_path: Path del proyecto
+        roots: Lista de (directorio, patrones a excluir)
+        archive_path: Archivo .tar.zst de destino
+
+    Returns:
+        Tamaño del archivo generado en bytes
+
+    Raises:
+        RuntimeError: Si tar o zstd fallan
+    """
+    gnu_tar = _tar_is_gnu()
+    tar_cmd = ['tar', '--warning=no-file-changed'] if gnu_tar else ['tar']
+    for folder, patterns in roots:
+        for pattern in patterns:
+            tar_cmd += [f'--exclude={folder}/{pattern}', f'--exclude={folder}/*/{pattern}']
+    tar_cmd += ['-cf', '-', *[folder for folder, _ in roots]]
+
+    if logger.is_debug_enabled():
+        logger.log_debug("Running: %s | zstd -T0 -3", shlex.join(tar_cmd))
+
+    tar = subprocess.Popen(
+        tar_cmd,
+        cwd=project_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    zstd = subprocess.Popen(
+        ['zstd', '-T0', '-3', '-q', '-o', str(archive_path)],
+        stdin=tar.stdout,
+        stderr=subprocess.PIPE
+    )
+    # Solo zstd debe mantener abierto el extremo de lectura
+    tar.stdout.close()
+    _, tar_err = tar.communicate()
+    _, zstd_err = zstd.communicate()
+
+    if tar.returncode == 1 and gnu_tar:
+        logger.warning("Some files changed while they were being archived")
+        logger.log_debug("tar: %s", tar_err.decode(errors='replace').strip())
+    elif tar.returncode != 0:
+        raise RuntimeError(f"tar failed ({tar.returncode}): {tar_err.decode(errors='replace').strip()}")
+    if zstd.returncode != 0:
+        raise RuntimeError(f"zstd failed ({zstd.returncode}): {zstd_err.decode(errors='replace').strip()}")
+
+    return os.path.getsize(archive_path)
+
+
+def _extract_files_archive(archive_path: Path, target_path: Path) -> None:
+    """
+    Extrae un .tar.zst creado por _create_files_archive con zstd -dc | tar -x
+
+    Args:
+        archive_path: Archivo .tar.zst
+        target_path: Directorio donde extraer
+
+    Raises:
+        RuntimeError: Si faltan las herramientas o la extracción falla
+    """
+    if not _archive_tools_available():
+        raise RuntimeError("tar and zstd are required to restore this backup")
+
+    zstd = subprocess.Popen(
+        ['zstd', '-dc', '-q', str(archive_path)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    tar = subprocess.Popen(
+        ['tar', '-xf', '-', '-C', str(target_path)],
+        stdin=zstd.stdout,
+        stderr=subprocess.PIPE
+    )
+    zstd.stdout.close()
+    _, zstd_err = zstd.communicate()
+    _, tar_err = tar.communicate()
+
+    if zstd.returncode != 0:
+        raise RuntimeError(f"zstd failed ({zstd.returncode}): {zstd_err.decode(errors='replace').strip()}")
+    if tar.returncode != 0:
+        raise RuntimeError(f"tar failed ({tar.returncode}): {tar_err.decode(errors='replace').strip()}")
+
+
+def _walk_copy(
+    src: Path,
+    dst: Path,
+    ignore_dirs: Iterable[str] = (),
+    ignore_files: Iterable[str] = (),
+    ignore_glob_files: Iterable[str] = (),
+    max_workers: int = 8,
+    copy_function: Optional[Callable] = None
+) -> int:
+    """
+    Copia un árbol de directorios filtrando durante el recorrido y copiando con threads
+
+    Los directorios ignorados se podan de os.walk para no descender en ellos.
+    Los patrones con ruta (ej: 'storage/logs/*') se aplican solo al directorio
+    indicado, relativo a src; los patrones sin ruta se aplican en todos.
+
+    Args:
+        src: Directorio origen
+        dst: Directorio destino
+        ignore_dirs: Nombres de directorios a excluir
+        ignore_files: Nombres de archivos a excluir
+        ignore_glob_files: Patrones glob a excluir
+        max_workers: Cantidad de threads para copiar archivos
+        copy_function: Función usada para copiar cada archivo (por defecto _sendfile_copy)
+
+    Returns:
+        Bytes copiados
+    """
+    copy_function = copy_function or _sendfile_copy
+    ignore_dirs = frozenset(ignore_dirs)
+    ignore_files = frozenset(ignore_files)
+
+    # Precalcular a qué directorio aplica cada glob
+    name_globs = []
+    dir_globs: Dict[str, List[str]] = {}
+    for pattern in ignore_glob_files:
+        if '/' in pattern:
+            directory, name_pattern = pattern.rsplit('/', 1)
+            dir_globs.setdefault(directory, []).append(name_pattern)
+        else:
+            name_globs.append(pattern)
+
+    def matches_glob(name: str, globs: List[str]) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) for pattern in globs)
+
+    os.makedirs(dst, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+
+        # followlinks=True replica el comportamiento por defecto de copytree
+        for root, dirs, files in os.walk(src, topdown=True, followlinks=True):
+            rel_root = os.path.relpath(root, src)
+            target_root = dst if rel_root == '.' else os.path.join(dst, rel_root)
+            globs = name_globs + dir_globs.get(rel_root.replace(os.sep, '/'), [])
+
+            dirs[:] = [d for d in dirs if d not in ignore_dirs]
+            if globs:
+                dirs[:] = [d for d in dirs if not matches_glob(d, globs)]
+
+            for dir_name in dirs:
+                os.makedirs(os.path.join(target_root, dir_name), exist_ok=True)
+
+            for file_name in files:
+                if file_name in ignore_files or (globs and matches_glob(file_name, globs)):
+                    continue
+                futures.append(executor.submit(
+                    _copy_and_measure,
+                    copy_function,
+                    os.path.join(root, file_name),
+                    os.path.join(target_root, file_name)
+                ))
+
+        # Propagar el primer error de copia
+        return sum(future.result() for future in futures)
+
+
+def _split_ignore_patterns(patterns: Iterable[str]) -> Tuple[frozenset, frozenset, tuple]:
+    """
+    Separa patrones estilo shutil.ignore_patterns en los argumentos de _walk_copy
+
+    Los nombres literales excluyen tanto directorios como archivos (igual que
+    shutil.ignore_patterns); los que tienen comodines o ruta se tratan como globs.
+
+    Args:
+        patterns: Patrones a excluir
+
+    Returns:
+        Tupla (ignore_dirs, ignore_files, ignore_glob_files)
+    """
+    patterns = tuple(patterns)
+    literal_names = frozenset(p for p in patterns if not any(c in p for c in '*?[/'))
+    globs = tuple(p for p in patterns if p not in literal_names)
+    return literal_names, literal_names, globs
+
+
+def _copy_and_measure(copy_function: Callable, src: str, dst: str) -> int:
+    """
+    Copia un archivo y devuelve su tamaño
+
+    Args:
+        copy_function: Función de copia
+        src: Archivo origen
+        dst: Archivo destino
+
+    Returns:
+        Tamaño en bytes del archivo copiado
+    """
+    copy_function(src, dst)
+    return os.stat(dst).st_size
+
+
+def _find_files(directory: Path, names: Iterable[str]) -> Dict[str, str]:
+    """
+    Busca archivos por nombre en un directorio con una sola pasada de scandir
+
+    Args:
+        directory: Directorio donde buscar
+        names: Nombres de archivo buscados
+
+    Returns:
+        Dict nombre -> path de los archivos encontrados
+    """
+    wanted = frozenset(names)
+    found = {}
+
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name in wanted and entry.is_file(follow_symlinks=False):
+                    found[entry.name] = entry.path
+    except OSError:
+        pass
+
+    return found
+
+
+def _read_git_head(repo_path: Path) -> Optional[str]:
+    """
+    Lee el commit actual (hash corto) de un repositorio sin invocar git
+
+    Args:
+        repo_path: Path del repositorio
+
+    Returns:
+        Hash corto del commit o None si no es un repositorio
+    """
+    try:
+        git_dir = repo_path / '.git'
+
+        # Worktrees/submódulos: .git es un archivo con "gitdir: <path>"
+        if git_dir.is_file():
+            git_dir = (repo_path / git_dir.read_text().strip()[len('gitdir: '):]).resolve()
+
+        head = git_dir / 'HEAD'
+        if not head.exists():
+            return None
+
+        ref = head.read_text().strip()
+        if not ref.startswith('ref: '):
+            return ref[:7]
+
+        ref_name = ref[len('ref: '):]
+        ref_file = git_dir / ref_name
+        if ref_file.exists():
+            return ref_file.read_text().strip()[:7]
+
+        # Refs empaquetadas tras `git gc`
+        packed_refs = git_dir / 'packed-refs'
+        if packed_refs.exists():
+            for line in packed_refs.read_text().splitlines():
+                if line.endswith(f' {ref_name}'):
+                    return line.split(' ', 1)[0][:7]
+
+        return None
+    except OSError:
+        return None
+
+
+def _reflink(src, dst) -> bool:
+    """
+    Intenta clonar un archivo con copy-on-write (FICLONE en Linux, clonefile en macOS)
+
+    Args:
+        src: Archivo origen
+        dst: Archivo destino
+
+    Returns:
+        True si el archivo fue clonado
+    """
+    try:
+        if sys.platform.startswith('linux'):
+            import fcntl
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return True
+
+        if sys.platform == 'darwin':
+            import ctypes
+            libc = ctypes.CDLL('libc.dylib', use_errno=True)
+            return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+    except (OSError, AttributeError):
+        pass
+
+    return False
+
+
+def _supports_reflink(src_dir: Path, dst_dir: Path) -> bool:
+    """
+    Verifica si dos directorios están en el mismo filesystem con soporte de reflinks
+
+    El resultado se cachea por dispositivo tras clonar un archivo de prueba.
+
+    Args:
+        src_dir: Directorio origen
+        dst_dir: Directorio destino (debe existir)
+
+    Returns:
+        True si los archivos pueden clonarse entre ambos
+    """
+    try:
+        src_dev = os.stat(src_dir).st_dev
+        if src_dev != os.stat(dst_dir).st_dev:
+            return False
+
+        if src_dev not in _reflink_support:
+            with tempfile.TemporaryDirectory(dir=dst_dir) as tmp:
+                probe = os.path.join(tmp, 'probe')
+                with open(probe, 'wb') as f:
+                    f.write(b'ldm')
+                _reflink_support[src_dev] = _reflink(probe, os.path.join(tmp, 'clone'))
+
+        return _reflink_support[src_dev]
+    except OSError:
+        return False
+
+
+def _fast_copy(src, dst):
+    """
+    Copia un archivo con reflink si es posible, o con _sendfile_copy si no
+
+    Args:
+        src: Archivo origen
+        dst: Archivo destino
+
+    Returns:
+        Path de destino
+    """
+    if _reflink(src, dst):
+        shutil.copystat(src, dst)
+        return dst
+    return _sendfile_copy(src, dst)
+
+
+def _sendfile_copy(src, dst):
+    """
+    Copia un archivo con shutil.copyfile (sendfile en Linux) preservando modo y fechas
+
+    A diferencia de shutil.copy2 no copia xattrs ni flags, y reutiliza un
+    único stat del origen para permisos y mtime.
+
+    Args:
+        src: Archivo origen
+        dst: Archivo destino
+
+    Returns:
+        Path de destino
+    """
+    st = os.stat(src)
+    shutil.copyfile(src, dst)
+    os.chmod(dst, stat.S_IMODE(st.st_mode))
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+    return dst
+
+
 def create_project_backup(
     project_path: Path,
     project_config: Dict,
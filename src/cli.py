@@ -3,23 +3,140 @@ CLI principal usando Click
 Define todos los comandos y subcomandos de LDM
 """
 
-import click
+import os
+import re
 import sys
+import time
+import base64
+import shlex
+import secrets
+import importlib
+import subprocess
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
+from typing import Optional
+
+import click
 
 from .logger import logger
 from .utils import (
     get_version,
     ensure_base_directories,
-    load_config,
+    load_config_cached,
     save_config,
     get_default_config,
     project_exists,
-    get_project_config,
+    try_load_project_config,
+    load_project,
+    NoActiveProject,
     get_active_project_path,
-    save_project_config
+    save_project_config,
+    save_json_file,
+    sync_tree,
+    fast_rmtree,
+    command_exists,
+    validate_domain,
+    validate_url,
+    normalize_git_url,
+    normalize_project_name,
+    generate_secure_password,
+    derive_credentials,
+    load_credentials,
+    load_json_file,
+    CREDENTIALS_FILE_NAME
+)
+
+
+# Líneas finales de `npm run build` que se muestran si el build falla
+BUILD_OUTPUT_TAIL_LINES = 200
+
+# Directorios pesados que compose down no necesita; se borran mientras
+# los contenedores se detienen
+_DESTROY_BULK_DIRS = ('frontend/node_modules', 'backend/vendor', 'backend/node_modules')
+
+# Detección de stack por URL del backend, en orden de prioridad
+_STACK_PATTERNS = (
+    (re.compile(r'laravel|php', re.IGNORECASE), 'laravel-vue'),
+    (re.compile(r'spring|java', re.IGNORECASE), 'springboot-vue'),
 )
 
+# Registro de imports diferidos: nombre -> (módulo, atributo). Los módulos
+# pesados (Docker SDK, GitPython, Jinja2, Rich tables) se importan recién
+# cuando un comando los usa, y una sola vez por proceso
+_LAZY = {
+    'GitManager': ('.git_manager', 'GitManager'),
+    'DockerManager': ('.docker_manager', 'DockerManager'),
+    'check_docker_installed': ('.docker_manager', 'check_docker_installed'),
+    'check_docker_compose_installed': ('.docker_manager', 'check_docker_compose_installed'),
+    'invalidate_compose_cmd_cache': ('.docker_manager', 'invalidate_compose_cmd_cache'),
+    'PortManager': ('.port_manager', 'PortManager'),
+    'SSLManager': ('.ssl_manager', 'SSLManager'),
+    'TemplateManager': ('.template_manager', 'TemplateManager'),
+    'EnvManager': ('.env_manager', 'EnvManager'),
+    'create_env_from_config': ('.env_manager', 'create_env_from_config'),
+    'run_all_validations': ('.validators', 'run_all_validations'),
+    'BackupManager': ('.backup_manager', 'BackupManager'),
+    'HistoryManager': ('.history_manager', 'HistoryManager'),
+    'add_deploy_to_history': ('.history_manager', 'add_deploy_to_history'),
+    'Table': ('rich.table', 'Table'),
+}
+
+# Dependencias que usan init y deploy
+DeployDeps = namedtuple('DeployDeps', [
+    'GitManager',
+    'DockerManager',
+    'PortManager',
+    'SSLManager',
+    'TemplateManager',
+    'create_env_from_config',
+    'check_docker_installed',
+    'check_docker_compose_installed',
+    'invalidate_compose_cmd_cache',
+    'run_all_validations',
+    'add_deploy_to_history',
+])
+
+
+def _lazy(name: str):
+    """
+    Resuelve un nombre del registro _LAZY, importándolo la primera vez
+
+    El resultado se guarda como atributo del módulo, así los accesos
+    siguientes no pasan por importlib.
+
+    Args:
+        name: Nombre registrado en _LAZY
+
+    Returns:
+        La clase o función importada
+    """
+    value = globals().get(name)
+    if value is None:
+        module_name, attr = _LAZY[name]
+        module = importlib.import_module(module_name, __package__)
+        value = getattr(module, attr)
+        globals()[name] = value
+    return value
+
+
+def __getattr__(name: str):
+    """Acceso diferido a los nombres de _LAZY (PEP 562)"""
+    if name in _LAZY:
+        return _lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _load_deploy_deps() -> DeployDeps:
+    """
+    Obtiene las dependencias de init y deploy desde el registro diferido
+
+    Returns:
+        DeployDeps con las clases y funciones necesarias
+    """
+    return DeployDeps(*(_lazy(name) for name in DeployDeps._fields))
+
 
 # === Grupo principal ===
 
@@ -33,12 +150,25 @@ def cli(ctx):
     Sistema de despliegue automatizado para proyectos web en red local.
     Soporta Laravel+Vue3 y SpringBoot+Vue3 con Docker, Nginx y SSL.
     """
-    # Asegurar que existan directorios base
-    ensure_base_directories()
-
-    # Guardar contexto
+    # Guardar contexto; la configuración global se carga solo si se pide
     ctx.ensure_object(dict)
-    ctx.obj['CONFIG'] = load_config()
+    ctx.obj['_config_loader'] = load_config_cached
+
+
+def get_config(ctx: click.Context) -> dict:
+    """
+    Obtiene la configuración global, cargándola en el primer acceso
+
+    Args:
+        ctx: Contexto de Click (de cualquier subcomando)
+
+    Returns:
+        Diccionario con la configuración global
+    """
+    obj = ctx.find_root().obj
+    if 'CONFIG' not in obj:
+        obj['CONFIG'] = obj['_config_loader']()
+    return obj['CONFIG']
 
 
 # === Comando: version ===
@@ -71,22 +201,27 @@ def version():
 @click.option('--https-port', type=int, help='Puerto HTTPS (default: 443)')
 @click.option('--db-port', type=int, help='Puerto de base de datos')
 @click.option('--name', help='Nombre del proyecto (default: extraído del dominio)')
+@click.option('--full-history', is_flag=True, help='Clonar historial completo (default: solo el último commit)')
+@click.option('--partial', is_flag=True,
+              help='Historial completo sin blobs antiguos (--filter=blob:none, git >= 2.27)')
 @click.pass_context
-def init(ctx, stack, domain, backend_repo, frontend_repo, http_port, https_port, db_port, name):
+def init(ctx, stack, domain, backend_repo, frontend_repo, http_port, https_port, db_port, name, full_history, partial):
     """
     Inicializa un nuevo proyecto
 
     Clona los repositorios, genera configuración, certificados SSL
     y prepara el entorno Docker.
     """
-    from datetime import datetime
-    from .git_manager import GitManager
-    from .port_manager import PortManager, get_available_ports
-    from .env_manager import create_env_from_config
-    from .ssl_manager import SSLManager
-    from .template_manager import TemplateManager
-    from .docker_manager import check_docker_installed, check_docker_compose_installed
-    from .models import ProjectConfig, PortsConfig, DatabaseConfig, CredentialsConfig
+    deps = _load_deploy_deps()
+
+    if full_history and partial:
+        raise click.UsageError("--full-history and --partial are mutually exclusive")
+
+    # Asegurar que existan directorios base (solo init crea la estructura)
+    ensure_base_directories()
+
+    # Volver a detectar Docker Compose para el nuevo proyecto
+    deps.invalidate_compose_cmd_cache()
 
     logger.header("LDM Init - Initializing New Project")
 
@@ -99,24 +234,31 @@ def init(ctx, stack, domain, backend_repo, frontend_repo, http_port, https_port,
         logger.info("Run 'ldm destroy' first to remove it")
         sys.exit(1)
 
-    # Verificar Docker
-    if not check_docker_installed():
+    # Verificar Docker, Docker Compose y Git en paralelo; errores en orden fijo
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        docker_ok, compose_ok, git_ok = executor.map(
+            lambda check: check(),
+            [
+                deps.check_docker_installed,
+                deps.check_docker_compose_installed,
+                lambda: command_exists('git'),
+            ]
+        )
+
+    if not docker_ok:
         logger.error("Docker is not installed")
         logger.info("Please install Docker first: https://docs.docker.com/get-docker/")
         sys.exit(1)
 
-    if not check_docker_compose_installed():
+    if not compose_ok:
         logger.error("Docker Compose is not installed")
         sys.exit(1)
 
-    # Verificar Git
-    from .utils import command_exists
-    if not command_exists('git'):
+    if not git_ok:
         logger.error("Git is not installed")
         sys.exit(1)
 
     # Validar dominio
-    from .utils import validate_domain, validate_url, normalize_git_url
     if not validate_domain(domain):
         logger.error(f"Invalid domain format: {domain}")
         sys.exit(1)
@@ -144,27 +286,23 @@ def init(ctx, stack, domain, backend_repo, frontend_repo, http_port, https_port,
     if not name:
         name = domain.split('.')[0]
 
-    from .utils import normalize_project_name
     project_name = normalize_project_name(name)
     logger.info(f"Project name: {project_name}")
     logger.info(f"Domain: {domain}")
 
     # Auto-detectar stack si no se especificó
     if not stack:
-        # Intentar detectar del backend repo (simplificado)
-        if 'laravel' in backend_repo.lower() or 'php' in backend_repo.lower():
-            stack = 'laravel-vue'
-        elif 'spring' in backend_repo.lower() or 'java' in backend_repo.lower():
-            stack = 'springboot-vue'
-        else:
-            # Default
-            stack = 'laravel-vue'
+        # Intentar detectar del backend repo (simplificado, default: laravel-vue)
+        stack = next(
+            (name for pattern, name in _STACK_PATTERNS if pattern.search(backend_repo)),
+            'laravel-vue'
+        )
         logger.info(f"Auto-detected stack: {stack}")
     else:
         logger.info(f"Stack: {stack}")
 
     # Puertos
-    port_manager = PortManager()
+    port_manager = deps.PortManager()
     default_ports = port_manager.get_default_ports(stack)
 
     # Usar puertos especificados o defaults
@@ -199,42 +337,36 @@ def init(ctx, stack, domain, backend_repo, frontend_repo, http_port, https_port,
     backend_path = active_project_path / "backend"
     frontend_path = active_project_path / "frontend"
 
-    # Clonar backend
-    logger.step("Cloning backend repository")
-    git_backend = GitManager()
-    if not git_backend.clone(backend_repo, backend_path, branch="main"):
-        # Intentar con master
-        logger.info("Trying 'master' branch")
-        if not git_backend.clone(backend_repo, backend_path, branch="master"):
-            logger.error("Failed to clone backend repository")
-            sys.exit(1)
+    # Clonar backend y frontend en paralelo (ambos dominados por la red)
+    logger.step("Cloning backend and frontend repositories")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        depth = None if (full_history or partial) else 1
+        filter_spec = 'blob:none' if partial else None
+        backend_future = executor.submit(
+            _clone_with_fallback, backend_repo, backend_path, depth, filter_spec
+        )
+        frontend_future = executor.submit(
+            _clone_with_fallback, frontend_repo, frontend_path, depth, filter_spec
+        )
+        backend_ok, backend_commit = backend_future.result()
+        frontend_ok, frontend_commit = frontend_future.result()
 
-    backend_commit = git_backend.get_current_commit_short()
+    if not backend_ok:
+        logger.error("Failed to clone backend repository")
+        sys.exit(1)
     logger.success(f"Backend cloned (commit: {backend_commit})")
 
-    # Clonar frontend
-    logger.step("Cloning frontend repository")
-    git_frontend = GitManager()
-    if not git_frontend.clone(frontend_repo, frontend_path, branch="main"):
-        logger.info("Trying 'master' branch")
-        if not git_frontend.clone(frontend_repo, frontend_path, branch="master"):
-            logger.error("Failed to clone frontend repository")
-            sys.exit(1)
-
-    frontend_commit = git_frontend.get_current_commit_short()
+    if not frontend_ok:
+        logger.error("Failed to clone frontend repository")
+        sys.exit(1)
     logger.success(f"Frontend cloned (commit: {frontend_commit})")
 
     # === 4. GENERAR CONFIGURACIÓN .env ===
     logger.header("Generating Configuration")
 
-    # Generar credenciales
-    from .utils import generate_secure_password, generate_jwt_secret
-
-    db_password = generate_secure_password(32)
-    db_root_password = generate_secure_password(32)
-    jwt_secret = generate_jwt_secret(64)
-    app_key = f"base64:{generate_jwt_secret(32)}" if stack == 'laravel-vue' else None
-    encryption_key = generate_jwt_secret(32) if stack == 'springboot-vue' else None
+    # Generar credenciales: todas se derivan de una única clave maestra
+    master_key = secrets.token_bytes(32).hex()
+    derived = derive_credentials(master_key, stack)
 
     # Configuración de base de datos
     db_config = {
@@ -242,19 +374,20 @@ def init(ctx, stack, domain, backend_repo, frontend_repo, http_port, https_port,
         'port': final_ports.get('mysql', 3306) if stack == 'laravel-vue' else final_ports.get('postgres', 5432),
         'database': f"{project_name}_db",
         'username': 'root' if stack == 'laravel-vue' else project_name,
-        'password': db_password,
-        'root_password': db_root_password
+        'password': derived['db_password'],
+        'root_password': derived['db_root_password']
     }
 
     # Crear .env
     env_path = backend_path / ".env"
-    env_manager = create_env_from_config(
+    env_manager = deps.create_env_from_config(
         env_path=env_path,
         project_name=project_name,
         domain=domain,
         stack=stack,
         db_config=db_config,
-        ports=final_ports
+        ports=final_ports,
+        credentials=derived
     )
 
     logger.success(".env file created")
@@ -262,7 +395,7 @@ def init(ctx, stack, domain, backend_repo, frontend_repo, http_port, https_port,
     # === 5. GENERAR CERTIFICADOS SSL ===
     logger.header("Generating SSL Certificates")
 
-    ssl_manager = SSLManager()
+    ssl_manager = deps.SSLManager()
     ssl_success = ssl_manager.setup_domain(domain)
 
     if not ssl_success:
@@ -274,7 +407,7 @@ def init(ctx, stack, domain, backend_repo, frontend_repo, http_port, https_port,
 
     network_name = f"ldm_{project_name}_network"
 
-    template_manager = TemplateManager()
+    template_manager = deps.TemplateManager()
     docker_success = template_manager.setup_project_docker(
         project_path=active_project_path,
         stack=stack,
@@ -292,6 +425,9 @@ def init(ctx, stack, domain, backend_repo, frontend_repo, http_port, https_port,
     # === 7. GUARDAR CONFIGURACIÓN DEL PROYECTO ===
     logger.step("Saving project configuration")
 
+    # Un único timestamp para todos los campos de esta ejecución
+    now_iso = datetime.now().isoformat()
+
     project_config = {
         'name': project_name,
         'stack': stack,
@@ -304,11 +440,10 @@ def init(ctx, stack, domain, backend_repo, frontend_repo, http_port, https_port,
             'port': db_config['port'],
             'database': db_config['database'],
             'username': db_config['username'],
-            'password': db_config['password'],
             'connection': 'mysql' if stack == 'laravel-vue' else 'postgres'
         },
-        'created_at': datetime.now().isoformat(),
-        'updated_at': datetime.now().isoformat(),
+        'created_at': now_iso,
+        'updated_at': now_iso,
         'last_deploy': None,
         'docker_network': network_name,
         'ssl_enabled': ssl_success,
@@ -324,18 +459,18 @@ def init(ctx, stack, domain, backend_repo, frontend_repo, http_port, https_port,
     # === 8. GUARDAR CREDENCIALES ===
     logger.step("Saving credentials")
 
+    # Solo se guarda la clave maestra; las credenciales se obtienen con
+    # load_credentials (ldm config credentials)
     credentials = {
-        'app_key': app_key,
-        'jwt_secret': jwt_secret,
-        'db_root_password': db_root_password,
-        'db_password': db_password,
-        'encryption_key': encryption_key,
-        'created_at': datetime.now().isoformat()
+        'master': master_key,
+        'key_version': 0,
+        'created_at': now_iso
     }
 
-    from .utils import save_json_file
-    credentials_path = active_project_path / ".credentials.json"
-    save_json_file(credentials_path, credentials)
+    credentials_path = active_project_path / CREDENTIALS_FILE_NAME
+    # Última escritura de init: se vuelca a disco junto con el directorio,
+    # lo que también persiste el rename previo de .project-config.json
+    save_json_file(credentials_path, credentials, fsync=True)
     logger.success("Credentials saved")
 
     # === 9. OUTPUT FINAL ===
@@ -405,24 +540,13 @@ def deploy(ctx, fresh_db, seed, with_backup, no_pull, no_deps, no_build):
     Hace pull de cambios, instala dependencias, compila frontend,
     ejecuta migraciones y reinicia servicios.
     """
-    import time
-    from datetime import datetime
-    from pathlib import Path
-    from .git_manager import GitManager
-    from .docker_manager import DockerManager
+    deps = _load_deploy_deps()
 
     start_time = time.time()
     logger.header("LDM Deploy - Deploying Application")
 
     # === 1. VALIDACIONES PRE-DEPLOY ===
-    if not project_exists():
-        logger.error("No active project. Run 'ldm init' first.")
-        sys.exit(1)
-
-    project_config = get_project_config()
-    if not project_config:
-        logger.error("Failed to load project configuration")
-        sys.exit(1)
+    active_project_path, project_config = _require_project("No active project. Run 'ldm init' first.")
 
     project_name = project_config['name']
     stack = project_config['stack']
@@ -433,24 +557,27 @@ def deploy(ctx, fresh_db, seed, with_backup, no_pull, no_deps, no_build):
     logger.info(f"Domain: {domain}")
     logger.print()
 
-    active_project_path = get_active_project_path()
     backend_path = active_project_path / "backend"
     frontend_path = active_project_path / "frontend"
     compose_file = active_project_path / "docker-compose.yml"
 
-    # Verificar que existan los directorios
-    if not backend_path.exists() or not frontend_path.exists():
+    # Verificar que existan los directorios con una sola lectura del directorio
+    with os.scandir(active_project_path) as it:
+        entries = {entry.name: entry for entry in it}
+
+    if not all(
+        name in entries and entries[name].is_dir()
+        for name in ('backend', 'frontend')
+    ):
         logger.error("Backend or frontend directory not found")
         sys.exit(1)
 
-    if not compose_file.exists():
+    if 'docker-compose.yml' not in entries:
         logger.error("docker-compose.yml not found")
         sys.exit(1)
 
     # === 1.5. VALIDAR CONFIGURACIÓN ===
-    from .validators import run_all_validations
-
-    if not run_all_validations(active_project_path, stack):
+    if not deps.run_all_validations(active_project_path, stack):
         logger.error("Configuration validation failed. Please fix the issues above before deploying.")
         logger.info("Deploy aborted due to configuration errors.")
         sys.exit(1)
@@ -471,31 +598,28 @@ def deploy(ctx, fresh_db, seed, with_backup, no_pull, no_deps, no_build):
     if not no_pull:
         logger.header("Pulling Latest Changes")
 
-        # Pull backend
-        logger.step("Pulling backend repository")
-        git_backend = GitManager(backend_path)
-        if git_backend.pull():
-            backend_commit_new = git_backend.get_current_commit_short()
-            if backend_commit_new != backend_commit_old:
-                changes_detected = True
-                logger.success(f"Backend updated: {backend_commit_old} → {backend_commit_new}")
-            else:
-                logger.info("Backend already up to date")
-        else:
-            logger.warning("Backend pull failed, using current version")
-
-        # Pull frontend
-        logger.step("Pulling frontend repository")
-        git_frontend = GitManager(frontend_path)
-        if git_frontend.pull():
-            frontend_commit_new = git_frontend.get_current_commit_short()
-            if frontend_commit_new != frontend_commit_old:
+        # Pull de backend y frontend en paralelo; los mensajes se emiten al final
+        logger.step("Pulling backend and frontend repositories")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            backend_future = executor.submit(_pull_repository, backend_path)
+            frontend_future = executor.submit(_pull_repository, frontend_path)
+            backend_ok, backend_commit_new = backend_future.result()
+            frontend_ok, frontend_commit_new = frontend_future.result()
+
+        for label, ok, commit_old, commit_new in (
+            ("Backend", backend_ok, backend_commit_old, backend_commit_new),
+            ("Frontend", frontend_ok, frontend_commit_old, frontend_commit_new),
+        ):
+            if not ok:
+                logger.warning(f"{label} pull failed, using current version")
+            elif commit_new != commit_old:
                 changes_detected = True
-                logger.success(f"Frontend updated: {frontend_commit_old} → {frontend_commit_new}")
+                logger.success(f"{label} updated: {commit_old} → {commit_new}")
             else:
-                logger.info("Frontend already up to date")
-        else:
-            logger.warning("Frontend pull failed, using current version")
+                logger.info(f"{label} already up to date")
+
+        backend_commit_new = backend_commit_new or backend_commit_old
+        frontend_commit_new = frontend_commit_new or frontend_commit_old
 
         logger.print()
     else:
@@ -507,41 +631,60 @@ def deploy(ctx, fresh_db, seed, with_backup, no_pull, no_deps, no_build):
     if not no_deps:
         logger.header("Installing Dependencies")
 
-        docker_manager = DockerManager(compose_file)
+        docker_manager = deps.DockerManager(compose_file)
 
+        # Composer/Maven (en el contenedor) y npm (en el host) son
+        # independientes: se ejecutan en paralelo y se reporta en orden
+        backend_install = None
         if stack == 'laravel-vue':
-            # Composer install
-            logger.step("Installing Composer dependencies")
-            success, output = docker_manager.compose_exec(
-                'php',
-                ['composer', 'install', '--optimize-autoloader', '--no-dev']
-            )
-            if success:
-                logger.success("Composer dependencies installed")
-            else:
-                logger.warning("Composer install failed (container may not be running yet)")
-
+            logger.step("Installing Composer and NPM dependencies")
+            backend_install = ('php', ['composer', 'install', '--optimize-autoloader', '--no-dev'])
         elif stack == 'springboot-vue':
-            # Maven install
-            logger.step("Installing Maven dependencies")
-            success, output = docker_manager.compose_exec(
-                'springboot',
-                ['./mvnw', 'dependency:resolve']
+            logger.step("Installing Maven and NPM dependencies")
+            backend_install = ('springboot', ['./mvnw', 'dependency:resolve'])
+        else:
+            logger.step("Installing NPM dependencies")
+
+        # Si el contenedor aún no corre, el build de la imagen ya instala
+        # las dependencias: no tiene sentido un exec que fallará
+        if backend_install and not docker_manager.is_service_running(backend_install[0]):
+            logger.info(
+                f"Skipping backend dependencies - '{backend_install[0]}' container "
+                "not running yet; they will be installed during build"
+            )
+            backend_install = None
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            backend_future = None
+            if backend_install:
+                backend_future = executor.submit(docker_manager.compose_exec, *backend_install)
+            npm_future = executor.submit(
+                subprocess.run,
+                ['npm', 'install'],
+                cwd=frontend_path,
+                capture_output=True,
+                text=True
             )
-            if success:
-                logger.success("Maven dependencies resolved")
-            else:
-                logger.warning("Maven install failed (will be done during build)")
 
-        # NPM install para frontend
-        logger.step("Installing NPM dependencies")
-        import subprocess
-        result = subprocess.run(
-            ['npm', 'install'],
-            cwd=frontend_path,
-            capture_output=True,
-            text=True
-        )
+            if backend_future is not None:
+                success, output = backend_future.result()
+                if not success:
+                    logger.log_debug("Backend dependencies output: %s", output)
+                if stack == 'laravel-vue':
+                    if success:
+                        logger.success("Composer dependencies installed")
+                    else:
+                        logger.warning(f"Composer install failed: {_last_output_line(output)}")
+                else:
+                    if success:
+                        logger.success("Maven dependencies resolved")
+                    else:
+                        logger.warning(
+                            f"Maven install failed: {_last_output_line(output)} (will be done during build)"
+                        )
+
+            result = npm_future.result()
+
         if result.returncode == 0:
             logger.success("NPM dependencies installed")
         else:
@@ -557,16 +700,25 @@ def deploy(ctx, fresh_db, seed, with_backup, no_pull, no_deps, no_build):
         logger.header("Building Frontend")
 
         logger.step("Running npm run build")
+        # La salida se envía al log línea a línea; solo se retiene la cola
+        # para mostrarla si el build falla
+        build_tail = deque(maxlen=BUILD_OUTPUT_TAIL_LINES)
         with logger.spinner("Building Vue application"):
-            result = subprocess.run(
+            process = subprocess.Popen(
                 ['npm', 'run', 'build'],
                 cwd=frontend_path,
-                capture_output=True,
-                text=True
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1
             )
+            for line in process.stdout:
+                build_tail.append(line)
+                logger.log_debug(line.rstrip())
+            returncode = process.wait()
 
-        if result.returncode != 0:
-            logger.error(f"Frontend build failed: {result.stderr}")
+        if returncode != 0:
+            logger.error(f"Frontend build failed: {''.join(build_tail)}")
             sys.exit(1)
 
         logger.success("Frontend build completed")
@@ -578,23 +730,16 @@ def deploy(ctx, fresh_db, seed, with_backup, no_pull, no_deps, no_build):
             sys.exit(1)
 
         logger.step("Copying build to backend")
-        import shutil
-
         if stack == 'laravel-vue':
             # Laravel: copiar a public/app
             target_path = backend_path / "public" / "app"
-            if target_path.exists():
-                shutil.rmtree(target_path)
-            shutil.copytree(dist_path, target_path)
+            sync_tree(dist_path, target_path)
             logger.success(f"Frontend copied to public/app")
 
         elif stack == 'springboot-vue':
             # SpringBoot: copiar a src/main/resources/static
             target_path = backend_path / "src" / "main" / "resources" / "static"
-            target_path.parent.mkdir(parents=True, exist_ok=True)
-            if target_path.exists():
-                shutil.rmtree(target_path)
-            shutil.copytree(dist_path, target_path)
+            sync_tree(dist_path, target_path)
             logger.success(f"Frontend copied to resources/static")
 
         logger.print()
@@ -604,14 +749,13 @@ def deploy(ctx, fresh_db, seed, with_backup, no_pull, no_deps, no_build):
     # === 6. DOCKER COMPOSE UP ===
     logger.header("Starting Docker Services")
 
-    docker_manager = DockerManager(compose_file)
+    docker_manager = deps.DockerManager(compose_file)
 
     # Verificar si ya están corriendo
-    services_status = docker_manager.compose_ps()
-    running_services = [s for s in services_status if s.get('State') == 'running'] if services_status else []
+    running_count = docker_manager.count_running()
 
-    if running_services:
-        logger.info(f"{len(running_services)} services already running")
+    if running_count:
+        logger.info(f"{running_count} services already running")
         logger.step("Rebuilding and restarting services")
         build_flag = True
     else:
@@ -658,7 +802,7 @@ def deploy(ctx, fresh_db, seed, with_backup, no_pull, no_deps, no_build):
         if success:
             logger.success("Migrations completed")
             if output:
-                logger.log_debug(f"Migration output: {output}")
+                logger.log_debug("Migration output: %s", output)
         else:
             logger.error(f"Migrations failed: {output}")
             sys.exit(1)
@@ -693,12 +837,21 @@ def deploy(ctx, fresh_db, seed, with_backup, no_pull, no_deps, no_build):
             (['php', 'artisan', 'view:cache'], 'View cache'),
         ]
 
-        for cmd, description in commands:
-            success, output = docker_manager.compose_exec('php', cmd)
-            if success:
+        # Un solo exec para los tres comandos; si falla, se repiten uno a
+        # uno (son idempotentes) para identificar cuál falló
+        batch = ' && '.join(shlex.join(cmd) for cmd, _ in commands)
+        success, output = docker_manager.compose_exec('php', ['sh', '-c', batch])
+
+        if success:
+            for _, description in commands:
                 logger.success(f"{description} completed")
-            else:
-                logger.warning(f"{description} failed: {output}")
+        else:
+            for cmd, description in commands:
+                success, output = docker_manager.compose_exec('php', cmd)
+                if success:
+                    logger.success(f"{description} completed")
+                else:
+                    logger.warning(f"{description} failed: {output}")
 
     elif stack == 'springboot-vue':
         logger.info("SpringBoot optimizations handled by JVM")
@@ -724,8 +877,9 @@ def deploy(ctx, fresh_db, seed, with_backup, no_pull, no_deps, no_build):
     # === 11. ACTUALIZAR CONFIGURACIÓN ===
     logger.step("Updating project configuration")
 
-    project_config['updated_at'] = datetime.now().isoformat()
-    project_config['last_deploy'] = datetime.now().isoformat()
+    now_iso = datetime.now().isoformat()
+    project_config['updated_at'] = now_iso
+    project_config['last_deploy'] = now_iso
     project_config['git_commits'] = {
         'backend': backend_commit_new,
         'frontend': frontend_commit_new
@@ -767,8 +921,7 @@ def deploy(ctx, fresh_db, seed, with_backup, no_pull, no_deps, no_build):
 
     # === 13. REGISTRAR EN HISTORIAL ===
     try:
-        from .history_manager import add_deploy_to_history
-        add_deploy_to_history(
+        deps.add_deploy_to_history(
             deploy_type='deploy',
             success=True,
             duration=duration,
@@ -800,11 +953,8 @@ def config():
 @config.command('show')
 def config_show():
     """Muestra la configuración actual"""
-    if not project_exists():
-        logger.error("No hay proyecto activo")
-        sys.exit(1)
+    _, project_config = _require_project("No hay proyecto activo")
 
-    project_config = get_project_config()
     if project_config:
         logger.print_config(project_config, "Project Configuration")
     else:
@@ -815,14 +965,7 @@ def config_show():
 @click.option('--project', is_flag=True, help='Edit project configuration instead of .env')
 def config_edit(project):
     """Abre el archivo de configuración en el editor"""
-    import subprocess
-    import os
-
-    if not project_exists():
-        logger.error("No active project")
-        sys.exit(1)
-
-    active_project_path = get_active_project_path()
+    active_project_path, _ = _require_project()
 
     if project:
         # Editar .project-config.json
@@ -862,19 +1005,9 @@ def config_edit(project):
 @click.confirmation_option(prompt='⚠️  This will regenerate security keys. Continue?')
 def config_regen_keys():
     """Regenera APP_KEY y JWT_SECRET"""
-    from .env_manager import EnvManager
-    from .utils import generate_secure_password
+    EnvManager = _lazy('EnvManager')
 
-    if not project_exists():
-        logger.error("No active project")
-        sys.exit(1)
-
-    active_project_path = get_active_project_path()
-    project_config = get_project_config()
-
-    if not project_config:
-        logger.error("Project configuration not found")
-        sys.exit(1)
+    active_project_path, project_config = _require_project()
 
     stack = project_config.get('stack')
     env_path = active_project_path / "backend" / ".env"
@@ -886,32 +1019,37 @@ def config_regen_keys():
     logger.header("Regenerating Security Keys")
 
     env_manager = EnvManager(env_path)
+    credentials_path = active_project_path / CREDENTIALS_FILE_NAME
 
     try:
-        if stack == 'laravel-vue':
-            # Generar nuevo APP_KEY (Laravel format)
-            import base64
-            import secrets
+        stored = load_json_file(credentials_path) or {}
+
+        if 'master' in stored:
+            # Rotar: nueva versión de las claves derivadas de la clave maestra
+            # (las contraseñas de base de datos no cambian)
+            stored['key_version'] = stored.get('key_version', 0) + 1
+            derived = derive_credentials(stored['master'], stack, stored['key_version'])
+            app_key, jwt_secret = derived['app_key'], derived['jwt_secret']
+        else:
+            # .credentials.json antiguo (valores en texto plano)
             app_key = 'base64:' + base64.b64encode(secrets.token_bytes(32)).decode()
-
-            # Generar nuevo JWT_SECRET
             jwt_secret = generate_secure_password(64)
+            if stored:
+                stored['jwt_secret'] = jwt_secret
+                if stack == 'laravel-vue':
+                    stored['app_key'] = app_key
 
-            logger.step("Generating new keys")
-            env_manager.set('APP_KEY', app_key)
-            env_manager.set('JWT_SECRET', jwt_secret)
-
-            logger.success("APP_KEY regenerated")
-            logger.success("JWT_SECRET regenerated")
-
-        elif stack == 'springboot-vue':
-            # Generar nuevo JWT_SECRET para SpringBoot
-            jwt_secret = generate_secure_password(64)
+        logger.step("Generating new keys")
+        updates = {'APP_KEY': app_key} if stack == 'laravel-vue' else {}
+        updates['JWT_SECRET'] = jwt_secret
+        env_manager.update_multiple(updates)
 
-            logger.step("Generating new JWT secret")
-            env_manager.set('JWT_SECRET', jwt_secret)
+        if stored:
+            stored['rotated_at'] = datetime.now().isoformat()
+            save_json_file(credentials_path, stored, fsync=True)
 
-            logger.success("JWT_SECRET regenerated")
+        for key in updates:
+            logger.success(f"{key} regenerated")
 
         logger.print()
         logger.panel(
@@ -930,21 +1068,36 @@ def config_regen_keys():
         sys.exit(1)
 
 
+@config.command('credentials')
+@click.option('--show', is_flag=True, help='Mostrar los valores (por defecto se ocultan)')
+def config_credentials(show):
+    """Muestra las credenciales del proyecto (derivadas de la clave maestra)"""
+    active_project_path, project_config = _require_project()
+
+    credentials = load_credentials(active_project_path, project_config.get('stack'))
+    if credentials is None:
+        logger.error(f"{CREDENTIALS_FILE_NAME} not found")
+        sys.exit(1)
+
+    display = {
+        key: (value if show or key == 'created_at' else "********")
+        for key, value in credentials.items()
+        if value is not None
+    }
+    logger.print_config(display, "Project Credentials", mask_secrets=False)
+
+    if not show:
+        logger.info("Use --show to reveal the values")
+
+
 # === Comando: status ===
 
 @cli.command()
 def status():
     """Muestra el estado de los servicios Docker"""
-    from .docker_manager import DockerManager
-
-    if not project_exists():
-        logger.error("No active project")
-        sys.exit(1)
+    DockerManager = _lazy('DockerManager')
 
-    project_config = get_project_config()
-    if not project_config:
-        logger.error("Failed to load project configuration")
-        sys.exit(1)
+    active_project_path, project_config = _require_project()
 
     project_name = project_config['name']
     stack = project_config['stack']
@@ -952,7 +1105,6 @@ def status():
 
     logger.header(f"Project Status: {project_name}")
 
-    active_project_path = get_active_project_path()
     compose_file = active_project_path / "docker-compose.yml"
 
     if not compose_file.exists():
@@ -976,16 +1128,18 @@ def status():
     running_count = sum(1 for s in services_status.values() if s.get('running'))
     total_count = len(services_status)
 
-    logger.info(f"Stack: {stack}")
-    logger.info(f"Domain: {domain}")
-    logger.info(f"Services: {running_count}/{total_count} running")
+    info_lines = [
+        f"Stack: {stack}",
+        f"Domain: {domain}",
+        f"Services: {running_count}/{total_count} running",
+    ]
 
     # Info de último deploy
     last_deploy = project_config.get('last_deploy')
     if last_deploy:
-        from datetime import datetime
-        deploy_dt = datetime.fromisoformat(last_deploy)
-        logger.info(f"Last deploy: {deploy_dt.strftime('%Y-%m-%d %H:%M:%S')}")
+        info_lines.append(f"Last deploy: {_fmt_ts(last_deploy, seconds=True)}")
+
+    logger.info_block(info_lines)
 
     logger.print()
 
@@ -1005,15 +1159,11 @@ def status():
 @cli.command()
 def start():
     """Inicia todos los servicios"""
-    from .docker_manager import DockerManager
+    DockerManager = _lazy('DockerManager')
 
-    if not project_exists():
-        logger.error("No active project")
-        sys.exit(1)
+    active_project_path, project_config = _require_project()
 
     logger.header("Starting Services")
-
-    active_project_path = get_active_project_path()
     compose_file = active_project_path / "docker-compose.yml"
 
     if not compose_file.exists():
@@ -1024,18 +1174,17 @@ def start():
 
     # Docker compose up
     logger.step("Starting Docker Compose services")
-    if docker_manager.compose_up(detached=True, build=False):
+    started, services_status = docker_manager.compose_up(detached=True, build=False, with_status=True)
+    if started:
         logger.success("Services started successfully")
 
-        # Mostrar estado
+        # Mostrar estado (obtenido en la misma invocación que el up)
         logger.print()
-        services_status = docker_manager.get_services_status()
         if services_status:
             logger.print_services_status(services_status)
 
-        project_config = get_project_config()
-        if project_config:
-            domain = project_config.get('domain')
+        domain = project_config.get('domain')
+        if domain:
             logger.print()
             logger.info(f"Access: [cyan]https://{domain}[/cyan]")
     else:
@@ -1048,15 +1197,11 @@ def start():
 @cli.command()
 def stop():
     """Detiene todos los servicios"""
-    from .docker_manager import DockerManager
+    DockerManager = _lazy('DockerManager')
 
-    if not project_exists():
-        logger.error("No active project")
-        sys.exit(1)
+    active_project_path, _ = _require_project()
 
     logger.header("Stopping Services")
-
-    active_project_path = get_active_project_path()
     compose_file = active_project_path / "docker-compose.yml"
 
     if not compose_file.exists():
@@ -1082,13 +1227,9 @@ def stop():
 @click.argument('service', required=False)
 def restart(service):
     """Reinicia servicios (todo o uno específico)"""
-    from .docker_manager import DockerManager
+    DockerManager = _lazy('DockerManager')
 
-    if not project_exists():
-        logger.error("No active project")
-        sys.exit(1)
-
-    active_project_path = get_active_project_path()
+    active_project_path, _ = _require_project()
     compose_file = active_project_path / "docker-compose.yml"
 
     if not compose_file.exists():
@@ -1108,14 +1249,13 @@ def restart(service):
             sys.exit(1)
     else:
         logger.header("Restarting All Services")
-        logger.step("Restarting all services")
 
-        if docker_manager.compose_restart():
+        restarted, services_status = docker_manager.compose_restart_parallel(with_status=True)
+        if restarted:
             logger.success("All services restarted successfully")
 
             # Mostrar estado
             logger.print()
-            services_status = docker_manager.get_services_status()
             if services_status:
                 logger.print_services_status(services_status)
         else:
@@ -1130,23 +1270,25 @@ def restart(service):
 @click.confirmation_option(prompt='Are you sure you want to destroy the active project?')
 def destroy(remove_volumes):
     """Elimina el proyecto activo y sus contenedores"""
-    from .docker_manager import DockerManager
-    import shutil
+    DockerManager = _lazy('DockerManager')
 
-    if not project_exists():
-        logger.error("No active project")
-        sys.exit(1)
+    active_project_path, project_config = _require_project()
 
-    project_config = get_project_config()
-    project_name = project_config['name'] if project_config else 'unknown'
+    project_name = project_config.get('name', 'unknown')
 
     logger.header(f"Destroying Project: {project_name}")
     logger.warning("This action cannot be undone!")
     logger.print()
 
-    active_project_path = get_active_project_path()
     compose_file = active_project_path / "docker-compose.yml"
 
+    # Los directorios pesados se borran en segundo plano durante compose down
+    bulk_dirs = [active_project_path / d for d in _DESTROY_BULK_DIRS]
+    bulk_dirs = [d for d in bulk_dirs if d.is_dir()]
+    executor = ThreadPoolExecutor(max_workers=max(1, len(bulk_dirs)))
+    bulk_futures = [executor.submit(fast_rmtree, d) for d in bulk_dirs]
+    executor.shutdown(wait=False)
+
     # 1. Detener y eliminar contenedores
     if compose_file.exists():
         logger.step("Stopping and removing Docker services")
@@ -1162,7 +1304,9 @@ def destroy(remove_volumes):
         logger.step(f"Removing project directory: {active_project_path}")
 
         try:
-            shutil.rmtree(active_project_path)
+            for future in bulk_futures:
+                future.result()
+            fast_rmtree(active_project_path)
             logger.success("Project directory removed")
         except Exception as e:
             logger.error(f"Failed to remove directory: {str(e)}")
@@ -1192,18 +1336,9 @@ def backup():
 @click.option('--no-db', is_flag=True, help='No incluir backup de base de datos')
 def backup_create(name, no_db):
     """Crea un nuevo backup del proyecto activo"""
-    from .backup_manager import BackupManager
+    BackupManager = _lazy('BackupManager')
 
-    if not project_exists():
-        logger.error("No active project")
-        sys.exit(1)
-
-    active_project_path = get_active_project_path()
-    project_config = get_project_config()
-
-    if not project_config:
-        logger.error("Project configuration not found")
-        sys.exit(1)
+    active_project_path, project_config = _require_project()
 
     # Crear backup
     backup_manager = BackupManager()
@@ -1231,8 +1366,7 @@ def backup_create(name, no_db):
 @backup.command('list')
 def backup_list():
     """Lista todos los backups disponibles"""
-    from .backup_manager import BackupManager
-    from rich.table import Table
+    BackupManager = _lazy('BackupManager')
 
     backup_manager = BackupManager()
     backups = backup_manager.list_backups()
@@ -1242,6 +1376,27 @@ def backup_list():
         logger.info("Create a backup with: ldm backup create")
         return
 
+    # Todas las filas como strings planos en una sola pasada
+    columns = ("Backup ID", "Date/Time", "Project", "Stack", "Size", "DB")
+    rows = [
+        (
+            backup.get('backup_id', 'unknown'),
+            _fmt_ts(backup.get('timestamp', '')),
+            backup.get('project', {}).get('name', 'unknown'),
+            backup.get('project', {}).get('stack', 'unknown'),
+            f"{backup.get('size_mb', 0):.2f} MB",
+            "✓" if backup.get('database_backup', False) else "✗",
+        )
+        for backup in backups
+    ]
+
+    # Salida a pipe/archivo: TSV sin importar rich.table
+    if not logger.console.is_terminal:
+        _write_tsv(columns, rows)
+        return
+
+    Table = _lazy('Table')
+
     logger.header(f"Available Backups ({len(backups)})")
 
     # Crear tabla
@@ -1253,34 +1408,8 @@ def backup_list():
     table.add_column("Size", style="green", justify="right")
     table.add_column("DB", justify="center")
 
-    for backup in backups:
-        backup_id = backup.get('backup_id', 'unknown')
-
-        # Formatear timestamp
-        timestamp = backup.get('timestamp', '')
-        if timestamp:
-            try:
-                from datetime import datetime
-                dt = datetime.fromisoformat(timestamp)
-                timestamp_str = dt.strftime("%Y-%m-%d %H:%M")
-            except Exception:
-                timestamp_str = timestamp[:16] if len(timestamp) > 16 else timestamp
-        else:
-            timestamp_str = "unknown"
-
-        project_name = backup.get('project', {}).get('name', 'unknown')
-        stack = backup.get('project', {}).get('stack', 'unknown')
-        size_mb = backup.get('size_mb', 0)
-        has_db = "✓" if backup.get('database_backup', False) else "✗"
-
-        table.add_row(
-            backup_id,
-            timestamp_str,
-            project_name,
-            stack,
-            f"{size_mb:.2f} MB",
-            has_db
-        )
+    for row in rows:
+        table.add_row(*row)
 
     logger.print(table)
     logger.print()
@@ -1295,14 +1424,10 @@ def backup_list():
 )
 def backup_restore(backup_id, no_db):
     """Restaura un backup específico"""
-    from .backup_manager import BackupManager
-    from .docker_manager import DockerManager
+    BackupManager = _lazy('BackupManager')
+    DockerManager = _lazy('DockerManager')
 
-    if not project_exists():
-        logger.error("No active project")
-        sys.exit(1)
-
-    active_project_path = get_active_project_path()
+    active_project_path, _ = _require_project()
 
     # Verificar que el backup existe
     backup_manager = BackupManager()
@@ -1356,13 +1481,9 @@ def backup_restore(backup_id, no_db):
 @click.argument('service', required=False)
 def logs(follow, tail, service):
     """Muestra logs de servicios Docker"""
-    from .docker_manager import DockerManager
+    DockerManager = _lazy('DockerManager')
 
-    if not project_exists():
-        logger.error("No active project")
-        sys.exit(1)
-
-    active_project_path = get_active_project_path()
+    active_project_path, _ = _require_project()
     compose_file = active_project_path / "docker-compose.yml"
 
     if not compose_file.exists():
@@ -1384,7 +1505,8 @@ def logs(follow, tail, service):
     logger.print()
 
     # Mostrar logs
-    docker_manager.compose_logs(service=service, follow=follow, tail=tail)
+    # Con --follow el proceso se reemplaza por docker compose (no retorna)
+    docker_manager.compose_logs(service=service, follow=follow, tail=tail, replace_process=follow)
 
 
 # === Comando: shell ===
@@ -1394,14 +1516,9 @@ def logs(follow, tail, service):
 @click.option('--shell', default=None, help='Shell a usar (default: /bin/sh o /bin/bash)')
 def shell(service, shell):
     """Abre una shell interactiva en un contenedor"""
-    from .docker_manager import DockerManager
-    import subprocess
+    DockerManager = _lazy('DockerManager')
 
-    if not project_exists():
-        logger.error("No active project")
-        sys.exit(1)
-
-    active_project_path = get_active_project_path()
+    active_project_path, _ = _require_project()
     compose_file = active_project_path / "docker-compose.yml"
 
     if not compose_file.exists():
@@ -1410,26 +1527,25 @@ def shell(service, shell):
 
     docker_manager = DockerManager(compose_file)
 
-    # Verificar que el servicio existe en compose_ps
+    # Consultar solo el servicio pedido
     logger.step(f"Checking service: {service}")
-    services = docker_manager.compose_ps()
-
-    if not services:
-        logger.error("No services running")
-        logger.info("Start services with: ldm start")
-        sys.exit(1)
+    service_info = docker_manager.get_service_info(service)
+
+    if service_info is None:
+        # Servicios definidos en el compose file (sin consultar a Docker)
+        service_names = docker_manager.get_service_names()
+        if service in service_names:
+            logger.error(f"Service '{service}' is not running")
+            logger.info("Start services with: ldm start")
+            sys.exit(1)
 
-    # Verificar que el servicio solicitado existe
-    service_names = [s.get('service') for s in services]
-    if service not in service_names:
         logger.error(f"Service '{service}' not found")
         logger.info(f"Available services: {', '.join(service_names)}")
         sys.exit(1)
 
     # Verificar que el servicio está corriendo
-    service_info = next((s for s in services if s.get('service') == service), None)
-    if service_info and service_info.get('state') != 'running':
-        logger.error(f"Service '{service}' is not running (state: {service_info.get('state')})")
+    if service_info.get('State') != 'running':
+        logger.error(f"Service '{service}' is not running (state: {service_info.get('State')})")
         logger.info("Start services with: ldm start")
         sys.exit(1)
 
@@ -1494,13 +1610,9 @@ def shell(service, shell):
 @click.option('--limit', type=int, default=20, help='Cantidad de deploys a mostrar')
 def history(deploy_id, limit):
     """Muestra historial de deploys"""
-    from .history_manager import HistoryManager
-    from rich.table import Table
-    from datetime import datetime
+    HistoryManager = _lazy('HistoryManager')
 
-    if not project_exists():
-        logger.error("No active project")
-        sys.exit(1)
+    _require_project()
 
     history_manager = HistoryManager()
 
@@ -1515,15 +1627,7 @@ def history(deploy_id, limit):
         logger.header(f"Deploy #{deploy_id} Details")
 
         # Formatear timestamp
-        timestamp = deploy.get('timestamp', '')
-        if timestamp:
-            try:
-                dt = datetime.fromisoformat(timestamp)
-                timestamp_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-            except Exception:
-                timestamp_str = timestamp
-        else:
-            timestamp_str = "unknown"
+        timestamp_str = _fmt_ts(deploy.get('timestamp', ''), seconds=True)
 
         success = deploy.get('success', False)
         status_str = "[green]✓ Success[/green]" if success else "[red]✗ Failed[/red]"
@@ -1552,15 +1656,37 @@ def history(deploy_id, limit):
         return
 
     # Mostrar lista de deploys
-    history_list = history_manager.load_history()
+    full_history = history_manager.load_history()
 
-    if not history_list:
+    if not full_history:
         logger.info("No deploy history found")
         logger.info("Deploy history is recorded automatically with each deploy")
         return
 
     # Limitar cantidad
-    history_list = history_list[-limit:]
+    history_list = full_history[-limit:]
+
+    # Todas las filas como strings planos en una sola pasada
+    columns = ("ID", "Date/Time", "Type", "Duration", "Status", "Backend", "Frontend")
+    rows = [
+        (
+            str(deploy.get('id', '?')),
+            _fmt_ts(deploy.get('timestamp', '')),
+            deploy.get('type', 'unknown'),
+            f"{deploy.get('duration', 0):.1f}s",
+            "✓" if deploy.get('success', False) else "✗",
+            (deploy.get('commits', {}).get('backend') or 'N/A')[:7],
+            (deploy.get('commits', {}).get('frontend') or 'N/A')[:7],
+        )
+        for deploy in history_list
+    ]
+
+    # Salida a pipe/archivo: TSV sin pasar por Rich
+    if not logger.console.is_terminal:
+        _write_tsv(columns, rows)
+        return
+
+    Table = _lazy('Table')
 
     logger.header(f"Deploy History (last {len(history_list)} deploys)")
 
@@ -1574,55 +1700,20 @@ def history(deploy_id, limit):
     table.add_column("Backend", style="dim")
     table.add_column("Frontend", style="dim")
 
-    for deploy in history_list:
-        deploy_id_str = str(deploy.get('id', '?'))
-
-        # Formatear timestamp
-        timestamp = deploy.get('timestamp', '')
-        if timestamp:
-            try:
-                dt = datetime.fromisoformat(timestamp)
-                timestamp_str = dt.strftime("%Y-%m-%d %H:%M")
-            except Exception:
-                timestamp_str = timestamp[:16] if len(timestamp) > 16 else timestamp
-        else:
-            timestamp_str = "unknown"
-
-        deploy_type = deploy.get('type', 'unknown')
-        duration = f"{deploy.get('duration', 0):.1f}s"
-
-        success = deploy.get('success', False)
-        status = "✓" if success else "✗"
-        status_color = "green" if success else "red"
-
-        backend_commit = deploy.get('commits', {}).get('backend', 'N/A')
-        if backend_commit and len(backend_commit) > 7:
-            backend_commit = backend_commit[:7]
-
-        frontend_commit = deploy.get('commits', {}).get('frontend', 'N/A')
-        if frontend_commit and len(frontend_commit) > 7:
-            frontend_commit = frontend_commit[:7]
-
-        table.add_row(
-            deploy_id_str,
-            timestamp_str,
-            deploy_type,
-            duration,
-            f"[{status_color}]{status}[/{status_color}]",
-            backend_commit,
-            frontend_commit
-        )
+    for row in rows:
+        status_color = "green" if row[4] == "✓" else "red"
+        table.add_row(*row[:4], f"[{status_color}]{row[4]}[/{status_color}]", *row[5:])
 
     logger.print(table)
     logger.print()
 
     # Estadísticas
-    total = len(history_manager.load_history())
-    successful = history_manager.get_successful_deploys_count()
-    failed = history_manager.get_failed_deploys_count()
+    total, successful, failed = history_manager.counts(full_history)
 
-    logger.info(f"Total deploys: {total} ([green]{successful} successful[/green], [red]{failed} failed[/red])")
-    logger.info("View deploy details: ldm history <id>")
+    logger.info_block([
+        f"Total deploys: {total} ([green]{successful} successful[/green], [red]{failed} failed[/red])",
+        "View deploy details: ldm history <id>",
+    ])
 
 
 # === Comando: check-ports ===
@@ -1634,7 +1725,7 @@ def history(deploy_id, limit):
 @click.pass_context
 def check_ports(ctx, port, stack):
     """Verifica disponibilidad de puertos"""
-    from .port_manager import PortManager
+    PortManager = _lazy('PortManager')
 
     logger.header("Port Availability Check")
 
@@ -1651,9 +1742,8 @@ def check_ports(ctx, port, stack):
         # Puertos por defecto del stack
         ports_to_check = manager.get_default_ports(stack)
         logger.info(f"Checking default ports for stack: {stack}")
-    elif project_exists():
+    elif (project_config := try_load_project_config()) is not None:
         # Si hay proyecto activo, usar sus puertos
-        project_config = get_project_config()
         if project_config:
             stack_type = project_config.get('stack', 'laravel-vue')
             ports_to_check = manager.get_default_ports(stack_type)
@@ -1664,11 +1754,10 @@ def check_ports(ctx, port, stack):
         logger.info("Checking common service ports")
 
     # Mostrar tabla con estado
-    manager.display_port_status(ports_to_check)
+    port_status = manager.display_port_status(ports_to_check)
 
-    # Resumen
-    available_count = sum(1 for p in ports_to_check.values()
-                         if manager.is_port_available(p))
+    # Resumen (reutiliza la verificación de la tabla)
+    available_count = sum(port_status.values())
     total_count = len(ports_to_check)
 
     logger.print()
@@ -1679,18 +1768,111 @@ def check_ports(ctx, port, stack):
         logger.warning(f"{occupied} out of {total_count} ports are occupied")
 
 
-# === Comando: shell ===
+# === Helpers ===
+
+def _write_tsv(columns: tuple, rows: list):
+    """
+    Escribe una tabla como TSV en stdout con una sola escritura
+
+    Args:
+        columns: Nombres de las columnas
+        rows: Filas (tuplas de strings)
+    """
+    lines = ['\t'.join(columns)]
+    lines.extend('\t'.join(row) for row in rows)
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()
+
+
+def _fmt_ts(timestamp: str, seconds: bool = False) -> str:
+    """
+    Formatea un timestamp ISO 8601 como 'YYYY-MM-DD HH:MM[:SS]'
+
+    Los timestamps de LDM vienen de datetime.isoformat(), con formato fijo,
+    así que basta con recortar el string en lugar de parsearlo.
+
+    Args:
+        timestamp: Timestamp ISO (ej: 2025-01-31T14:05:09.123456)
+        seconds: Incluir los segundos
+
+    Returns:
+        Timestamp formateado, el original si no es ISO, o 'unknown'
+    """
+    if not timestamp:
+        return "unknown"
+
+    width = 19 if seconds else 16
+    if len(timestamp) >= width and timestamp[4] == '-' and timestamp[10] in 'T ':
+        return timestamp[:width].replace('T', ' ')
+    return timestamp
+
+
+def _clone_with_fallback(
+    repo_url: str,
+    destination: Path,
+    depth: Optional[int] = 1,
+    filter_spec: Optional[str] = None
+) -> tuple:
+    """
+    Clona un repositorio probando 'main' y luego 'master'
+
+    Args:
+        repo_url: URL del repositorio
+        destination: Path de destino
+        depth: Profundidad del clone (None = historial completo)
+        filter_spec: Filtro de partial clone (None = sin filtro)
+
+    Returns:
+        Tupla (éxito, commit corto)
+    """
+    git_manager = _load_deploy_deps().GitManager()
+
+    clone_kwargs = {'depth': depth, 'filter_spec': filter_spec}
+
+    if not git_manager.clone(repo_url, destination, branch="main", **clone_kwargs):
+        logger.info(f"Trying 'master' branch for {repo_url}")
+        if not git_manager.clone(repo_url, destination, branch="master", **clone_kwargs):
+            return False, None
+
+    return True, git_manager.get_current_commit_short()
+
+
+def _pull_repository(repo_path: Path) -> tuple:
+    """
+    Hace pull de un repositorio y obtiene su commit actual
+
+    Args:
+        repo_path: Path al repositorio
+
+    Returns:
+        Tupla (éxito, commit corto)
+    """
+    git_manager = _load_deploy_deps().GitManager(repo_path)
+    ok = git_manager.pull()
+    return ok, git_manager.get_current_commit_short()
+
+
+def _last_output_line(output: Optional[str]) -> str:
+    """Última línea no vacía de la salida de un comando (suele contener el error)"""
+    lines = [line for line in (output or '').splitlines() if line.strip()]
+    return lines[-1].strip() if lines else "no output"
 
-@cli.command()
-@click.argument('service')
-def shell(service):
-    """Abre una shell en un contenedor específico"""
-    if not project_exists():
-        logger.error("No hay proyecto activo")
-        sys.exit(1)
 
-    # TODO: Implementar en Fase 8
-    logger.warning("Comando 'shell' será implementado en Fase 8")
+def _require_project(message: str = "No active project"):
+    """
+    Obtiene (path, configuración) del proyecto activo o termina el comando
+
+    Args:
+        message: Mensaje de error si no hay proyecto activo
+
+    Returns:
+        Tupla (path del proyecto, configuración)
+    """
+    try:
+        return load_project()
+    except NoActiveProject:
+        logger.error(message)
+        sys.exit(1)
 
 
 # === Punto de entrada ===
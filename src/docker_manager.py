@@ -4,14 +4,62 @@ Maneja contenedores, imágenes, redes, volúmenes, compose, etc.
 """
 
 import os
+import re
+import sys
+import json
+import heapq
+import shlex
+import time
+import shutil
+import functools
+import threading
 import subprocess
 from pathlib import Path
 from typing import Optional, Dict, List, Tuple
 import docker
 from docker.errors import DockerException, APIError, NotFound
 import yaml
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; se usa json estándar
+    orjson = None
 
 from .logger import logger
+from .env_manager import EnvManager
+from .utils import get_base_path, load_json_file, save_json_file, command_exists
+
+# Loader YAML en C si está disponible (mucho más rápido que el puro Python)
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Separa la salida del comando de la de `compose ps` en _run_with_status
+_STATUS_MARKER = "__LDM_COMPOSE_PS__"
+
+# Labels que Compose pone a los contenedores de un proyecto
+_PROJECT_LABEL = "com.docker.compose.project"
+_SERVICE_LABEL = "com.docker.compose.service"
+_ONEOFF_LABEL = "com.docker.compose.oneoff"
+
+# Caracteres que Compose elimina al derivar el nombre de proyecto del directorio
+_PROJECT_NAME_INVALID_RE = re.compile(r'[^a-z0-9_-]')
+
+# Vigencia (segundos) del listado de contenedores del proyecto (ver _project_containers);
+# up/down/restart lo invalidan
+CONTAINER_LIST_TTL = 1.0
+
+# Health check dentro del Status del listado: "Up 2 minutes (healthy)"
+_HEALTH_IN_STATUS_RE = re.compile(r'\((healthy|unhealthy|health: starting)\)')
+
+# Archivo donde se persiste el comando de Compose detectado entre ejecuciones
+COMPOSE_CMD_CACHE_NAME = "compose_cmd.json"
+
+# Comando de Compose ya resuelto en este proceso (ver _cached_compose_command)
+_compose_cmd_memo: Optional[List[str]] = None
+
+# Cliente del SDK compartido por todos los DockerManager del proceso (ver _get_client)
+_client: Optional[docker.DockerClient] = None
+_client_lock = threading.Lock()
 
 
 class DockerManager:
@@ -27,12 +75,24 @@ class DockerManager:
         self.compose_file = Path(compose_file) if compose_file else None
         self.client = None
 
-        # Detectar comando de Docker Compose (v1 vs v2)
+        # Detectar comando de Docker Compose (v1 vs v2), con cache persistente
         self.compose_cmd = self._detect_compose_command()
 
+        # Existencia del compose file verificada una vez (los comandos de LDM
+        # crean el manager después de validar el proyecto)
+        self._compose_valid = self.compose_file is not None and self.compose_file.exists()
+
+        # Listados recientes de contenedores: (all, service) -> (instante, lista)
+        self._containers_cache = {}
+
+        # Directorio de trabajo de los comandos compose
+        self._compose_dir = self.compose_file.parent if self.compose_file else None
+
+        # Prefijo común de todos los comandos compose, armado una sola vez
+        self._compose_prefix = (*self.compose_cmd, '-f', str(self.compose_file)) if self.compose_file else tuple(self.compose_cmd)
+
         try:
-            self.client = docker.from_env()
-            logger.log_debug("Docker client initialized")
+            self.client = _get_client()
         except DockerException as e:
             logger.log_error(f"Failed to initialize Docker client: {str(e)}")
 
@@ -43,36 +103,8 @@ class DockerManager:
         Returns:
             Lista con el comando a usar (['docker', 'compose'] o ['docker-compose'])
         """
-        # Intentar docker compose (v2, integrado)
-        try:
-            result = subprocess.run(
-                ['docker', 'compose', 'version'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                logger.log_debug("Using Docker Compose v2 (docker compose)")
-                return ['docker', 'compose']
-        except Exception:
-            pass
-
-        # Intentar docker-compose (v1, standalone)
-        try:
-            result = subprocess.run(
-                ['docker-compose', '--version'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                logger.log_debug("Using Docker Compose v1 (docker-compose)")
-                return ['docker-compose']
-        except Exception:
-            pass
-
-        # Default a v2 (más moderno)
-        return ['docker', 'compose']
+        # Default a v2 (más moderno) si no se detecta ninguno
+        return _cached_compose_command() or [_docker_bin(), 'compose']
 
     def is_docker_running(self) -> bool:
         """
@@ -110,8 +142,10 @@ class DockerManager:
         self,
         detached: bool = True,
         build: bool = False,
-        force_recreate: bool = False
-    ) -> bool:
+        force_recreate: bool = False,
+        with_status: bool = False,
+        parallel: Optional[int] = None
+    ):
         """
         Ejecuta docker-compose up
 
@@ -119,16 +153,18 @@ class DockerManager:
             detached: Ejecutar en background (-d)
             build: Rebuild de imágenes (--build)
             force_recreate: Forzar recreación (--force-recreate)
+            with_status: Obtener también el estado de los servicios
+            parallel: Máximo de operaciones en paralelo (Compose v2, --parallel)
 
         Returns:
-            True si exitoso
+            True si exitoso; con with_status, tupla (éxito, estado de servicios)
         """
-        if not self.compose_file or not self.compose_file.exists():
+        if not self._compose_valid:
             logger.error(f"docker-compose.yml not found at {self.compose_file}")
-            return False
+            return (False, {}) if with_status else False
 
         try:
-            cmd = self.compose_cmd + ['-f', str(self.compose_file), 'up']
+            cmd = [*self._compose_prefix, *self._parallel_args(parallel), 'up']
 
             if detached:
                 cmd.append('-d')
@@ -138,28 +174,24 @@ class DockerManager:
                 cmd.append('--force-recreate')
 
             logger.step("Starting Docker Compose")
-            logger.info(f"Command: {' '.join(cmd)}")
+            if logger.is_debug_enabled():
+                logger.log_debug("Command: %s", shlex.join(cmd))
 
-            result = subprocess.run(
-                cmd,
-                cwd=self.compose_file.parent,
-                capture_output=True,
-                text=True
-            )
+            result, status = self._run_with_status(cmd, with_status, env=_buildkit_env() if build else None)
 
             if result.returncode == 0:
                 logger.success("Docker Compose up completed")
                 if result.stdout:
-                    logger.log_debug(f"Output: {result.stdout}")
-                return True
+                    logger.log_debug("Output: %s", result.stdout)
+                return (True, status) if with_status else True
             else:
                 logger.error(f"Docker Compose up failed: {result.stderr}")
-                return False
+                return (False, {}) if with_status else False
 
         except Exception as e:
             logger.error(f"Error running docker-compose up: {str(e)}")
             logger.log_exception(e)
-            return False
+            return (False, {}) if with_status else False
 
     def compose_down(self, remove_volumes: bool = False) -> bool:
         """
@@ -171,12 +203,12 @@ class DockerManager:
         Returns:
             True si exitoso
         """
-        if not self.compose_file or not self.compose_file.exists():
+        if not self._compose_valid:
             logger.error(f"docker-compose.yml not found at {self.compose_file}")
             return False
 
         try:
-            cmd = self.compose_cmd + ['-f', str(self.compose_file), 'down']
+            cmd = [*self._compose_prefix, 'down']
 
             if remove_volumes:
                 cmd.append('-v')
@@ -185,10 +217,11 @@ class DockerManager:
 
             result = subprocess.run(
                 cmd,
-                cwd=self.compose_file.parent,
+                cwd=self._compose_dir,
                 capture_output=True,
                 text=True
             )
+            self._containers_cache.clear()
 
             if result.returncode == 0:
                 logger.success("Docker Compose down completed")
@@ -202,22 +235,23 @@ class DockerManager:
             logger.log_exception(e)
             return False
 
-    def compose_restart(self, services: Optional[List[str]] = None) -> bool:
+    def compose_restart(self, services: Optional[List[str]] = None, with_status: bool = False):
         """
         Reinicia servicios de Docker Compose
 
         Args:
             services: Lista de servicios a reiniciar (None = todos)
+            with_status: Obtener también el estado de los servicios
 
         Returns:
-            True si exitoso
+            True si exitoso; con with_status, tupla (éxito, estado de servicios)
         """
-        if not self.compose_file or not self.compose_file.exists():
+        if not self._compose_valid:
             logger.error(f"docker-compose.yml not found at {self.compose_file}")
-            return False
+            return (False, {}) if with_status else False
 
         try:
-            cmd = self.compose_cmd + ['-f', str(self.compose_file), 'restart']
+            cmd = [*self._compose_prefix, 'restart']
 
             if services:
                 cmd.extend(services)
@@ -225,45 +259,187 @@ class DockerManager:
             else:
                 logger.step("Restarting all services")
 
-            result = subprocess.run(
-                cmd,
-                cwd=self.compose_file.parent,
-                capture_output=True,
-                text=True
-            )
+            result, status = self._run_with_status(cmd, with_status)
 
             if result.returncode == 0:
                 logger.success("Services restarted")
-                return True
+                return (True, status) if with_status else True
             else:
                 logger.error(f"Restart failed: {result.stderr}")
-                return False
+                return (False, {}) if with_status else False
 
         except Exception as e:
             logger.error(f"Error restarting services: {str(e)}")
             logger.log_exception(e)
-            return False
+            return (False, {}) if with_status else False
+
+    def _run_with_status(
+        self,
+        cmd: List[str],
+        with_status: bool,
+        env: Optional[Dict[str, str]] = None
+    ) -> Tuple[subprocess.CompletedProcess, Dict]:
+        """
+        Ejecuta un comando de Compose y, si se pide, `ps` a continuación
+
+        En POSIX ambos van en la misma invocación de sh, separados por una
+        línea marcadora en stdout; `ps` solo se ejecuta si el comando tuvo
+        éxito y el código de salida devuelto es el del comando.
+
+        Args:
+            cmd: Comando de Compose a ejecutar
+            with_status: Ejecutar también `ps --format json --all`
+            env: Entorno del subproceso (None = heredado)
+
+        Returns:
+            Tupla (resultado del comando, estado de servicios o {})
+        """
+        run = functools.partial(
+            subprocess.run,
+            cwd=self._compose_dir,
+            capture_output=True,
+            text=True,
+            env=env
+        )
+
+        # El comando cambia el estado de los contenedores
+        self._containers_cache.clear()
+
+        if not with_status:
+            return run(cmd), {}
+
+        ps_cmd = [*self._compose_prefix, 'ps', '--format', 'json', '--all']
+
+        if os.name != 'posix':
+            result = run(cmd)
+            if result.returncode != 0:
+                return result, {}
+            ps_result = run(ps_cmd)
+            return result, _services_status_from_ps(_parse_ps_output(ps_result.stdout))
+
+        # El código de salida es siempre el del comando; un fallo de `ps` solo deja el estado vacío
+        script = (
+            f"{shlex.join(cmd)}; rc=$?; "
+            f"if [ $rc -eq 0 ]; then printf '%s\\n' {_STATUS_MARKER}; {shlex.join(ps_cmd)}; fi; "
+            "exit $rc"
+        )
+        result = run(['sh', '-c', script])
+
+        output, marker, ps_output = result.stdout.partition(f"{_STATUS_MARKER}\n")
+        result.stdout = output
+        if not marker:
+            return result, {}
+        try:
+            return result, _services_status_from_ps(_parse_ps_output(ps_output))
+        except ValueError:
+            return result, {}
+
+    def compose_restart_parallel(self, with_status: bool = False):
+        """
+        Reinicia todos los servicios en paralelo respetando depends_on
+
+        Los servicios se agrupan en niveles según depends_on (primero los
+        que no dependen de nadie) y los contenedores de cada nivel se
+        reinician a la vez con `docker restart`. Los IDs se obtienen con
+        una sola llamada a `compose ps`. Si algo no se puede resolver se
+        usa compose_restart().
+
+        Args:
+            with_status: Devolver también el estado de los servicios
+
+        Returns:
+            True si exitoso; con with_status, tupla (éxito, estado de servicios)
+        """
+        if not self._compose_valid:
+            logger.error(f"docker-compose.yml not found at {self.compose_file}")
+            return (False, {}) if with_status else False
+
+        try:
+            levels = _dependency_levels(self._compose_config().get('services') or {})
+        except Exception as e:
+            logger.log_debug(f"Could not resolve service dependencies: {str(e)}")
+            levels = None
+
+        # Igual que `compose restart`, incluye contenedores detenidos
+        services = self.compose_ps(all=True)
+        if not levels or not services:
+            return self.compose_restart(with_status=with_status)
+
+        ids_by_service = {}
+        for service in services:
+            ids_by_service.setdefault(service.get('Service'), []).append(service.get('ID'))
+
+        logger.step("Restarting all services")
+
+        for level in levels:
+            container_ids = [cid for name in level for cid in ids_by_service.get(name, []) if cid]
+            if not container_ids:
+                continue
+
+            with ThreadPoolExecutor(max_workers=len(container_ids)) as executor:
+                errors = [e for e in executor.map(self._restart_container, container_ids) if e]
+            self._containers_cache.clear()
 
-    def compose_build(self, services: Optional[List[str]] = None, no_cache: bool = False) -> bool:
+            if errors:
+                logger.error(f"Restart failed: {errors[0]}")
+                return (False, {}) if with_status else False
+
+        logger.success("Services restarted")
+        if not with_status:
+            return True
+
+        # Estado real tras el reinicio (un contenedor puede caerse enseguida);
+        # el cache se limpió después del último nivel
+        return True, _services_status_from_ps(self.compose_ps(all=True) or [])
+
+    def _restart_container(self, container_id: str) -> Optional[str]:
         """
-        Build de servicios Docker Compose
+        Reinicia un contenedor por la API (o con `docker restart` sin cliente)
+
+        Args:
+            container_id: ID del contenedor
+
+        Returns:
+            None si se reinició, o el mensaje de error
+        """
+        if self.client:
+            try:
+                self.client.api.restart(container_id)
+                return None
+            except (APIError, DockerException) as e:
+                return str(e)
+
+        result = subprocess.run([_docker_bin(), 'restart', container_id], capture_output=True, text=True)
+        return None if result.returncode == 0 else result.stderr
+
+    def compose_build(
+        self,
+        services: Optional[List[str]] = None,
+        no_cache: bool = False,
+        parallel: Optional[int] = None
+    ) -> bool:
+        """
+        Build de servicios Docker Compose (con BuildKit)
 
         Args:
             services: Lista de servicios a buildear (None = todos)
             no_cache: No usar cache (--no-cache)
+            parallel: Máximo de builds en paralelo (v2: --parallel N; v1: --parallel)
 
         Returns:
             True si exitoso
         """
-        if not self.compose_file or not self.compose_file.exists():
+        if not self._compose_valid:
             logger.error(f"docker-compose.yml not found at {self.compose_file}")
             return False
 
         try:
-            cmd = self.compose_cmd + ['-f', str(self.compose_file), 'build']
+            cmd = [*self._compose_prefix, *self._parallel_args(parallel), 'build']
 
             if no_cache:
                 cmd.append('--no-cache')
+            if parallel and not self._is_compose_v2():
+                cmd.append('--parallel')
 
             if services:
                 cmd.extend(services)
@@ -272,9 +448,10 @@ class DockerManager:
 
             result = subprocess.run(
                 cmd,
-                cwd=self.compose_file.parent,
+                cwd=self._compose_dir,
                 capture_output=True,
-                text=True
+                text=True,
+                env=_buildkit_env()
             )
 
             if result.returncode == 0:
@@ -289,45 +466,292 @@ class DockerManager:
             logger.log_exception(e)
             return False
 
-    def compose_ps(self) -> Optional[List[Dict]]:
+    def _is_compose_v2(self) -> bool:
+        """True si se usa `docker compose` (v2) en lugar de docker-compose (v1)"""
+        return self.compose_cmd[-1] == 'compose'
+
+    def _parallel_args(self, parallel: Optional[int]) -> List[str]:
+        """
+        Opción global --parallel de Compose v2 (vacía en v1 o si no se pide)
+
+        Args:
+            parallel: Máximo de operaciones en paralelo
+
+        Returns:
+            Argumentos a insertar antes del subcomando
+        """
+        if parallel and self._is_compose_v2():
+            return ['--parallel', str(parallel)]
+        return []
+
+    def _compose_config(self) -> Dict:
+        """
+        docker-compose.yml parseado, reutilizado mientras el archivo no cambie
+
+        Returns:
+            Configuración de Compose (dict vacío si el archivo está vacío)
+        """
+        mtime = self.compose_file.stat().st_mtime_ns
+        cached = getattr(self, '_config_cache', None)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(self.compose_file, 'rb') as f:
+            config = yaml.load(f, Loader=_YAML_LOADER) or {}
+
+        self._config_cache = (mtime, config)
+        return config
+
+    def get_service_names(self) -> List[str]:
+        """
+        Nombres de los servicios definidos en el docker-compose.yml
+
+        Se leen del archivo (sin lanzar `compose config` ni consultar Docker).
+
+        Returns:
+            Lista de servicios (vacía si no hay compose file o no se puede leer)
+        """
+        if not self.compose_file:
+            return []
+        try:
+            return list(self._compose_config().get('services') or {})
+        except Exception as e:
+            logger.log_debug(f"Could not read compose services: {str(e)}")
+            return []
+
+    def _compose_project(self) -> str:
+        """
+        Nombre del proyecto de Compose (mismas reglas que el CLI)
+
+        Prioridad: COMPOSE_PROJECT_NAME del entorno, luego el del .env junto
+        al docker-compose.yml (el que lee el CLI), `name:` del compose y por
+        último el nombre del directorio normalizado.
+
+        Returns:
+            Nombre del proyecto
+        """
+        project = getattr(self, '_project_name', None)
+        if project:
+            return project
+
+        project = os.environ.get('COMPOSE_PROJECT_NAME')
+        if not project:
+            env_path = self._compose_dir / ".env"
+            if env_path.is_file():
+                project = EnvManager(env_path).get('COMPOSE_PROJECT_NAME')
+        if not project:
+            try:
+                project = self._compose_config().get('name')
+            except Exception:
+                project = None
+        if not project:
+            project = _PROJECT_NAME_INVALID_RE.sub('', self._compose_dir.name.lower())
+
+        self._project_name = project
+        return project
+
+    def _project_containers(self, all: bool = False, service: Optional[str] = None) -> Optional[List]:
+        """
+        Lista los contenedores del proyecto mediante el SDK, filtrando por labels
+
+        Args:
+            all: Incluir también contenedores detenidos
+            service: Limitar a un servicio
+
+        El resultado se reutiliza durante CONTAINER_LIST_TTL segundos, así
+        un refresco de estado frecuente no repite la llamada a la API.
+
+        Returns:
+            Lista de contenedores (resumen, sin inspect por contenedor) o
+            None si no hay cliente del SDK o la API falla (usar el CLI)
+        """
+        if not self.client:
+            return None
+
+        key = (all, service)
+        now = time.monotonic()
+        cached = self._containers_cache.get(key)
+        if cached and now - cached[0] < CONTAINER_LIST_TTL:
+            return cached[1]
+
+        labels = [f"{_PROJECT_LABEL}={self._compose_project()}", f"{_ONEOFF_LABEL}=False"]
+        if service:
+            labels.append(f"{_SERVICE_LABEL}={service}")
+
+        try:
+            # sparse=True: solo GET /containers/json, sin un inspect por contenedor
+            filters = {'label': labels}
+            if not all:
+                filters['status'] = 'running'
+            containers = self.client.containers.list(all=all, sparse=True, filters=filters)
+        except (APIError, DockerException) as e:
+            logger.log_debug(f"SDK container list failed, falling back to CLI: {str(e)}")
+            return None
+
+        containers = sorted(containers, key=lambda c: c.labels.get(_SERVICE_LABEL, ''))
+        self._containers_cache[key] = (now, containers)
+        return containers
+
+    def compose_ps(self, all: bool = False) -> Optional[List[Dict]]:
         """
         Lista servicios de Docker Compose
 
+        Args:
+            all: Incluir también contenedores detenidos
+
         Returns:
             Lista de servicios con su info o None
         """
-        if not self.compose_file or not self.compose_file.exists():
+        if not self._compose_valid:
             return None
 
+        # Una llamada a la API por el socket ya abierto, sin lanzar el CLI
+        containers = self._project_containers(all=all)
+        if containers is not None:
+            return [_ps_entry_from_container(c) for c in containers]
+
         try:
-            cmd = self.compose_cmd + ['-f', str(self.compose_file), 'ps', '--format', 'json']
+            cmd = [*self._compose_prefix, 'ps', '--format', 'json']
+            if all:
+                cmd.append('--all')
 
+            # Bytes sin decodificar: orjson parsea bytes directamente
             result = subprocess.run(
                 cmd,
-                cwd=self.compose_file.parent,
-                capture_output=True,
-                text=True
+                cwd=self._compose_dir,
+                capture_output=True
             )
 
             if result.returncode == 0 and result.stdout:
-                import json
-                # docker-compose ps --format json retorna líneas JSON
-                services = []
-                for line in result.stdout.strip().split('\n'):
-                    if line:
-                        services.append(json.loads(line))
-                return services
+                return _parse_ps_output(result.stdout)
             return []
 
         except Exception as e:
             logger.log_error(f"Error getting compose services: {str(e)}")
             return None
 
+    def get_service_info(self, service: str) -> Optional[Dict]:
+        """
+        Obtiene la info de `compose ps` de un único servicio
+
+        Consulta solo ese servicio (incluido si está detenido) en lugar de
+        listar todo el stack.
+
+        Args:
+            service: Nombre del servicio
+
+        Returns:
+            Dict de `compose ps` del primer contenedor del servicio, o None
+            si el servicio no existe o no tiene contenedor
+        """
+        if not self._compose_valid:
+            return None
+
+        containers = self._project_containers(all=True, service=service)
+        if containers is not None:
+            return _ps_entry_from_container(containers[0]) if containers else None
+
+        try:
+            cmd = [*self._compose_prefix, 'ps', '--all', '--format', 'json', service]
+
+            result = subprocess.run(
+                cmd,
+                cwd=self._compose_dir,
+                capture_output=True
+            )
+
+            if result.returncode != 0 or not result.stdout.strip():
+                return None
+
+            services = _parse_ps_output(result.stdout)
+            return services[0] if services else None
+
+        except Exception as e:
+            logger.log_error(f"Error getting service {service}: {str(e)}")
+            return None
+
+    def count_running(self) -> int:
+        """
+        Cuenta los servicios en ejecución dejando el filtrado a Docker
+
+        Returns:
+            Cantidad de contenedores en estado running (0 si falla)
+        """
+        if not self._compose_valid:
+            return 0
+
+        containers = self._project_containers()
+        if containers is not None:
+            return len(containers)
+
+        try:
+            cmd = [*self._compose_prefix, 'ps', '--status', 'running', '--quiet']
+
+            result = subprocess.run(
+                cmd,
+                cwd=self._compose_dir,
+                capture_output=True
+            )
+
+            if result.returncode != 0:
+                return 0
+            # Un ID de contenedor por línea
+            return len(result.stdout.split())
+
+        except Exception as e:
+            logger.log_error(f"Error counting running services: {str(e)}")
+            return 0
+
+    def running_services(self) -> set:
+        """
+        Obtiene los nombres de los servicios en ejecución
+
+        Returns:
+            Conjunto de servicios running (vacío si falla)
+        """
+        if not self._compose_valid:
+            return set()
+
+        containers = self._project_containers()
+        if containers is not None:
+            return {c.labels.get(_SERVICE_LABEL) for c in containers}
+
+        try:
+            cmd = [*self._compose_prefix, 'ps', '--status', 'running', '--services']
+
+            result = subprocess.run(
+                cmd,
+                cwd=self._compose_dir,
+                capture_output=True,
+                text=True
+            )
+
+            if result.returncode != 0:
+                return set()
+            return set(result.stdout.split())
+
+        except Exception as e:
+            logger.log_error(f"Error getting running services: {str(e)}")
+            return set()
+
+    def is_service_running(self, service: str) -> bool:
+        """
+        Verifica si un servicio de Compose está en ejecución
+
+        Args:
+            service: Nombre del servicio
+
+        Returns:
+            True si el servicio está running
+        """
+        return service in self.running_services()
+
     def compose_logs(
         self,
         service: Optional[str] = None,
         follow: bool = False,
-        tail: int = 100
+        tail: int = 100,
+        replace_process: bool = False
     ) -> bool:
         """
         Muestra logs de servicios
@@ -336,16 +760,18 @@ class DockerManager:
             service: Servicio específico (None = todos)
             follow: Seguir logs en tiempo real
             tail: Número de líneas a mostrar
+            replace_process: En POSIX, reemplazar el proceso actual por
+                docker compose (os.execvp); no retorna si tiene éxito
 
         Returns:
             True si exitoso
         """
-        if not self.compose_file or not self.compose_file.exists():
+        if not self._compose_valid:
             logger.error(f"docker-compose.yml not found at {self.compose_file}")
             return False
 
         try:
-            cmd = self.compose_cmd + ['-f', str(self.compose_file), 'logs', f'--tail={tail}']
+            cmd = [*self._compose_prefix, 'logs', f'--tail={tail}']
 
             if follow:
                 cmd.append('-f')
@@ -355,10 +781,26 @@ class DockerManager:
 
             logger.info(f"Showing logs for {service or 'all services'}")
 
+            # Sin follow: los logs se piden directamente al daemon por el SDK
+            if not follow:
+                containers = self._project_containers(all=True, service=service)
+                if containers:
+                    _write_merged_logs(containers, tail)
+                    return True
+
+            if replace_process and os.name == 'posix':
+                # Sin proceso Python residente durante un follow largo;
+                # Ctrl+C llega directo a docker compose
+                sys.stdout.flush()
+                sys.stderr.flush()
+                logger.flush()
+                os.chdir(self._compose_dir)
+                os.execvp(cmd[0], cmd)
+
             # Ejecutar sin captura para que se muestre en tiempo real
             result = subprocess.run(
                 cmd,
-                cwd=self.compose_file.parent
+                cwd=self._compose_dir
             )
 
             return result.returncode == 0
@@ -379,15 +821,28 @@ class DockerManager:
         Returns:
             Tupla (success, output)
         """
-        if not self.compose_file or not self.compose_file.exists():
+        if not self._compose_valid:
             return False, "docker-compose.yml not found"
 
+        # exec por la API (equivale a `compose exec -T`, sin lanzar el CLI)
+        containers = self._project_containers(service=service)
+        if containers == []:
+            return False, f"service \"{service}\" is not running"
+        if containers:
+            try:
+                result = containers[0].exec_run(command, demux=True)
+                stdout, stderr = result.output or (None, None)
+                output = (stdout or stderr or b'').decode('utf-8', errors='replace')
+                return result.exit_code == 0, output
+            except (APIError, DockerException) as e:
+                logger.log_debug(f"SDK exec failed, falling back to CLI: {str(e)}")
+
         try:
-            cmd = self.compose_cmd + ['-f', str(self.compose_file), 'exec', '-T', service] + command
+            cmd = [*self._compose_prefix, 'exec', '-T', service, *command]
 
             result = subprocess.run(
                 cmd,
-                cwd=self.compose_file.parent,
+                cwd=self._compose_dir,
                 capture_output=True,
                 text=True
             )
@@ -419,6 +874,27 @@ class DockerManager:
             logger.log_error(f"Error getting container {name}: {str(e)}")
             return None
 
+    def _container_snapshot(self) -> Dict[str, Dict]:
+        """
+        Listado de los contenedores del proyecto, reutilizado durante unos instantes
+
+        Una sola llamada a la API sirve para consultar el estado de varios
+        contenedores seguidos en lugar de un inspect por contenedor.
+
+        Returns:
+            Dict nombre de contenedor (y de servicio) -> resumen del listado;
+            vacío si no hay compose file o cliente
+        """
+        snapshot = {}
+        if self.compose_file:
+            for container in self._project_containers(all=True) or []:
+                attrs = container.attrs
+                snapshot.setdefault(container.labels.get(_SERVICE_LABEL), attrs)
+                for name in attrs.get('Names') or []:
+                    snapshot[name.lstrip('/')] = attrs
+
+        return snapshot
+
     def get_container_status(self, name: str) -> Optional[str]:
         """
         Obtiene el estado de un contenedor
@@ -429,6 +905,10 @@ class DockerManager:
         Returns:
             Estado ('running', 'exited', etc.) o None
         """
+        attrs = self._container_snapshot().get(name)
+        if attrs:
+            return attrs.get('State')
+
         container = self.get_container(name)
         if container:
             return container.status
@@ -447,26 +927,34 @@ class DockerManager:
         status = self.get_container_status(name)
         return status == 'running'
 
-    def get_container_logs(self, name: str, tail: int = 100) -> Optional[str]:
+    def get_container_logs(self, name: str, tail: int = 100, decode: bool = True):
         """
         Obtiene logs de un contenedor
 
         Args:
             name: Nombre del contenedor
             tail: Líneas a obtener
+            decode: Decodificar a str; con False se devuelven los bytes tal
+                cual (para escribirlos a un archivo sin pasar por UTF-8)
 
         Returns:
-            Logs como string o None
+            Logs como string (o bytes) o None
         """
-        container = self.get_container(name)
-        if container:
-            try:
-                logs = container.logs(tail=tail, timestamps=True)
-                return logs.decode('utf-8')
-            except Exception as e:
-                logger.log_error(f"Error getting logs: {str(e)}")
-                return None
-        return None
+        if not self.client:
+            return None
+
+        try:
+            # La API acepta el nombre: sin el inspect previo de containers.get()
+            logs = self.client.api.logs(name, tail=tail, timestamps=True)
+        except NotFound:
+            return None
+        except Exception as e:
+            logger.log_error(f"Error getting logs: {str(e)}")
+            return None
+
+        if not decode:
+            return logs
+        return str(logs, 'utf-8', errors='replace')
 
     def container_health(self, name: str) -> Optional[str]:
         """
@@ -478,6 +966,13 @@ class DockerManager:
         Returns:
             Health status ('healthy', 'unhealthy', etc.) o None
         """
+        attrs = self._container_snapshot().get(name)
+        if attrs:
+            match = _HEALTH_IN_STATUS_RE.search(attrs.get('Status', ''))
+            if not match:
+                return None
+            return 'starting' if match.group(1) == 'health: starting' else match.group(1)
+
         container = self.get_container(name)
         if container:
             try:
@@ -504,16 +999,16 @@ class DockerManager:
             if not self.client:
                 return False
 
-            # Verificar si ya existe
+            # Un solo create: si ya existe, Docker responde 409
+            logger.step(f"Creating Docker network: {name}")
             try:
-                self.client.networks.get(name)
+                self.client.networks.create(name, driver=driver, check_duplicate=True)
+            except APIError as e:
+                if e.status_code != 409:
+                    raise
                 logger.info(f"Network {name} already exists")
                 return True
-            except NotFound:
-                pass
 
-            logger.step(f"Creating Docker network: {name}")
-            self.client.networks.create(name, driver=driver)
             logger.success(f"Network {name} created")
             return True
 
@@ -536,9 +1031,9 @@ class DockerManager:
             if not self.client:
                 return False
 
-            network = self.client.networks.get(name)
+            # DELETE directo, sin el inspect previo
             logger.step(f"Removing network: {name}")
-            network.remove()
+            self.client.api.remove_network(name)
             logger.success(f"Network {name} removed")
             return True
 
@@ -566,15 +1061,16 @@ class DockerManager:
             if not self.client:
                 return False
 
-            # Verificar si ya existe
+            # volumes.create responde igual si el volumen ya existe (no hay 409
+            # como en redes), así que la existencia se comprueba antes
+            logger.step(f"Creating Docker volume: {name}")
             try:
-                self.client.volumes.get(name)
+                self.client.api.inspect_volume(name)
                 logger.info(f"Volume {name} already exists")
                 return True
             except NotFound:
                 pass
 
-            logger.step(f"Creating Docker volume: {name}")
             self.client.volumes.create(name)
             logger.success(f"Volume {name} created")
             return True
@@ -598,9 +1094,9 @@ class DockerManager:
             if not self.client:
                 return False
 
-            volume = self.client.volumes.get(name)
+            # DELETE directo, sin el inspect previo
             logger.step(f"Removing volume: {name}")
-            volume.remove()
+            self.client.api.remove_volume(name)
             logger.success(f"Volume {name} removed")
             return True
 
@@ -618,26 +1114,18 @@ class DockerManager:
         """
         Obtiene estado de todos los servicios del compose
 
+        Una sola llamada a `compose ps --all`: su JSON ya trae estado,
+        status y puertos, no hace falta inspeccionar cada contenedor.
+
         Returns:
             Dict con info de cada servicio
         """
-        services_info = {}
-        services = self.compose_ps()
+        services = self.compose_ps(all=True)
 
         if not services:
             return {}
 
-        for service in services:
-            name = service.get('Name', 'unknown')
-            services_info[name] = {
-                'name': name,
-                'state': service.get('State', 'unknown'),
-                'status': service.get('Status', 'unknown'),
-                'ports': service.get('Publishers', []),
-                'running': service.get('State') == 'running'
-            }
-
-        return services_info
+        return _services_status_from_ps(services)
 
     def wait_for_healthy(self, container_name: str, timeout: int = 60) -> bool:
         """
@@ -650,11 +1138,41 @@ class DockerManager:
         Returns:
             True si está healthy
         """
-        import time
-
         logger.step(f"Waiting for {container_name} to be healthy...")
 
+        # El stream de eventos arranca antes del chequeo inicial para no perder
+        # un cambio de estado que ocurra entre ambos
         start_time = time.time()
+        since = int(start_time)
+
+        if self.container_health(container_name) == 'healthy':
+            logger.success(f"{container_name} is healthy")
+            return True
+
+        if self.client:
+            try:
+                # Docker cierra el stream al llegar a `until`
+                events = self.client.events(
+                    since=since,
+                    until=since + timeout,
+                    filters={'container': container_name, 'event': 'health_status'},
+                    decode=True
+                )
+                try:
+                    for event in events:
+                        if event.get('Action', event.get('status')) == 'health_status: healthy':
+                            logger.success(f"{container_name} is healthy")
+                            return True
+                finally:
+                    events.close()
+
+                logger.warning(f"{container_name} did not become healthy within {timeout}s")
+                return False
+
+            except (APIError, DockerException) as e:
+                logger.log_debug(f"Docker events unavailable, polling health: {str(e)}")
+
+        # Sin cliente del SDK o sin stream de eventos: polling
         while time.time() - start_time < timeout:
             health = self.container_health(container_name)
 
@@ -674,18 +1192,13 @@ def check_docker_installed() -> bool:
     """
     Verifica si Docker está instalado
 
+    Basta con encontrar el binario en el PATH; si el daemon responde lo
+    indica DockerManager.is_docker_running().
+
     Returns:
         True si Docker está instalado
     """
-    try:
-        result = subprocess.run(
-            ['docker', '--version'],
-            capture_output=True,
-            text=True
-        )
-        return result.returncode == 0
-    except FileNotFoundError:
-        return False
+    return command_exists('docker')
 
 
 def check_docker_compose_installed() -> bool:
@@ -695,44 +1208,304 @@ def check_docker_compose_installed() -> bool:
     Returns:
         True si docker-compose está instalado
     """
-    # Intentar docker compose (v2)
+    return _cached_compose_command() is not None
+
+
+def get_docker_info() -> Dict:
+    """
+    Obtiene información completa de Docker
+
+    Returns:
+        Dict con información de Docker
+    """
+    # Las sondas lentas (detección de compose y conexión del cliente del SDK)
+    # corren en paralelo; no se construye un DockerManager que las haría en serie
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        installed = executor.submit(check_docker_installed)
+        compose_installed = executor.submit(check_docker_compose_installed)
+        daemon = executor.submit(_probe_daemon)
+
+        docker_running, docker_version = daemon.result()
+        return {
+            'docker_installed': installed.result(),
+            'docker_compose_installed': compose_installed.result(),
+            'docker_running': docker_running,
+            'docker_version': docker_version,
+        }
+
+
+def _parse_ps_output(output) -> List[Dict]:
+    """
+    Parsea la salida de `compose ps --format json` (str o bytes)
+
+    Compose v2.21+ emite una línea JSON por servicio; versiones anteriores,
+    un único array JSON. Se aceptan ambos formatos.
+    """
+    loads = orjson.loads if orjson is not None else json.loads
+    output = output.strip()
+    if not output:
+        return []
+    if output[:1] in ('[', b'['):
+        return loads(output)
+    return [loads(line) for line in output.splitlines() if line]
+
+
+def _buildkit_env() -> Dict[str, str]:
+    """Entorno con BuildKit activado; variables ya definidas por el usuario tienen prioridad"""
+    return {'DOCKER_BUILDKIT': '1', 'COMPOSE_DOCKER_CLI_BUILD': '1', **os.environ}
+
+
+def _ps_entry_from_container(container) -> Dict:
+    """Convierte un contenedor del SDK (resumen de /containers/json) al formato de `compose ps --format json`"""
+    attrs = container.attrs
+    names = attrs.get('Names') or []
+    publishers = [
+        {
+            'URL': port.get('IP', ''),
+            'TargetPort': port.get('PrivatePort', 0),
+            'PublishedPort': port.get('PublicPort', 0),
+            'Protocol': port.get('Type', 'tcp'),
+        }
+        for port in attrs.get('Ports') or []
+    ]
+    return {
+        'ID': attrs.get('Id', '')[:12],
+        'Name': names[0].lstrip('/') if names else container.id[:12],
+        'Service': container.labels.get(_SERVICE_LABEL, ''),
+        'State': attrs.get('State', 'unknown'),
+        'Status': attrs.get('Status', 'unknown'),
+        'Publishers': publishers,
+    }
+
+
+def _write_merged_logs(containers: List, tail: int):
+    """
+    Escribe en stdout los logs de varios contenedores en orden cronológico
+
+    Cada contenedor se pide con timestamps (formato RFC 3339 de ancho
+    fijo, ordenable como bytes) y se mezclan con heapq.merge; el timestamp
+    se quita al escribir y se antepone el servicio, como `compose logs`.
+
+    Args:
+        containers: Contenedores del SDK
+        tail: Líneas por contenedor
+    """
+    width = max(len(c.labels.get(_SERVICE_LABEL, '')) for c in containers)
+    streams = []
+    for container in containers:
+        prefix = f"{container.labels.get(_SERVICE_LABEL, ''):<{width}} | ".encode()
+        data = container.logs(tail=tail, timestamps=True)
+        streams.append([(line, prefix) for line in data.splitlines(keepends=True)])
+
+    out = sys.stdout.buffer
+    sys.stdout.flush()
+    for line, prefix in heapq.merge(*streams):
+        _, _, text = line.partition(b' ')
+        out.write(prefix + (text if text.endswith(b'\n') else text + b'\n'))
+    out.flush()
+
+
+def _services_status_from_ps(services: List[Dict]) -> Dict[str, Dict]:
+    """Convierte la salida de `compose ps` al dict de get_services_status()"""
+    services_info = {}
+    for service in services:
+        name = service.get('Name', 'unknown')
+        services_info[name] = {
+            'name': name,
+            'state': service.get('State', 'unknown'),
+            'status': service.get('Status', 'unknown'),
+            'ports': service.get('Publishers', []),
+            'running': service.get('State') == 'running'
+        }
+    return services_info
+
+
+def _compose_fingerprint() -> List:
+    """Huella de los binarios de Docker para invalidar el cache de Compose"""
+    fingerprint = []
+    for binary in ('docker', 'docker-compose'):
+        path = shutil.which(binary)
+        try:
+            mtime = os.stat(path).st_mtime_ns if path else None
+        except OSError:
+            mtime = None
+        fingerprint.append([path, mtime])
+    return fingerprint
+
+
+def _get_client() -> docker.DockerClient:
+    """
+    Obtiene el cliente del SDK, creándolo una sola vez por proceso
+
+    docker.from_env() lee el entorno y negocia la versión de la API con
+    una petición a /version; el cliente (y su pool de conexiones) se
+    reutiliza entre instancias de DockerManager.
+
+    Raises:
+        DockerException: Si no se puede conectar con Docker (no se cachea)
+    """
+    global _client
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            _client = docker.from_env()
+            logger.log_debug("Docker client initialized")
+    return _client
+
+
+def _probe_daemon() -> Tuple[bool, Optional[Dict]]:
+    """
+    Conecta con el daemon y obtiene su versión
+
+    Returns:
+        Tupla (docker_running, docker_version)
+    """
+    try:
+        client = _get_client()
+    except DockerException as e:
+        logger.log_error(f"Failed to initialize Docker client: {str(e)}")
+        return False, None
+
+    try:
+        client.ping()
+    except Exception:
+        return False, None
+
+    try:
+        return True, client.version()
+    except Exception as e:
+        logger.log_error(f"Error getting Docker version: {str(e)}")
+        return True, None
+
+
+@functools.lru_cache(maxsize=1)
+def _docker_bin() -> str:
+    """Ruta absoluta del binario docker (resuelta una vez por proceso)"""
+    return shutil.which('docker') or 'docker'
+
+
+def _probe_compose_command() -> Optional[List[str]]:
+    """
+    Lanza los subprocesos que detectan Docker Compose
+
+    El binario se devuelve con su ruta absoluta, así cada invocación
+    posterior no vuelve a recorrer el PATH.
+
+    Returns:
+        [docker, 'compose'] (v2), [docker-compose] (v1) o None si no hay ninguno
+    """
+    docker_bin = _docker_bin()
+    compose_bin = shutil.which('docker-compose') or 'docker-compose'
+
+    # Intentar docker compose (v2, integrado)
     try:
         result = subprocess.run(
-            ['docker', 'compose', 'version'],
+            [docker_bin, 'compose', 'version'],
             capture_output=True,
             text=True,
             timeout=5
         )
         if result.returncode == 0:
-            return True
+            logger.log_debug("Using Docker Compose v2 (docker compose)")
+            return [docker_bin, 'compose']
     except Exception:
         pass
 
-    # Intentar docker-compose (v1)
+    # Intentar docker-compose (v1, standalone)
     try:
         result = subprocess.run(
-            ['docker-compose', '--version'],
+            [compose_bin, '--version'],
             capture_output=True,
             text=True,
             timeout=5
         )
-        return result.returncode == 0
+        if result.returncode == 0:
+            logger.log_debug("Using Docker Compose v1 (docker-compose)")
+            return [compose_bin]
     except Exception:
-        return False
+        pass
 
+    return None
 
-def get_docker_info() -> Dict:
+
+def _cached_compose_command() -> Optional[List[str]]:
     """
-    Obtiene información completa de Docker
+    Obtiene el comando de Compose: memo del proceso, cache en disco o detección
+
+    El cache en disco se invalida si cambia la ruta o el mtime de los
+    binarios de Docker. Solo se guardan detecciones exitosas, así que
+    instalar Compose después no queda oculto por un resultado negativo.
 
     Returns:
-        Dict con información de Docker
+        Lista con el comando a usar o None si Compose no está instalado
     """
-    manager = DockerManager()
+    global _compose_cmd_memo
+    if _compose_cmd_memo is not None:
+        return list(_compose_cmd_memo)
 
-    return {
-        'docker_installed': check_docker_installed(),
-        'docker_compose_installed': check_docker_compose_installed(),
-        'docker_running': manager.is_docker_running(),
-        'docker_version': manager.get_docker_version()
-    }
+    cache_path = get_base_path() / COMPOSE_CMD_CACHE_NAME
+    fingerprint = _compose_fingerprint()
+
+    try:
+        cached = load_json_file(cache_path)
+        if cached and cached.get('fingerprint') == fingerprint and cached.get('compose_cmd'):
+            _compose_cmd_memo = cached['compose_cmd']
+            return list(_compose_cmd_memo)
+    except Exception:
+        pass
+
+    compose_cmd = _probe_compose_command()
+    if compose_cmd is None:
+        return None
+
+    _compose_cmd_memo = compose_cmd
+    try:
+        save_json_file(cache_path, {'fingerprint': fingerprint, 'compose_cmd': compose_cmd})
+    except Exception as e:
+        logger.log_debug(f"Could not cache compose command: {str(e)}")
+
+    return list(compose_cmd)
+
+
+def invalidate_compose_cmd_cache():
+    """Elimina el cache del comando de Compose (se vuelve a detectar)"""
+    global _compose_cmd_memo
+    _compose_cmd_memo = None
+    _docker_bin.cache_clear()
+    try:
+        (get_base_path() / COMPOSE_CMD_CACHE_NAME).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _dependency_levels(services: Dict) -> Optional[List[List[str]]]:
+    """
+    Agrupa servicios de Compose en niveles según depends_on
+
+    Args:
+        services: Sección 'services' del docker-compose.yml
+
+    Returns:
+        Lista de niveles (cada uno depende solo de niveles previos) o None
+        si hay un ciclo
+    """
+    pending = {}
+    for name, config in services.items():
+        depends_on = (config or {}).get('depends_on') or []
+        # depends_on puede ser lista o dict (con condiciones)
+        pending[name] = set(depends_on) & set(services)
+
+    levels = []
+    while pending:
+        level = sorted(name for name, deps in pending.items() if not deps)
+        if not level:
+            return None
+        levels.append(level)
+        for name in level:
+            del pending[name]
+        for deps in pending.values():
+            deps.difference_update(level)
+
+    return levels
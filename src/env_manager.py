@@ -6,16 +6,24 @@ Maneja creación, carga, actualización y validación de variables de entorno
 import os
 import re
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from dotenv import load_dotenv, set_key, unset_key
+from typing import Dict, List, Optional, Any, Tuple
+from dotenv import set_key, unset_key
 
 from .logger import logger
 from .utils import (
     get_active_project_path,
     generate_secure_password,
-    generate_jwt_secret
+    generate_jwt_secret,
+    _atomic_write_bytes
 )
 
+# Líneas KEY=VALUE de un .env; MULTILINE permite recorrer el archivo entero
+# con finditer (los comentarios nunca coinciden: una clave no empieza con #)
+_ENV_LINE_RE = re.compile(r'^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t]*$', re.MULTILINE)
+
+# Claves cuyo valor se oculta en show_config ('api_key' ya queda cubierto por 'key')
+_SECRET_KEY_RE = re.compile(r'password|secret|key|token', re.IGNORECASE)
+
 
 class EnvManager:
     """Manager para archivos .env"""
@@ -32,40 +40,54 @@ class EnvManager:
         else:
             self.env_path = Path(env_path)
 
+        # Cache del .env parseado: (mtime_ns, size, variables)
+        self._cache: Optional[Tuple[int, int, Dict[str, str]]] = None
+
     def load(self) -> Dict[str, str]:
         """
         Carga variables desde el archivo .env
 
+        El resultado se cachea mientras el archivo no cambie (mtime y tamaño),
+        por lo que el dict retornado es compartido y no debe modificarse.
+
         Returns:
             Dict con todas las variables de entorno
         """
-        if not self.env_path.exists():
+        try:
+            st = self.env_path.stat()
+        except FileNotFoundError:
             logger.log_warning(f".env file not found at {self.env_path}")
             return {}
 
-        # Cargar en ambiente
-        load_dotenv(self.env_path)
-
-        # Parsear manualmente para retornar dict
-        env_vars = {}
-        with open(self.env_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                # Ignorar comentarios y líneas vacías
-                if not line or line.startswith('#'):
-                    continue
-
-                # Parsear KEY=VALUE
-                match = re.match(r'^([A-Za-z_][A-Za-z0-9_]*)=(.*)$', line)
-                if match:
-                    key, value = match.groups()
-                    # Remover comillas si existen
-                    value = value.strip('"').strip("'")
-                    env_vars[key] = value
+        cache = self._cache
+        if cache and cache[0] == st.st_mtime_ns and cache[1] == st.st_size:
+            return cache[2]
+
+        # Parsear todo el archivo en una sola pasada del motor de regex
+        text = self.env_path.read_text(encoding='utf-8')
+        env_vars = {
+            match.group(1): _strip_quotes(match.group(2))
+            for match in _ENV_LINE_RE.finditer(text)
+        }
 
         logger.log_debug(f"Loaded {len(env_vars)} variables from {self.env_path}")
+        self._cache = (st.st_mtime_ns, st.st_size, env_vars)
         return env_vars
 
+    def snapshot(self) -> Dict[str, str]:
+        """
+        Obtiene una copia de las variables actuales para reutilizarla en
+        varias consultas (get, validate_required, get_database_config...)
+
+        Returns:
+            Dict independiente del cache interno
+        """
+        return dict(self.load())
+
+    def _invalidate(self):
+        """Descarta el .env cacheado tras una escritura"""
+        self._cache = None
+
     def create_from_template(self, template_path: Path, replacements: Dict[str, str]):
         """
         Crea un archivo .env desde un template
@@ -95,6 +117,7 @@ class EnvManager:
         with open(self.env_path, 'w', encoding='utf-8') as f:
             f.write(content)
 
+        self._invalidate()
         logger.success(f".env created at {self.env_path}")
 
     def set(self, key: str, value: str):
@@ -112,20 +135,28 @@ class EnvManager:
 
         # Usar dotenv set_key
         set_key(str(self.env_path), key, value)
+        self._invalidate()
         logger.log_debug(f"Set {key} in {self.env_path}")
 
-    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+    def get(
+        self,
+        key: str,
+        default: Optional[str] = None,
+        env_vars: Optional[Dict[str, str]] = None
+    ) -> Optional[str]:
         """
         Obtiene el valor de una variable
 
         Args:
             key: Nombre de la variable
             default: Valor por defecto si no existe
+            env_vars: Variables ya cargadas (snapshot). Si es None, usa load()
 
         Returns:
             Valor de la variable o default
         """
-        env_vars = self.load()
+        if env_vars is None:
+            env_vars = self.load()
         return env_vars.get(key, default)
 
     def delete(self, key: str):
@@ -139,18 +170,47 @@ class EnvManager:
             return
 
         unset_key(str(self.env_path), key)
+        self._invalidate()
         logger.log_debug(f"Deleted {key} from {self.env_path}")
 
     def update_multiple(self, variables: Dict[str, str]):
         """
         Actualiza múltiples variables a la vez
 
+        Reescribe el archivo una sola vez: las claves existentes se
+        reemplazan en su línea (conservando comentarios y orden) y las
+        nuevas se agregan al final.
+
         Args:
             variables: Dict con las variables a actualizar
         """
-        for key, value in variables.items():
-            self.set(key, value)
+        formatted = {key: _format_env_line(key, str(value)) for key, value in variables.items()}
+
+        try:
+            lines = self.env_path.read_text(encoding='utf-8').splitlines(keepends=True)
+        except FileNotFoundError:
+            lines = []
+
+        # Se reemplazan todas las apariciones de una clave, como set_key
+        # (load() se queda con la última)
+        out = []
+        seen = set()
+        for line in lines:
+            match = _ENV_LINE_RE.match(line)
+            if match and match.group(1) in formatted:
+                out.append(formatted[match.group(1)])
+                seen.add(match.group(1))
+            else:
+                out.append(line)
+
+        if out and not out[-1].endswith('\n'):
+            out[-1] += '\n'
+        out.extend(line for key, line in formatted.items() if key not in seen)
 
+        # Escritura atómica (temporal único + os.replace, conserva los permisos)
+        _atomic_write_bytes(self.env_path, ''.join(out).encode('utf-8'))
+
+        self._invalidate()
         logger.log_info(f"Updated {len(variables)} variables in .env")
 
     def generate_laravel_keys(self) -> Dict[str, str]:
@@ -189,17 +249,23 @@ class EnvManager:
         logger.success("SpringBoot keys generated")
         return keys
 
-    def validate_required(self, required_vars: List[str]) -> tuple[bool, List[str]]:
+    def validate_required(
+        self,
+        required_vars: List[str],
+        env_vars: Optional[Dict[str, str]] = None
+    ) -> tuple[bool, List[str]]:
         """
         Valida que existan las variables requeridas
 
         Args:
             required_vars: Lista de variables requeridas
+            env_vars: Variables ya cargadas (snapshot). Si es None, usa load()
 
         Returns:
             Tupla (all_present, missing_vars)
         """
-        env_vars = self.load()
+        if env_vars is None:
+            env_vars = self.load()
         missing = []
 
         for var in required_vars:
@@ -273,45 +339,68 @@ class EnvManager:
 
         import shutil
         shutil.copy2(backup_path, self.env_path)
+        self._invalidate()
         logger.success(f".env restored from {backup_path}")
 
     def exists(self) -> bool:
         """Verifica si el archivo .env existe"""
         return self.env_path.exists()
 
-    def show_config(self, hide_secrets: bool = True):
+    def has_key(self, key: str) -> bool:
+        """
+        Verifica si una variable está definida sin parsear todo el .env
+
+        Args:
+            key: Nombre de la variable
+
+        Returns:
+            True en la primera línea KEY=... encontrada
+        """
+        try:
+            with open(self.env_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.lstrip()
+                    if line.startswith(key) and line[len(key):].lstrip(' \t').startswith('='):
+                        return True
+        except FileNotFoundError:
+            pass
+        return False
+
+    def show_config(self, hide_secrets: bool = True, env_vars: Optional[Dict[str, str]] = None):
         """
         Muestra la configuración actual de forma legible
 
         Args:
             hide_secrets: Si es True, oculta passwords y secrets
+            env_vars: Variables ya cargadas (snapshot). Si es None, usa load()
         """
-        env_vars = self.load()
+        if env_vars is None:
+            env_vars = self.load()
 
         if not env_vars:
             logger.warning("No .env file found or empty")
             return
 
         # Ocultar secrets si es necesario
-        display_vars = {}
-        secret_keywords = ['password', 'secret', 'key', 'token', 'api_key']
-
-        for key, value in env_vars.items():
-            if hide_secrets and any(keyword in key.lower() for keyword in secret_keywords):
-                display_vars[key] = "********"
-            else:
-                display_vars[key] = value
+        display_vars = {
+            key: "********" if hide_secrets and _SECRET_KEY_RE.search(key) else value
+            for key, value in env_vars.items()
+        }
 
         logger.print_config(display_vars, f"Environment Variables ({self.env_path.name})")
 
-    def get_database_config(self) -> Dict[str, str]:
+    def get_database_config(self, env_vars: Optional[Dict[str, str]] = None) -> Dict[str, str]:
         """
         Extrae la configuración de base de datos del .env
 
+        Args:
+            env_vars: Variables ya cargadas (snapshot). Si es None, usa load()
+
         Returns:
             Dict con configuración de DB
         """
-        env_vars = self.load()
+        if env_vars is None:
+            env_vars = self.load()
 
         db_config = {
             'host': env_vars.get('DB_HOST', 'localhost'),
@@ -334,6 +423,7 @@ class EnvManager:
 
         import shutil
         shutil.copy2(example_path, self.env_path)
+        self._invalidate()
         logger.success(f"Copied .env.example to .env")
         return True
 
@@ -344,7 +434,8 @@ def create_env_from_config(
     domain: str,
     stack: str,
     db_config: Dict[str, str],
-    ports: Dict[str, int]
+    ports: Dict[str, int],
+    credentials: Optional[Dict[str, Optional[str]]] = None
 ) -> EnvManager:
     """
     Helper function para crear un .env desde configuración del proyecto
@@ -356,11 +447,13 @@ def create_env_from_config(
         stack: Stack tecnológico
         db_config: Configuración de base de datos
         ports: Puertos asignados
+        credentials: Claves derivadas (app_key, jwt_secret). Si es None, se generan
 
     Returns:
         EnvManager configurado
     """
     manager = EnvManager(env_path)
+    credentials = credentials or {}
 
     # Determinar valores base
     base_vars = {
@@ -378,8 +471,8 @@ def create_env_from_config(
     # Agregar variables específicas del stack
     if stack == 'laravel-vue':
         base_vars.update({
-            'APP_KEY': f'base64:{generate_jwt_secret(32)}',
-            'JWT_SECRET': generate_jwt_secret(64),
+            'APP_KEY': credentials.get('app_key') or f'base64:{generate_jwt_secret(32)}',
+            'JWT_SECRET': credentials.get('jwt_secret') or generate_jwt_secret(64),
             'DB_CONNECTION': 'mysql',
             'CACHE_DRIVER': 'redis',
             'SESSION_DRIVER': 'redis',
@@ -394,7 +487,7 @@ def create_env_from_config(
             'SPRING_DATASOURCE_USERNAME': base_vars['DB_USERNAME'],
             'SPRING_DATASOURCE_PASSWORD': base_vars['DB_PASSWORD'],
             'SERVER_PORT': str(ports.get('backend', 8080)),
-            'JWT_SECRET': generate_jwt_secret(64),
+            'JWT_SECRET': credentials.get('jwt_secret') or generate_jwt_secret(64),
         })
 
     # Crear archivo .env con todas las variables
@@ -402,3 +495,16 @@ def create_env_from_config(
 
     logger.success(f".env created with {len(base_vars)} variables")
     return manager
+
+
+def _strip_quotes(value: str) -> str:
+    """Remueve un par de comillas que abre y cierra el valor"""
+    if len(value) >= 2 and value[0] in '"\'' and value[-1] == value[0]:
+        return value[1:-1]
+    return value
+
+
+def _format_env_line(key: str, value: str) -> str:
+    """Formatea KEY='value' con el mismo escapado que dotenv.set_key"""
+    escaped = value.replace('\\', '\\\\').replace("'", "\\'")
+    return f"{key}='{escaped}'\n"
@@ -38,6 +38,10 @@ class GitManager:
         """
         self.repo_path = Path(repo_path) if repo_path else None
         self.repo = None
+        # Valores derivados de HEAD: (token de invalidación, {nombre: valor})
+        self._head_cache: Optional[Tuple[tuple, Dict]] = None
+        # URLs de remotos (estáticas mientras el repo está cargado)
+        self._remote_urls: Dict[str, str] = {}
 
         if self.repo_path and self.repo_path.exists():
             try:
@@ -50,16 +54,22 @@ class GitManager:
         repo_url: str,
         destination: Path,
         branch: str = "main",
-        depth: Optional[int] = None
+        depth: Optional[int] = 1,
+        filter_spec: Optional[str] = None
     ) -> bool:
         """
         Clona un repositorio
 
+        Por defecto es un clone superficial de un solo branch: LDM solo
+        necesita el último commit para construir.
+
         Args:
             repo_url: URL del repositorio
             destination: Path de destino
             branch: Branch a clonar (default: main)
-            depth: Profundidad del clone (None = completo)
+            depth: Profundidad del clone (default: 1, None = completo)
+            filter_spec: Filtro de partial clone (ej: 'blob:none'); requiere
+                git >= 2.27 y un remoto que lo soporte
 
         Returns:
             True si exitoso, False si falla
@@ -80,6 +90,10 @@ class GitManager:
 
             if depth:
                 clone_kwargs['depth'] = depth
+                clone_kwargs['single_branch'] = True
+
+            if filter_spec:
+                clone_kwargs['filter'] = filter_spec
 
             # Clonar
             with logger.spinner(f"Cloning {repo_url}"):
@@ -90,6 +104,8 @@ class GitManager:
                 )
 
             self.repo_path = destination
+            self._head_cache = None
+            self._remote_urls = {}
             logger.success(f"Repository cloned successfully to {destination}")
             return True
 
@@ -124,9 +140,13 @@ class GitManager:
 
             logger.step(f"Pulling changes from {remote}/{target_branch}")
 
+            if self.is_shallow():
+                return self._pull_shallow(remote, target_branch)
+
             # Hacer pull
             with logger.spinner(f"Pulling from {remote}"):
                 pull_info = self.repo.remotes[remote].pull(target_branch)
+            self._head_cache = None
 
             # Verificar resultado
             if pull_info:
@@ -152,6 +172,71 @@ class GitManager:
             logger.log_exception(e)
             return False
 
+    def is_shallow(self) -> bool:
+        """
+        Verifica si el repositorio es un clone superficial
+
+        Returns:
+            True si el repositorio tiene historial truncado
+        """
+        if not self.repo:
+            return False
+
+        return os.path.exists(os.path.join(self.repo.git_dir, 'shallow'))
+
+    def _pull_shallow(self, remote: str, branch: str) -> bool:
+        """
+        Actualiza un clone superficial con fast-forward al último commit del remoto
+
+        El fetch sin --depth solo descarga los commits nuevos y mantiene el
+        historial conectado con el límite superficial existente, lo que
+        permite un merge --ff-only. Nunca descarta trabajo local: falla si
+        hay cambios sin commitear, commits sin pushear o si se pide un
+        branch distinto al actual.
+
+        Args:
+            remote: Nombre del remoto
+            branch: Branch a actualizar
+
+        Returns:
+            True si exitoso, False si falla
+        """
+        current_branch = self.repo.active_branch.name
+        if branch != current_branch:
+            logger.error(
+                f"Cannot pull {remote}/{branch} into '{current_branch}' on a shallow clone; "
+                f"checkout '{branch}' first"
+            )
+            return False
+
+        if self.repo.is_dirty():
+            logger.error("Repository has uncommitted changes; commit or stash them before pulling")
+            return False
+
+        old_commit = self.get_current_commit()
+
+        with logger.spinner(f"Fetching from {remote}"):
+            self.repo.git.fetch(remote, branch)
+
+        ahead = int(self.repo.git.rev_list('--count', 'FETCH_HEAD..HEAD'))
+        if ahead:
+            logger.error(
+                f"Local branch has {ahead} commit(s) not on {remote}/{branch}; "
+                "push them before pulling"
+            )
+            return False
+
+        self.repo.git.merge('--ff-only', 'FETCH_HEAD')
+        self._head_cache = None
+
+        new_commit = self.get_current_commit()
+        if new_commit == old_commit:
+            logger.info("Already up to date")
+        else:
+            logger.success(f"Pull completed: {new_commit}")
+
+        return True
+
     def get_current_commit(self) -> Optional[str]:
         """
         Obtiene el hash del commit actual
@@ -163,7 +248,7 @@ class GitManager:
             return None
 
         try:
-            return str(self.repo.head.commit.hexsha)
+            return self._head_cached('commit', lambda: str(self.repo.head.commit.hexsha))
         except Exception as e:
             logger.log_error(f"Error getting current commit: {str(e)}")
             return None
@@ -192,17 +277,10 @@ class GitManager:
             return None
 
         try:
-            commit = self.repo.head.commit if not commit_hash else self.repo.commit(commit_hash)
-
-            return {
-                'hash': str(commit.hexsha),
-                'hash_short': str(commit.hexsha)[:7],
-                'author': str(commit.author),
-                'author_email': commit.author.email,
-                'date': commit.committed_datetime,
-                'message': commit.message.strip(),
-                'summary': commit.summary,
-            }
+            if not commit_hash:
+                return dict(self._head_cached('commit_info', lambda: _commit_to_dict(self.repo.head.commit)))
+
+            return _commit_to_dict(self.repo.commit(commit_hash))
 
         except Exception as e:
             logger.log_error(f"Error getting commit info: {str(e)}")
@@ -251,7 +329,7 @@ class GitManager:
             return None
 
         try:
-            return str(self.repo.active_branch.name)
+            return self._head_cached('branch', lambda: str(self.repo.active_branch.name))
         except Exception as e:
             logger.log_error(f"Error getting current branch: {str(e)}")
             return None
@@ -278,6 +356,7 @@ class GitManager:
 
             logger.step(f"Checking out branch: {branch}")
             self.repo.heads[branch].checkout()
+            self._head_cache = None
             logger.success(f"Now on branch: {branch}")
             return True
 
@@ -312,10 +391,12 @@ class GitManager:
             return {'modified': [], 'added': [], 'deleted': [], 'untracked': []}
 
         try:
+            # Un solo diff index-HEAD para 'added' y 'deleted'
+            head_diff = self.repo.index.diff('HEAD')
             changes = {
                 'modified': [item.a_path for item in self.repo.index.diff(None)],
-                'added': [item.a_path for item in self.repo.index.diff('HEAD').iter_change_type('A')],
-                'deleted': [item.a_path for item in self.repo.index.diff('HEAD').iter_change_type('D')],
+                'added': [item.a_path for item in head_diff.iter_change_type('A')],
+                'deleted': [item.a_path for item in head_diff.iter_change_type('D')],
                 'untracked': self.repo.untracked_files
             }
             return changes
@@ -337,8 +418,13 @@ class GitManager:
         if not self.repo:
             return None
 
+        url = self._remote_urls.get(remote)
+        if url is not None:
+            return url
+
         try:
-            return str(self.repo.remotes[remote].url)
+            url = self._remote_urls[remote] = str(self.repo.remotes[remote].url)
+            return url
         except Exception:
             return None
 
@@ -414,6 +500,7 @@ class GitManager:
         try:
             logger.warning(f"DESTRUCTIVE: Resetting hard to {commit}")
             self.repo.head.reset(commit, index=True, working_tree=True)
+            self._head_cache = None
             logger.success(f"Reset to {commit}")
             return True
 
@@ -486,9 +573,77 @@ class GitManager:
         """Verifica si el repositorio existe"""
         return self.repo is not None
 
+    def _head_token(self) -> Optional[tuple]:
+        """
+        Token barato que cambia cuando HEAD apunta a otro commit o branch
+
+        Combina el contenido de .git/HEAD con el mtime de la ref a la que
+        apunta y de packed-refs (un commit actualiza la ref, no HEAD).
+
+        Returns:
+            Tupla comparable o None si no se puede leer HEAD
+        """
+        git_dir = self.repo.git_dir
+        try:
+            with open(os.path.join(git_dir, 'HEAD'), 'r', encoding='utf-8') as f:
+                head = f.read().strip()
+        except OSError:
+            return None
+
+        common_dir = getattr(self.repo, 'common_dir', git_dir)
+        ref_mtime = 0
+        if head.startswith('ref: '):
+            ref_mtime = _mtime_ns(os.path.join(common_dir, head[5:]))
+
+        return (head, ref_mtime, _mtime_ns(os.path.join(common_dir, 'packed-refs')))
+
+    def _head_cached(self, name: str, compute):
+        """
+        Retorna un valor derivado de HEAD, recalculándolo solo si HEAD cambió
+
+        Args:
+            name: Clave del valor en el cache
+            compute: Función que calcula el valor
+
+        Returns:
+            Valor cacheado o recién calculado
+        """
+        token = self._head_token()
+        if token is None:
+            return compute()
+
+        if self._head_cache is None or self._head_cache[0] != token:
+            self._head_cache = (token, {})
+
+        values = self._head_cache[1]
+        if name not in values:
+            values[name] = compute()
+        return values[name]
+
 
 # Helper functions
 
+def _mtime_ns(path: str) -> int:
+    """mtime en ns de un archivo, 0 si no existe"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _commit_to_dict(commit) -> Dict:
+    """Convierte un commit de GitPython al dict de get_commit_info"""
+    return {
+        'hash': str(commit.hexsha),
+        'hash_short': str(commit.hexsha)[:7],
+        'author': str(commit.author),
+        'author_email': commit.author.email,
+        'date': commit.committed_datetime,
+        'message': commit.message.strip(),
+        'summary': commit.summary,
+    }
+
+
 def clone_repository(url: str, destination: Path, branch: str = "main") -> Optional[GitManager]:
     """
     Helper para clonar un repositorio
@@ -3,9 +3,8 @@ Gestión de historial de deploys
 Registra y muestra información de deploys realizados
 """
 
-import json
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 
 from .logger import logger
@@ -166,6 +165,22 @@ class HistoryManager:
         history = self.load_history()
         return sum(1 for d in history if not d.get('success', False))
 
+    def counts(self, history: Optional[List[Dict]] = None) -> Tuple[int, int, int]:
+        """
+        Cuenta deploys totales, exitosos y fallidos en una sola pasada
+
+        Args:
+            history: Historial ya cargado (None = leer del archivo)
+
+        Returns:
+            Tupla (total, exitosos, fallidos)
+        """
+        if history is None:
+            history = self.load_history()
+
+        successful = sum(1 for d in history if d.get('success', False))
+        return len(history), successful, len(history) - successful
+
     def cleanup_old_entries(self, keep_count: int = 50) -> int:
         """
         Elimina entradas antiguas del historial
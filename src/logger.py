@@ -3,17 +3,20 @@ Sistema de logging para LDM
 Maneja tanto output de consola (Rich) como logs a archivo
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
 
 from rich.console import Console
 from rich.logging import RichHandler
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 from rich.panel import Panel
-from rich.table import Table
 from rich import print as rprint
 
 
@@ -52,6 +55,15 @@ class LDMLogger:
         file_handler.setFormatter(file_formatter)
         file_handler.setLevel(getattr(logging, level))
 
+        # La escritura al archivo ocurre en un hilo aparte: el hilo que loguea
+        # solo encola el registro
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setLevel(getattr(logging, level))
+        self._listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+        self._listener.start()
+        atexit.register(self._listener.stop)
+
         # Handler para consola con Rich
         console_handler = RichHandler(
             console=self.console,
@@ -61,10 +73,11 @@ class LDMLogger:
         )
         console_handler.setLevel(logging.WARNING)  # Solo warnings y errores en consola
 
-        # Configurar logger root
+        # Configurar logger root; con el nivel del handler más verboso, las
+        # llamadas por debajo se descartan sin crear el LogRecord
         root_logger = logging.getLogger()
-        root_logger.setLevel(logging.DEBUG)
-        root_logger.addHandler(file_handler)
+        root_logger.setLevel(min(getattr(logging, level), logging.WARNING))
+        root_logger.addHandler(queue_handler)
         root_logger.addHandler(console_handler)
 
         # Logger específico para LDM
@@ -92,6 +105,19 @@ class LDMLogger:
         self.console.print(f"[blue]ℹ[/blue]  {message}")
         self.logger.info(message)
 
+    def info_block(self, messages: list):
+        """
+        Varios mensajes informativos en una sola escritura a consola
+
+        Equivale a llamar info() por cada mensaje, pero Rich renderiza y
+        mide el ancho de la terminal una sola vez.
+        """
+        if not messages:
+            return
+        self.console.print("\n".join(f"[blue]ℹ[/blue]  {message}" for message in messages))
+        for message in messages:
+            self.logger.info(message)
+
     def step(self, message: str):
         """Paso en un proceso"""
         self.console.print(f"[cyan]▶[/cyan] {message}", style="cyan")
@@ -110,6 +136,8 @@ class LDMLogger:
 
     def table(self, title: str, columns: list, rows: list):
         """Muestra una tabla"""
+        from rich.table import Table
+
         table = Table(title=title, show_header=True, header_style="bold cyan")
 
         for col in columns:
@@ -122,6 +150,8 @@ class LDMLogger:
 
     def progress(self, description: str = "Working..."):
         """Crea una barra de progreso"""
+        from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+
         return Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -131,22 +161,31 @@ class LDMLogger:
         )
 
     def spinner(self, text: str):
-        """Spinner simple para tareas sin progreso conocido"""
+        """
+        Spinner simple para tareas sin progreso conocido
+
+        Rich solo admite un display en vivo a la vez, así que desde hilos
+        secundarios (tareas en paralelo) se devuelve un contexto vacío.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return nullcontext()
         return self.console.status(f"[cyan]{text}...", spinner="dots")
 
     def print(self, *args, **kwargs):
         """Print directo a consola"""
         self.console.print(*args, **kwargs)
 
-    def print_config(self, config: dict, title: str = "Configuration"):
-        """Imprime configuración de forma legible"""
+    def print_config(self, config: dict, title: str = "Configuration", mask_secrets: bool = True):
+        """Imprime configuración de forma legible (mask_secrets=False muestra passwords y secrets)"""
+        from rich.table import Table
+
         table = Table(title=title, show_header=True, header_style="bold cyan")
         table.add_column("Key", style="yellow")
-        table.add_column("Value", style="green")
+        table.add_column("Value", style="green", overflow="fold")
 
         for key, value in config.items():
             # Ocultar passwords
-            if 'password' in key.lower() or 'secret' in key.lower():
+            if mask_secrets and ('password' in key.lower() or 'secret' in key.lower()):
                 value = "********"
             table.add_row(str(key), str(value))
 
@@ -154,6 +193,8 @@ class LDMLogger:
 
     def print_services_status(self, services: dict):
         """Imprime estado de servicios Docker"""
+        from rich.table import Table
+
         table = Table(title="Services Status", show_header=True, header_style="bold cyan")
         table.add_column("Service", style="yellow")
         table.add_column("Status", style="white")
@@ -193,21 +234,30 @@ class LDMLogger:
 
     # === Logging a archivo ===
 
-    def log_debug(self, message: str):
-        """Log debug (solo a archivo)"""
-        self.logger.debug(message)
+    def log_debug(self, message: str, *args):
+        """Log debug (solo a archivo); args se formatean con % solo si se emite"""
+        self.logger.debug(message, *args)
 
-    def log_info(self, message: str):
+    def log_info(self, message: str, *args):
         """Log info (solo a archivo)"""
-        self.logger.info(message)
+        self.logger.info(message, *args)
 
-    def log_warning(self, message: str):
+    def log_warning(self, message: str, *args):
         """Log warning"""
-        self.logger.warning(message)
+        self.logger.warning(message, *args)
 
-    def log_error(self, message: str):
+    def log_error(self, message: str, *args):
         """Log error"""
-        self.logger.error(message)
+        self.logger.error(message, *args)
+
+    def is_debug_enabled(self) -> bool:
+        """True si los mensajes de debug llegan a algún handler"""
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def flush(self):
+        """Escribe al archivo los registros aún encolados (antes de un exec)"""
+        self._listener.stop()
+        self._listener.start()
 
     def log_exception(self, exc: Exception):
         """Log excepción con traceback"""
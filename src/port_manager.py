@@ -5,10 +5,18 @@ Detecta puertos ocupados, sugiere alternativas, verifica disponibilidad
 
 import socket
 import psutil
+from types import MappingProxyType
 from typing import List, Dict, Tuple, Optional
 
 from .logger import logger
 
+# Puertos por defecto de cada stack (solo lectura; get_default_ports devuelve copias)
+_BASE_PORTS = {'http': 80, 'https': 443}
+_DEFAULT_PORTS = MappingProxyType({
+    'laravel-vue': MappingProxyType({**_BASE_PORTS, 'mysql': 3306, 'redis': 6379}),
+    'springboot-vue': MappingProxyType({**_BASE_PORTS, 'postgres': 5432, 'redis': 6379, 'backend': 8080}),
+})
+
 
 class PortManager:
     """Manager para verificación y gestión de puertos"""
@@ -47,24 +55,56 @@ class PortManager:
         Returns:
             Dict con info del proceso o None si no hay proceso
         """
+        return self.get_processes_using_ports([port]).get(port)
+
+    def get_processes_using_ports(self, ports: List[int]) -> Dict[int, Dict[str, any]]:
+        """
+        Obtiene los procesos que usan varios puertos con un solo escaneo
+
+        psutil.net_connections() recorre toda la tabla de conexiones del
+        sistema, así que se llama una vez para todos los puertos.
+
+        Args:
+            ports: Puertos a verificar
+
+        Returns:
+            Dict {puerto: info del proceso} solo con los puertos en uso
+        """
+        wanted = set(ports)
+        results = {}
+
+        if not wanted:
+            return results
+
         for conn in psutil.net_connections(kind='inet'):
-            if conn.laddr.port == port:
-                try:
-                    process = psutil.Process(conn.pid)
-                    return {
-                        'pid': conn.pid,
-                        'name': process.name(),
-                        'cmdline': ' '.join(process.cmdline()),
-                        'status': conn.status,
-                    }
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    return {
-                        'pid': conn.pid,
-                        'name': 'Unknown',
-                        'cmdline': 'Access Denied',
-                        'status': conn.status,
-                    }
-        return None
+            port = conn.laddr.port if conn.laddr else None
+            if port not in wanted or port in results:
+                continue
+
+            try:
+                # Sin permisos psutil reporta pid None; Process(None) sería
+                # el proceso actual
+                if conn.pid is None:
+                    raise psutil.AccessDenied()
+                process = psutil.Process(conn.pid)
+                results[port] = {
+                    'pid': conn.pid,
+                    'name': process.name(),
+                    'cmdline': ' '.join(process.cmdline()),
+                    'status': conn.status,
+                }
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                results[port] = {
+                    'pid': conn.pid,
+                    'name': 'Unknown',
+                    'cmdline': 'Access Denied',
+                    'status': conn.status,
+                }
+
+            if len(results) == len(wanted):
+                break
+
+        return results
 
     def check_ports(self, ports: List[int]) -> Dict[int, Dict[str, any]]:
         """
@@ -80,18 +120,15 @@ class PortManager:
                 443: {'available': True, 'process': None}
             }
         """
-        results = {}
-
-        for port in ports:
-            available = self.is_port_available(port)
-            process_info = None if available else self.get_process_using_port(port)
+        availability = {port: self.is_port_available(port) for port in ports}
+        processes = self.get_processes_using_ports(
+            [port for port, available in availability.items() if not available]
+        )
 
-            results[port] = {
-                'available': available,
-                'process': process_info
-            }
-
-        return results
+        return {
+            port: {'available': available, 'process': processes.get(port)}
+            for port, available in availability.items()
+        }
 
     def suggest_alternative_port(self, desired_port: int, max_attempts: int = 10) -> Optional[int]:
         """
@@ -143,22 +180,9 @@ class PortManager:
             stack: 'laravel-vue' o 'springboot-vue'
 
         Returns:
-            Dict con puertos por defecto
+            Dict con puertos por defecto (copia, el llamador puede modificarla)
         """
-        base_ports = {
-            'http': 80,
-            'https': 443,
-        }
-
-        if stack == 'laravel-vue':
-            base_ports['mysql'] = 3306
-            base_ports['redis'] = 6379
-        elif stack == 'springboot-vue':
-            base_ports['postgres'] = 5432
-            base_ports['redis'] = 6379
-            base_ports['backend'] = 8080
-
-        return base_ports
+        return dict(_DEFAULT_PORTS.get(stack, _BASE_PORTS))
 
     def check_and_suggest_ports(self, desired_ports: Dict[str, int]) -> Tuple[Dict[str, int], List[str]]:
         """
@@ -197,24 +221,21 @@ class PortManager:
 
         return final_ports, warnings
 
-    def display_port_status(self, ports: Dict[str, int]):
+    def display_port_status(self, ports: Dict[str, int]) -> Dict[str, bool]:
         """
         Muestra el estado de puertos en una tabla
 
         Args:
             ports: Dict con puertos a verificar {'service': port}
-        """
-        port_status = {}
 
-        for service, port in ports.items():
-            available = self.is_port_available(port)
-            process = self.get_process_using_port(port) if not available else None
-
-            port_status[service] = {
-                'port': port,
-                'available': available,
-                'process': process
-            }
+        Returns:
+            Dict {'service': disponible} para reutilizar sin volver a verificar
+        """
+        checked = self.check_ports(list(ports.values()))
+        port_status = {
+            service: {'port': port, **checked[port]}
+            for service, port in ports.items()
+        }
 
         # Crear tabla
         from rich.table import Table
@@ -238,6 +259,8 @@ class PortManager:
 
         logger.console.print(table)
 
+        return {service: info['available'] for service, info in port_status.items()}
+
     def get_common_service_ports(self) -> Dict[str, int]:
         """
         Retorna puertos comunes de servicios conocidos
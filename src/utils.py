@@ -4,12 +4,36 @@ Utilidades generales para LDM
 
 import os
 import sys
+import base64
+import copy
 import json
+import errno
+import functools
+import hashlib
+import shutil
+import stat
 import platform
+import subprocess
+import tempfile
 import secrets
 import string
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; se usa json estándar
+    orjson = None
+
+# Cache de la configuración global ya validada (ver load_config_cached)
+CONFIG_CACHE_NAME = ".config.cache.json"
+
+# Clave maestra del proyecto (las credenciales se derivan de ella)
+CREDENTIALS_FILE_NAME = ".credentials.json"
+
+
+class NoActiveProject(Exception):
+    """No hay proyecto activo (falta .project-config.json)"""
 
 
 def get_base_path() -> Path:
@@ -42,37 +66,157 @@ def get_os_name() -> str:
     return platform.system()
 
 
-def generate_secure_password(length: int = 32) -> str:
-    """Genera una contraseña segura"""
+def generate_secure_password(length: int = 32, entropy: Optional[bytes] = None) -> str:
+    """
+    Genera una contraseña segura
+
+    Args:
+        length: Longitud de la contraseña
+        entropy: Bytes aleatorios precalculados (opcional)
+
+    Returns:
+        Contraseña generada
+    """
     alphabet = string.ascii_letters + string.digits + string.punctuation
     # Evitar caracteres que puedan causar problemas en shells
     alphabet = alphabet.replace("'", "").replace('"', "").replace("\\", "").replace("`", "")
-    return ''.join(secrets.choice(alphabet) for _ in range(length))
+    return _choose_from_entropy(alphabet, length, entropy)
+
 
+def generate_jwt_secret(length: int = 64, entropy: Optional[bytes] = None) -> str:
+    """
+    Genera un JWT secret
+
+    Args:
+        length: Longitud del secret
+        entropy: Bytes aleatorios precalculados (opcional)
 
-def generate_jwt_secret(length: int = 64) -> str:
-    """Genera un JWT secret"""
+    Returns:
+        Secret alfanumérico
+    """
     alphabet = string.ascii_letters + string.digits
-    return ''.join(secrets.choice(alphabet) for _ in range(length))
+    return _choose_from_entropy(alphabet, length, entropy)
+
+
+def derive_secret(master: bytes, purpose: str, nbytes: int) -> bytes:
+    """
+    Deriva bytes para un propósito a partir de la clave maestra del proyecto
+
+    BLAKE2b con clave (la maestra) sobre el propósito y un contador, en
+    bloques de 64 bytes, de modo que se puede pedir cualquier longitud.
+
+    Args:
+        master: Clave maestra
+        purpose: Nombre del secreto (ej: 'db_password')
+        nbytes: Cantidad de bytes a derivar
+
+    Returns:
+        Bytes derivados
+    """
+    blocks = []
+    for counter in range((nbytes + 63) // 64):
+        blocks.append(
+            hashlib.blake2b(f"{purpose}:{counter}".encode(), key=master).digest()
+        )
+    return b''.join(blocks)[:nbytes]
+
+
+def derive_credentials(master_hex: str, stack: str, key_version: int = 0) -> Dict[str, Optional[str]]:
+    """
+    Obtiene las credenciales del proyecto derivándolas de la clave maestra
+
+    Las contraseñas de base de datos dependen solo de la maestra (ya están
+    grabadas en el volumen de datos); APP_KEY y JWT_SECRET dependen además
+    de key_version, que `ldm config regen-keys` incrementa para rotarlas.
+
+    Args:
+        master_hex: Clave maestra en hexadecimal (de .credentials.json)
+        stack: Stack del proyecto
+        key_version: Versión de las claves rotables (0 = las de init)
+
+    Returns:
+        Diccionario con app_key, jwt_secret, db_root_password,
+        db_password y encryption_key
+    """
+    master = bytes.fromhex(master_hex)
+    suffix = f"@{key_version}" if key_version else ""
+    return {
+        'db_password': generate_secure_password(32, entropy=derive_secret(master, 'db_password', 128)),
+        'db_root_password': generate_secure_password(32, entropy=derive_secret(master, 'db_root_password', 128)),
+        'jwt_secret': generate_jwt_secret(64, entropy=derive_secret(master, f'jwt_secret{suffix}', 128)),
+        'app_key': (
+            # Formato de Laravel: 32 bytes en base64
+            f"base64:{base64.b64encode(derive_secret(master, f'app_key{suffix}', 32)).decode()}"
+            if stack == 'laravel-vue' else None
+        ),
+        'encryption_key': (
+            generate_jwt_secret(32, entropy=derive_secret(master, 'encryption_key', 64))
+            if stack == 'springboot-vue' else None
+        ),
+    }
+
+
+def load_credentials(project_path: Path, stack: str) -> Optional[Dict[str, Any]]:
+    """
+    Obtiene las credenciales del proyecto desde .credentials.json
+
+    Con clave maestra se derivan en el momento según key_version; un
+    archivo antiguo con los valores en texto plano se retorna tal cual.
+
+    Args:
+        project_path: Path del proyecto
+        stack: Stack del proyecto
+
+    Returns:
+        Diccionario de credenciales o None si no existe el archivo
+    """
+    data = load_json_file(project_path / CREDENTIALS_FILE_NAME)
+    if data is None or 'master' not in data:
+        return data
+
+    credentials = derive_credentials(data['master'], stack, data.get('key_version', 0))
+    credentials['created_at'] = data.get('created_at')
+    return credentials
 
 
 def load_json_file(file_path: Path) -> Optional[Dict[Any, Any]]:
-    """Carga un archivo JSON"""
+    """Carga un archivo JSON (orjson si está disponible)"""
     try:
-        if file_path.exists():
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        # Leer directamente en lugar de exists() + open: un syscall menos
+        data = file_path.read_bytes()
+    except (FileNotFoundError, NotADirectoryError):
         return None
     except Exception as e:
         raise Exception(f"Error loading JSON from {file_path}: {str(e)}")
 
+    try:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    except Exception as e:
+        raise Exception(f"Error loading JSON from {file_path}: {str(e)}")
+
+
+def save_json_file(file_path: Path, data: Dict[Any, Any], indent: int = 2, fsync: bool = False):
+    """
+    Guarda un archivo JSON de forma atómica
+
+    Se escribe a un archivo temporal en el mismo directorio y se renombra
+    sobre el destino, así un lector nunca ve un archivo a medio escribir.
 
-def save_json_file(file_path: Path, data: Dict[Any, Any], indent: int = 2):
-    """Guarda un archivo JSON"""
+    Args:
+        file_path: Path del archivo
+        data: Datos a guardar
+        indent: Indentación del JSON
+        fsync: Forzar el volcado a disco del archivo y su directorio
+    """
     try:
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=indent, ensure_ascii=False)
+        # orjson solo soporta indentación de 2 espacios
+        if orjson is not None and indent == 2:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            payload = json.dumps(data, indent=indent, ensure_ascii=False).encode('utf-8')
+        _atomic_write_bytes(file_path, payload, fsync=fsync)
     except Exception as e:
         raise Exception(f"Error saving JSON to {file_path}: {str(e)}")
 
@@ -96,6 +240,46 @@ def load_config() -> Dict[Any, Any]:
         return config
 
 
+def load_config_cached() -> Dict[Any, Any]:
+    """
+    Carga la configuración global reutilizando la última validación
+
+    La validación con Pydantic (y la importación de models) es lo más
+    costoso de load_config(). El resultado validado se guarda en un
+    archivo cache junto a config.json, invalidado por st_mtime_ns y
+    tamaño, de modo que los comandos posteriores solo leen JSON.
+
+    Returns:
+        Diccionario con la configuración global
+    """
+    config_path = get_base_path() / "config.json"
+    cache_path = get_base_path() / CONFIG_CACHE_NAME
+
+    try:
+        st = config_path.stat()
+    except OSError:
+        return get_default_config()
+
+    key = [st.st_mtime_ns, st.st_size]
+
+    try:
+        cached = load_json_file(cache_path)
+        if cached and cached.get('key') == key:
+            return cached['config']
+    except Exception:
+        pass
+
+    config = load_config()
+
+    # Escritura atómica: un lector concurrente nunca ve un cache a medias
+    try:
+        save_json_file(cache_path, {'key': key, 'config': config})
+    except Exception:
+        pass
+
+    return config
+
+
 def save_config(config: Dict[Any, Any]):
     """Guarda la configuración global"""
     config_path = get_base_path() / "config.json"
@@ -125,8 +309,9 @@ def get_default_config() -> Dict[str, Any]:
     }
 
 
+@functools.lru_cache(maxsize=1)
 def ensure_base_directories():
-    """Asegura que existan los directorios base"""
+    """Asegura que existan los directorios base (una vez por proceso)"""
     base_path = get_base_path()
     directories = [
         base_path,
@@ -155,12 +340,53 @@ def get_project_config() -> Optional[Dict[Any, Any]]:
     return load_json_file(config_path)
 
 
+def load_project() -> Tuple[Path, Dict[Any, Any]]:
+    """
+    Obtiene el path y la configuración del proyecto activo
+
+    Reemplaza el patrón project_exists() + get_active_project_path() +
+    get_project_config(): un único stat decide si hay proyecto, y el
+    parseo se reutiliza mientras el archivo no cambie (mtime y tamaño).
+    Cada llamada recibe una copia: los comandos modifican la configuración
+    antes de guardarla y no deben alterar la versión cacheada.
+
+    Returns:
+        Tupla (path del proyecto, configuración)
+
+    Raises:
+        NoActiveProject: Si no hay proyecto activo
+    """
+    project_path = get_active_project_path()
+    config_path = project_path / ".project-config.json"
+    try:
+        st = config_path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        raise NoActiveProject(str(config_path))
+
+    config = _read_project_config(str(config_path), st.st_mtime_ns, st.st_size)
+    return project_path, copy.deepcopy(config)
+
+
+def try_load_project_config() -> Optional[Dict[Any, Any]]:
+    """
+    Carga la configuración del proyecto activo en una sola lectura
+
+    Returns:
+        Configuración del proyecto o None si no hay proyecto activo
+    """
+    try:
+        return load_project()[1]
+    except NoActiveProject:
+        return None
+
+
 def save_project_config(config: Dict[Any, Any]):
     """Guarda la configuración del proyecto activo"""
     config_path = get_active_project_path() / ".project-config.json"
     save_json_file(config_path, config)
 
 
+@functools.lru_cache(maxsize=None)
 def command_exists(command: str) -> bool:
     """Verifica si un comando existe en el sistema"""
     from shutil import which
@@ -235,3 +461,209 @@ def normalize_project_name(name: str) -> str:
     # Solo letras, números, guiones y underscores
     normalized = re.sub(r'[^a-zA-Z0-9_-]', '_', name)
     return normalized.lower()
+
+
+def sync_tree(src: Path, dst: Path) -> int:
+    """
+    Sincroniza dst con src usando hardlinks cuando es posible
+
+    Solo se enlazan los archivos nuevos o modificados (mismo inode, o tamaño
+    y st_mtime_ns al copiar) y se eliminan los que ya no existen en src, en lugar de
+    borrar y copiar el árbol completo. Si src y dst están en distintos
+    sistemas de archivos (EXDEV) se copia con shutil.copy2.
+
+    Args:
+        src: Directorio origen
+        dst: Directorio destino
+
+    Returns:
+        Cantidad de archivos enlazados o copiados
+    """
+    use_link = True
+    updated = 0
+    stack = [(Path(src), Path(dst))]
+
+    while stack:
+        src_dir, dst_dir = stack.pop()
+
+        if dst_dir.is_symlink() or (dst_dir.exists() and not dst_dir.is_dir()):
+            dst_dir.unlink()
+        dst_dir.mkdir(parents=True, exist_ok=True)
+
+        with os.scandir(dst_dir) as it:
+            existing = {entry.name: entry for entry in it}
+
+        with os.scandir(src_dir) as it:
+            for entry in it:
+                target = dst_dir / entry.name
+                current = existing.pop(entry.name, None)
+
+                if entry.is_dir(follow_symlinks=False):
+                    if current is not None and not current.is_dir(follow_symlinks=False):
+                        os.unlink(target)
+                    stack.append((Path(entry.path), target))
+                    continue
+
+                if current is not None:
+                    if current.is_dir(follow_symlinks=False):
+                        shutil.rmtree(target)
+                    else:
+                        src_st = entry.stat(follow_symlinks=False)
+                        dst_st = current.stat(follow_symlinks=False)
+                        # Con hardlinks basta comparar el inode; relinkear es barato
+                        if os.path.samestat(src_st, dst_st) or (
+                            not use_link
+                            and src_st.st_size == dst_st.st_size
+                            and src_st.st_mtime_ns == dst_st.st_mtime_ns
+                        ):
+                            continue
+                        os.unlink(target)
+
+                if use_link:
+                    try:
+                        os.link(entry.path, target, follow_symlinks=False)
+                        updated += 1
+                        continue
+                    except OSError as e:
+                        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                            raise
+                        use_link = False
+
+                shutil.copy2(entry.path, target, follow_symlinks=False)
+                updated += 1
+
+        # Lo que queda en dst ya no existe en src
+        for name, entry in existing.items():
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+
+    return updated
+
+
+def fast_rmtree(path: Path) -> None:
+    """
+    Elimina un directorio con la herramienta nativa (rm -rf / rd /s /q)
+
+    Si el comando nativo falla, recurre a shutil.rmtree, reintentando los
+    archivos de solo lectura (habituales en .git y node_modules en Windows).
+
+    Args:
+        path: Directorio a eliminar
+    """
+    if sys.platform == 'win32':
+        cmd = ['cmd', '/c', 'rd', '/s', '/q', str(path)]
+    else:
+        cmd = ['rm', '-rf', '--', str(path)]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, check=False)
+        if result.returncode == 0 and not os.path.exists(path):
+            return
+    except OSError:
+        pass
+
+    shutil.rmtree(path, onerror=_rmtree_make_writable)
+
+
+def _choose_from_entropy(alphabet: str, length: int, entropy: Optional[bytes] = None) -> str:
+    """
+    Elige caracteres uniformemente del alfabeto a partir de bytes aleatorios
+
+    Usa muestreo por rechazo: los bytes que caen fuera del mayor múltiplo
+    del tamaño del alfabeto se descartan para no sesgar la distribución.
+    Si la entropía no alcanza: sin entropía dada se piden más bytes con
+    secrets.token_bytes; con entropía dada se extiende con BLAKE2b y un
+    contador, para que el resultado siga siendo reproducible.
+    """
+    size = len(alphabet)
+    limit = 256 - (256 % size)
+    pool = entropy if entropy is not None else secrets.token_bytes(length * 2)
+    chars = []
+    counter = 0
+
+    while True:
+        for byte in pool:
+            if byte < limit:
+                chars.append(alphabet[byte % size])
+                if len(chars) == length:
+                    return ''.join(chars)
+
+        if entropy is None:
+            pool = secrets.token_bytes(length)
+        else:
+            pool = hashlib.blake2b(entropy + counter.to_bytes(8, 'big')).digest()
+            counter += 1
+
+
+def _atomic_write_bytes(file_path: Path, data: bytes, fsync: bool = False):
+    """
+    Escribe bytes en un archivo temporal y lo renombra sobre el destino
+
+    mkstemp da un nombre único por llamada, así escrituras concurrentes
+    del mismo archivo (o un temporal huérfano de otro proceso) no chocan.
+    Si el destino ya existe se conservan sus permisos; un archivo nuevo
+    recibe 0o666 & ~umask, igual que con open(..., 'w').
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            try:
+                mode = stat.S_IMODE(os.stat(file_path).st_mode)
+            except FileNotFoundError:
+                mode = 0o666 & ~_process_umask()
+            if hasattr(os, 'fchmod'):
+                os.fchmod(f.fileno(), mode)
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if fsync and hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(file_path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+@functools.lru_cache(maxsize=1)
+def _process_umask() -> int:
+    """umask del proceso (leído una vez; os.umask solo se puede leer cambiándolo)"""
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+@functools.lru_cache(maxsize=1)
+def _read_project_config(config_path: str, mtime_ns: int, size: int) -> Dict[Any, Any]:
+    """Parsea .project-config.json; mtime_ns y size forman la clave del cache"""
+    try:
+        data = Path(config_path).read_bytes()
+    except (FileNotFoundError, NotADirectoryError):
+        raise NoActiveProject(config_path)
+
+    try:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    except Exception as e:
+        raise Exception(f"Error loading JSON from {config_path}: {str(e)}")
+
+
+def _rmtree_make_writable(func, path, exc_info):
+    """onerror de shutil.rmtree: quita el solo lectura y reintenta una vez"""
+    try:
+        os.chmod(path, stat.S_IWRITE)
+        func(path)
+    except OSError:
+        raise exc_info[1]
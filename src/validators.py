@@ -218,8 +218,10 @@ def validate_docker_compose_ports(
     try:
         import yaml
 
-        with open(compose_path, 'r') as f:
-            compose_config = yaml.safe_load(f)
+        # Loader en C (libyaml) si está disponible
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        with open(compose_path, 'rb') as f:
+            compose_config = yaml.load(f, Loader=loader)
 
         services = compose_config.get('services', {})
 
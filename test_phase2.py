@@ -3,6 +3,7 @@
 Script de prueba para funcionalidades de Fase 2
 """
 
+import os
 import sys
 from pathlib import Path
 
@@ -74,6 +75,33 @@ def test_env_manager():
     else:
         logger.error("Restore failed")
 
+    # Test 7: update_multiple reescribe una sola vez conservando el archivo
+    logger.step("Test 7: Batch update preserves comments and order")
+    (test_path / ".env").write_text("# App\nAPP_NAME=old\n\n# DB\nDB_HOST=mysql\nDB_PORT=3306")
+    manager.update_multiple({'APP_NAME': "it's new", 'DB_PORT': 3307, 'EXTRA': 'x'})
+    lines = (test_path / ".env").read_text().splitlines()
+
+    expected = ["# App", "APP_NAME='it\\'s new'", "", "# DB", "DB_HOST=mysql", "DB_PORT='3307'", "EXTRA='x'"]
+    if lines != expected:
+        raise AssertionError(f"unexpected .env after update_multiple: {lines}")
+
+    updated = manager.load()
+    if updated.get('DB_PORT') != '3307' or updated.get('DB_HOST') != 'mysql':
+        raise AssertionError(f"stale values after update_multiple: {updated}")
+    logger.success("Batch update passed")
+
+    # Test 8: claves duplicadas y permisos restrictivos
+    logger.step("Test 8: Duplicated keys and file mode")
+    (test_path / ".env").write_text("APP_KEY=first\nOTHER=1\nAPP_KEY=second\n")
+    os.chmod(test_path / ".env", 0o600)
+    manager.update_multiple({'APP_KEY': 'rotated'})
+
+    if manager.load().get('APP_KEY') != 'rotated':
+        raise AssertionError("duplicated key was not updated everywhere")
+    if os.stat(test_path / ".env").st_mode & 0o777 != 0o600:
+        raise AssertionError(".env lost its restrictive mode")
+    logger.success("Duplicated keys and file mode passed")
+
     # Limpiar
     import shutil
     shutil.rmtree(test_path)
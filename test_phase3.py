@@ -13,6 +13,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from src.git_manager import GitManager, get_repo_status
 from src.docker_manager import DockerManager, check_docker_installed, check_docker_compose_installed, get_docker_info
+from src.docker_manager import _parse_ps_output, _dependency_levels
 from src.template_manager import TemplateManager, render_project_templates
 from src.logger import logger
 
@@ -139,6 +140,44 @@ def test_docker_manager():
     logger.success("DockerManager tests completed")
 
 
+def test_compose_helpers():
+    """Prueba el parseo de `compose ps` y el orden por depends_on"""
+    logger.header("Testing Compose helpers")
+
+    # Test 1: ambos formatos de `compose ps --format json`
+    logger.step("Test 1: Parsing compose ps output")
+    array_output = '[{"Service": "app", "State": "running"}, {"Service": "db", "State": "exited"}]'
+    lines_output = '{"Service": "app", "State": "running"}\n{"Service": "db", "State": "exited"}\n'
+    expected = [{'Service': 'app', 'State': 'running'}, {'Service': 'db', 'State': 'exited'}]
+
+    for output in (array_output, lines_output, lines_output.encode(), array_output.encode()):
+        if _parse_ps_output(output) != expected:
+            raise AssertionError(f"unexpected parse of {output!r}")
+    if _parse_ps_output("  \n") != [] or _parse_ps_output(b"") != []:
+        raise AssertionError("empty output should parse to []")
+    logger.success("compose ps parsing passed")
+
+    # Test 2: niveles de depends_on (lista y dict con condiciones)
+    logger.step("Test 2: Grouping services by depends_on")
+    services = {
+        'nginx': {'depends_on': ['app', 'frontend']},
+        'app': {'depends_on': {'mysql': {'condition': 'service_healthy'}, 'redis': {}}},
+        'frontend': None,
+        'mysql': {},
+        'redis': {'depends_on': ['external']},
+    }
+    levels = _dependency_levels(services)
+    if levels != [['frontend', 'mysql', 'redis'], ['app'], ['nginx']]:
+        raise AssertionError(f"unexpected levels: {levels}")
+
+    cyclic = {'a': {'depends_on': ['b']}, 'b': {'depends_on': ['a']}, 'c': {}}
+    if _dependency_levels(cyclic) is not None:
+        raise AssertionError("a dependency cycle should return None")
+    logger.success("depends_on grouping passed")
+
+    logger.success("Compose helper tests completed")
+
+
 def test_template_manager():
     """Prueba TemplateManager"""
     logger.header("Testing TemplateManager")
@@ -296,6 +335,9 @@ def main():
         test_docker_manager()
         logger.print()
 
+        test_compose_helpers()
+        logger.print()
+
         test_template_manager()
         logger.print()
 
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para funcionalidades de Fase 8
+"""
+
+import sys
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.cli import cli, _fmt_ts
+from src.logger import logger
+
+
+def test_shell_command():
+    """Prueba el registro del comando shell"""
+    logger.header("Testing shell command")
+
+    # Test 1: El comando registrado es la implementación completa
+    logger.step("Test 1: Checking shell parameters")
+    params = [param.name for param in cli.commands['shell'].params]
+    logger.info(f"Parameters: {params}")
+
+    if 'service' not in params or 'shell' not in params:
+        raise AssertionError(f"shell command is missing parameters: {params}")
+
+    logger.success("shell command exposes service and shell")
+
+    logger.success("shell command tests completed")
+
+
+def test_fmt_ts():
+    """Prueba el formateo de timestamps de history y backup list"""
+    logger.header("Testing timestamp formatting")
+
+    logger.step("Test 1: Formatting ISO timestamps")
+    cases = [
+        (("2025-01-31T14:05:09.123456",), "2025-01-31 14:05"),
+        (("2025-01-31T14:05:09.123456", True), "2025-01-31 14:05:09"),
+        (("2025-01-31 14:05:09",), "2025-01-31 14:05"),
+        (("2025-01-31T14:05",), "2025-01-31 14:05"),
+        (("2025-01-31T14:05", True), "2025-01-31T14:05"),
+        (("yesterday",), "yesterday"),
+        (("",), "unknown"),
+        ((None,), "unknown"),
+    ]
+    for args, expected in cases:
+        result = _fmt_ts(*args)
+        if result != expected:
+            raise AssertionError(f"_fmt_ts{args} returned {result!r}, expected {expected!r}")
+
+    logger.success("Timestamp formatting tests completed")
+
+
+def main():
+    """Ejecuta todas las pruebas"""
+    logger.header("Phase 8 Functionality Tests")
+
+    try:
+        test_shell_command()
+        logger.print()
+
+        test_fmt_ts()
+        logger.print()
+
+        logger.header("All Tests Completed Successfully!")
+
+    except Exception as e:
+        logger.error(f"Tests failed: {str(e)}")
+        logger.log_exception(e)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
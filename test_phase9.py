@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para las rutas que protegen datos del usuario
+(pull superficial, backups, credenciales, escrituras atómicas)
+"""
+
+import os
+import sys
+import json
+import base64
+import subprocess
+import tempfile
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src import backup_manager
+from src.backup_manager import BackupManager
+from src.git_manager import GitManager
+from src.utils import (
+    load_project,
+    try_load_project_config,
+    derive_credentials,
+    load_credentials,
+    generate_secure_password,
+    save_json_file,
+    sync_tree
+)
+from concurrent.futures import ThreadPoolExecutor
+from src.logger import logger
+
+
+def _git(cwd: Path, *args: str) -> str:
+    """Ejecuta git con una identidad fija y retorna stdout"""
+    cmd = ['git', '-c', 'user.name=ldm', '-c', 'user.email=ldm@test', *args]
+    return subprocess.run(cmd, cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def _commit_file(repo: Path, name: str, content: str):
+    """Escribe un archivo y lo commitea"""
+    (repo / name).write_text(content)
+    _git(repo, 'add', name)
+    _git(repo, 'commit', '-q', '-m', f'update {name}')
+
+
+def test_shallow_pull():
+    """Prueba que el pull de un clone superficial nunca descarte trabajo local"""
+    logger.header("Testing shallow pull")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        upstream = Path(tmpdir) / "upstream"
+        upstream.mkdir()
+        _git(upstream, 'init', '-q', '-b', 'main')
+        _commit_file(upstream, 'a.txt', '1')
+        _commit_file(upstream, 'b.txt', '1')
+
+        clone_path = Path(tmpdir) / "clone"
+        manager = GitManager()
+        if not manager.clone(f"file://{upstream}", clone_path, branch="main"):
+            raise AssertionError("shallow clone failed")
+        if not manager.is_shallow():
+            raise AssertionError("clone is not shallow")
+
+        # Test 1: fast-forward al nuevo commit del remoto
+        logger.step("Test 1: Fast-forward pull")
+        _commit_file(upstream, 'a.txt', '2')
+        if not manager.pull():
+            raise AssertionError("fast-forward pull failed")
+        if manager.get_current_commit() != _git(upstream, 'rev-parse', 'HEAD'):
+            raise AssertionError("pull did not reach the remote tip")
+        logger.success("Fast-forward pull passed")
+
+        # Test 2: cambios sin commitear bloquean el pull y se conservan
+        logger.step("Test 2: Dirty tree is preserved")
+        _commit_file(upstream, 'a.txt', '3')
+        (clone_path / 'b.txt').write_text('local edit')
+        if manager.pull():
+            raise AssertionError("pull succeeded over uncommitted changes")
+        if (clone_path / 'b.txt').read_text() != 'local edit':
+            raise AssertionError("uncommitted edit was lost")
+        _git(clone_path, 'checkout', '--', 'b.txt')
+        logger.success("Dirty tree check passed")
+
+        # Test 3: commits locales sin pushear bloquean el pull
+        logger.step("Test 3: Unpushed commits are preserved")
+        _commit_file(clone_path, 'local.txt', 'mine')
+        local_commit = _git(clone_path, 'rev-parse', 'HEAD')
+        if manager.pull():
+            raise AssertionError("pull succeeded over unpushed commits")
+        if _git(clone_path, 'rev-parse', 'HEAD') != local_commit:
+            raise AssertionError("unpushed commit was discarded")
+        logger.success("Unpushed commit check passed")
+
+        # Test 4: no se puede traer otro branch sobre el actual
+        logger.step("Test 4: Foreign branch is rejected")
+        if manager.pull(branch='other'):
+            raise AssertionError("pull of another branch was accepted")
+        logger.success("Foreign branch check passed")
+
+    logger.success("Shallow pull tests completed")
+
+
+def test_tree_backup_restore():
+    """Prueba que restaurar un backup deduplicado no comparta inodes"""
+    logger.header("Testing tree backup restore")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_path = Path(tmpdir) / "project"
+        for folder in ("backend/storage", "backend/public", "frontend/src"):
+            (project_path / folder).mkdir(parents=True)
+
+        # Archivos idénticos: se deduplican en un solo objeto del almacén
+        (project_path / "backend/storage/.gitkeep").write_text("")
+        (project_path / "backend/public/.gitkeep").write_text("")
+        (project_path / "frontend/src/.gitkeep").write_text("")
+        (project_path / "backend/app.php").write_text("<?php echo 1;")
+        (project_path / "frontend/src/main.js").write_text("console.log(1)")
+
+        manager = BackupManager(Path(tmpdir) / "backups")
+        project_config = {'name': 'safety', 'stack': 'laravel-vue', 'domain': 'safety.local'}
+
+        # Forzar el formato árbol de directorios (sin tar/zstd)
+        archive_tools_available = backup_manager._archive_tools_available
+        backup_manager._archive_tools_available = lambda: False
+        try:
+            success, backup_id = manager.create_backup(project_path, project_config, include_db=False)
+        finally:
+            backup_manager._archive_tools_available = archive_tools_available
+
+        if not success:
+            raise AssertionError("tree backup failed")
+
+        # Test 1: el backup comparte el objeto de los archivos idénticos
+        logger.step("Test 1: Backup is deduplicated")
+        backup_keep = manager.backups_dir / backup_id / "backend/storage/.gitkeep"
+        if os.stat(backup_keep).st_nlink < 4:
+            raise AssertionError("identical files were not linked to the object store")
+        logger.success("Deduplication check passed")
+
+        # Test 2: los archivos restaurados son independientes
+        logger.step("Test 2: Restored files have their own inode")
+        target_path = Path(tmpdir) / "restored"
+        target_path.mkdir()
+        if not manager.restore_backup(backup_id, target_path, restore_db=False):
+            raise AssertionError("restore failed")
+
+        for path in target_path.rglob("*"):
+            if path.is_file() and os.stat(path).st_nlink != 1:
+                raise AssertionError(f"{path} is hardlinked after restore")
+
+        (target_path / "backend/storage/.gitkeep").write_text("edited")
+        if (target_path / "backend/public/.gitkeep").read_text() != "":
+            raise AssertionError("editing one restored file changed another")
+        logger.success("Independent inode check passed")
+
+    logger.success("Tree backup restore tests completed")
+
+
+def test_project_config_isolation():
+    """Prueba que modificar la configuración cargada no altere el cache"""
+    logger.header("Testing project config isolation")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project_path = Path(tmpdir) / "local-deployer" / "active-project"
+        project_path.mkdir(parents=True)
+        (project_path / ".project-config.json").write_text('{"name": "safety", "ports": {"http": 80}}')
+
+        home = os.environ.get('HOME')
+        os.environ['HOME'] = tmpdir
+        try:
+            logger.step("Test 1: Mutating a loaded config")
+            _, config = load_project()
+            config['name'] = 'mutated'
+            config['ports']['http'] = 8080
+
+            fresh = try_load_project_config()
+            if fresh != {'name': 'safety', 'ports': {'http': 80}}:
+                raise AssertionError(f"cached config was modified: {fresh}")
+        finally:
+            if home is None:
+                del os.environ['HOME']
+            else:
+                os.environ['HOME'] = home
+
+    logger.success("Project config isolation tests completed")
+
+
+def test_derived_credentials():
+    """Prueba que las credenciales derivadas de la clave maestra sean reproducibles"""
+    logger.header("Testing derived credentials")
+
+    master_hex = "5a" * 32
+
+    # Test 1: la misma clave maestra da las mismas credenciales
+    logger.step("Test 1: Deriving twice")
+    for stack in ('laravel-vue', 'springboot-vue'):
+        first = derive_credentials(master_hex, stack)
+        second = derive_credentials(master_hex, stack)
+        if first != second:
+            raise AssertionError(f"derived credentials differ for {stack}")
+    logger.success("Derivation is deterministic")
+
+    # Test 2: entropía insuficiente se extiende sin recurrir a secrets
+    logger.step("Test 2: Exhausted entropy")
+    first = generate_secure_password(64, entropy=b"\xff\x00\x01")
+    second = generate_secure_password(64, entropy=b"\xff\x00\x01")
+    if first != second or len(first) != 64:
+        raise AssertionError("extended entropy is not deterministic")
+    logger.success("Entropy extension is deterministic")
+
+    # Test 3: rotar key_version cambia solo las claves rotables
+    logger.step("Test 3: Rotating key_version")
+    base = derive_credentials(master_hex, 'laravel-vue')
+    rotated = derive_credentials(master_hex, 'laravel-vue', key_version=1)
+    if rotated['app_key'] == base['app_key'] or rotated['jwt_secret'] == base['jwt_secret']:
+        raise AssertionError("key rotation did not change APP_KEY/JWT_SECRET")
+    if (rotated['db_password'], rotated['db_root_password']) != (base['db_password'], base['db_root_password']):
+        raise AssertionError("key rotation changed the database passwords")
+    if len(base64.b64decode(base['app_key'].split(':', 1)[1])) != 32:
+        raise AssertionError("APP_KEY is not 32 bytes of base64")
+    logger.success("Key rotation passed")
+
+    # Test 4: load_credentials deriva desde .credentials.json
+    logger.step("Test 4: Loading credentials from the master key")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        save_json_file(Path(tmpdir) / ".credentials.json", {'master': master_hex, 'key_version': 1})
+        loaded = load_credentials(Path(tmpdir), 'laravel-vue')
+        if loaded['jwt_secret'] != rotated['jwt_secret'] or loaded['db_password'] != base['db_password']:
+            raise AssertionError("load_credentials did not honour key_version")
+    logger.success("Credential loading passed")
+
+    logger.success("Derived credentials tests completed")
+
+
+def test_concurrent_json_writes():
+    """Prueba escrituras atómicas concurrentes sobre el mismo archivo"""
+    logger.header("Testing concurrent JSON writes")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        target = Path(tmpdir) / "state.json"
+
+        # Un temporal huérfano con el nombre antiguo no debe bloquear escrituras
+        (Path(tmpdir) / f".state.json.{os.getpid()}.tmp").write_text("stale")
+
+        logger.step("Test 1: 32 threads writing the same file")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda i: save_json_file(target, {'writer': i}), range(32)))
+
+        data = json.loads(target.read_text())
+        if data.get('writer') not in range(32):
+            raise AssertionError(f"unexpected content: {data}")
+
+        leftovers = [p.name for p in Path(tmpdir).glob(".state.json.*.tmp") if p.read_text() != "stale"]
+        if leftovers:
+            raise AssertionError(f"temporary files left behind: {leftovers}")
+        logger.success("Concurrent writes passed")
+
+        # Test 2: un archivo nuevo respeta el umask; uno existente conserva su modo
+        logger.step("Test 2: File modes")
+        umask = os.umask(0o022)
+        os.umask(umask)
+        fresh = Path(tmpdir) / "fresh.json"
+        save_json_file(fresh, {})
+        if os.stat(fresh).st_mode & 0o777 != 0o666 & ~umask:
+            raise AssertionError(f"new file mode is {oct(os.stat(fresh).st_mode & 0o777)}")
+
+        os.chmod(target, 0o600)
+        save_json_file(target, {'writer': 'last'})
+        if os.stat(target).st_mode & 0o777 != 0o600:
+            raise AssertionError("existing file lost its mode")
+        logger.success("File modes passed")
+
+    logger.success("Concurrent JSON write tests completed")
+
+
+def test_object_store():
+    """Prueba el almacén de objetos deduplicado de los backups"""
+    logger.header("Testing backup object store")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = BackupManager(Path(tmpdir) / "backups")
+        src_dir = Path(tmpdir) / "src"
+        src_dir.mkdir()
+
+        (src_dir / "a.txt").write_text("same")
+        (src_dir / "b.txt").write_text("same")
+        (src_dir / "run.sh").write_text("same")
+        os.chmod(src_dir / "run.sh", 0o755)
+
+        # Test 1: mismo contenido y modo comparten objeto; otro modo no
+        logger.step("Test 1: Content and mode addressing")
+        obj_a = manager._store_file(src_dir / "a.txt")
+        obj_b = manager._store_file(src_dir / "b.txt")
+        obj_exec = manager._store_file(src_dir / "run.sh")
+        if obj_a != obj_b:
+            raise AssertionError("identical files produced different objects")
+        if obj_exec == obj_a:
+            raise AssertionError("files with different modes share an object")
+        logger.success("Addressing passed")
+
+        # Test 2: los enlaces apuntan al objeto y conservan contenido y modo
+        logger.step("Test 2: Linking from the store")
+        backup_dir = Path(tmpdir) / "backups" / "b1"
+        backup_dir.mkdir()
+        manager._link_from_store(src_dir / "a.txt", backup_dir / "a.txt")
+        manager._link_from_store(src_dir / "run.sh", backup_dir / "run.sh")
+        if not os.path.samefile(backup_dir / "a.txt", obj_a):
+            raise AssertionError("backup file is not linked to its object")
+        if (backup_dir / "a.txt").read_text() != "same":
+            raise AssertionError("linked file lost its content")
+        if os.stat(backup_dir / "run.sh").st_mode & 0o777 != 0o755:
+            raise AssertionError("linked file lost its mode")
+        logger.success("Linking passed")
+
+        # Test 3: prune solo elimina objetos sin backups que los referencien
+        logger.step("Test 3: Pruning unreferenced objects")
+        (backup_dir / "run.sh").unlink()
+        removed = manager.prune_objects()
+        if removed != 1 or obj_exec.exists():
+            raise AssertionError(f"expected the unreferenced object to be pruned (removed={removed})")
+        if not obj_a.exists():
+            raise AssertionError("a referenced object was pruned")
+        logger.success("Pruning passed")
+
+    logger.success("Object store tests completed")
+
+
+def test_sync_tree():
+    """Prueba la sincronización incremental de árboles"""
+    logger.header("Testing sync_tree")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = Path(tmpdir) / "src"
+        dst = Path(tmpdir) / "dst"
+        (src / "sub").mkdir(parents=True)
+        (src / "keep.txt").write_text("keep")
+        (src / "sub" / "change.txt").write_text("v1")
+        (src / "gone.txt").write_text("gone")
+
+        logger.step("Test 1: Initial sync")
+        if sync_tree(src, dst) != 3:
+            raise AssertionError("initial sync should transfer 3 files")
+
+        logger.step("Test 2: Incremental sync")
+        (src / "sub" / "change.txt").unlink()
+        (src / "sub" / "change.txt").write_text("version 2")
+        (src / "gone.txt").unlink()
+        (src / "new").mkdir()
+        (src / "new" / "file.txt").write_text("new")
+        (dst / "stray.txt").write_text("stray")
+
+        updated = sync_tree(src, dst)
+        if updated != 2:
+            raise AssertionError(f"incremental sync should transfer 2 files, got {updated}")
+
+        def snapshot(root: Path) -> dict:
+            return {
+                str(p.relative_to(root)): p.read_text()
+                for p in root.rglob("*") if p.is_file()
+            }
+
+        if snapshot(dst) != snapshot(src):
+            raise AssertionError(f"trees differ after sync: {snapshot(dst)}")
+        logger.success("Incremental sync passed")
+
+    logger.success("sync_tree tests completed")
+
+
+def main():
+    """Ejecuta todas las pruebas"""
+    logger.header("Data Safety Tests")
+
+    try:
+        test_shallow_pull()
+        logger.print()
+
+        test_tree_backup_restore()
+        logger.print()
+
+        test_project_config_isolation()
+        logger.print()
+
+        test_derived_credentials()
+        logger.print()
+
+        test_concurrent_json_writes()
+        logger.print()
+
+        test_object_store()
+        logger.print()
+
+        test_sync_tree()
+        logger.print()
+
+        logger.header("All Tests Completed Successfully!")
+
+    except Exception as e:
+        logger.error(f"Tests failed: {str(e)}")
+        logger.log_exception(e)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()